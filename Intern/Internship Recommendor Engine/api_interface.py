@@ -3,16 +3,32 @@ API Interface for AI Internship Matching Engine
 Provides easy-to-use interface for backend integration
 """
 
+import base64
+import functools
+import inspect
 import json
 import logging
-from typing import Dict, List, Any, Optional, Tuple, Union
-from dataclasses import dataclass, asdict
+import secrets
+import time
+from typing import Dict, Iterator, List, Any, Optional, Sequence, Tuple, Union
+from dataclasses import dataclass
 from datetime import datetime
 
 from matching_engine import CandidateProfile, Internship
-from llm_preference_processor import EnhancedMatchingEngine, ExtractedPreferences
+from llm_preference_processor import EnhancedMatchingEngine, ExtractedPreferences, LLMPreferenceProcessor
 from enhanced_ranking import EnhancedRankingEngine
 from database_integration import DatabaseConnector
+from internship_catalog import CatalogSnapshot, InternshipCatalog
+from recommendation_cache import RecommendationCache, profile_fingerprint
+from matching_stats import compute_matching_stats
+from response_serializer import encode_json, render_response, shallow_dict
+from health_monitor import HealthMonitor
+from metrics import PROMETHEUS_CONTENT_TYPE, RequestMetrics, prometheus_metric, route_template
+from tracing import Tracer, current_trace, span
+from load_control import RETRY_AFTER_SECONDS, AdmissionController, AdmittedIterator, Overloaded, SingleFlight
+
+# Prefix of every metric name in the Prometheus exposition
+METRICS_PREFIX = "internship_matching"
 
 
 @dataclass
@@ -39,6 +55,7 @@ class APIResponse:
     data: Any = None
     message: str = ""
     error_code: Optional[str] = None
+    timings: Optional[Dict[str, Any]] = None  # Per-stage breakdown, only when the caller asked for it
     timestamp: str = None
     
     def __post_init__(self):
@@ -46,6 +63,140 @@ class APIResponse:
             self.timestamp = datetime.now().isoformat()
 
 
+def load_controlled(operation: str, coalesce: bool = True):
+    """
+    Run an expensive AIMatchingAPI method under the API's load control
+    
+    Concurrent calls with identical arguments (the request context aside) share
+    one execution, and only that execution takes an admission slot. A call that
+    cannot get a slot in time returns OVERLOADED instead of queueing indefinitely.
+    
+    Args:
+        operation: Name distinguishing this method's calls in the coalescing key
+        coalesce: False for methods whose arguments are not worth comparing (batches)
+    """
+    def decorator(method):
+        signature = inspect.signature(method)
+        
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            bound = signature.bind(self, *args, **kwargs)
+            bound.apply_defaults()
+            context = bound.arguments.get('context')
+            
+            def admitted() -> APIResponse:
+                if context is not None and context.admitted:
+                    return method(self, *args, **kwargs)  # The caller already holds a slot for this request
+                shed = self._acquire_admission(operation)
+                if shed is not None:
+                    return shed
+                try:
+                    return method(self, *args, **kwargs)
+                finally:
+                    self.admission.release()
+            
+            if not coalesce:
+                return admitted()
+            # Results depend on the cache generation too: never share across a catalog or weights change
+            key = (operation, self.recommendation_cache.generation) + tuple(
+                value for name, value in bound.arguments.items() if name not in ('self', 'context'))
+            try:
+                hash(key)
+            except TypeError:
+                return admitted()
+            return self.single_flight.do(key, admitted)[0]
+        return wrapper
+    return decorator
+
+
+class RequestContext:
+    """
+    Memoizes expensive steps for the lifetime of a single API call
+    
+    One context is created per public API call (or passed in by the caller to
+    share work across several calls) so that natural language extraction,
+    profile merging, profile lookups and catalog fetches run at most once.
+    With a catalog, every internship read in the request comes from one snapshot.
+    """
+    
+    def __init__(self, db: DatabaseConnector, preference_processor: LLMPreferenceProcessor,
+                 catalog: Optional[InternshipCatalog] = None):
+        self.db = db
+        self.preference_processor = preference_processor
+        self.catalog = catalog
+        self._snapshot: Optional[CatalogSnapshot] = None
+        self._extracted: Dict[str, ExtractedPreferences] = {}
+        self._merged: Dict[Tuple[int, str], Tuple[CandidateProfile, CandidateProfile]] = {}
+        self._profiles: Dict[Union[int, str], Optional[CandidateProfile]] = {}
+        self._internships: Dict[Optional[str], Sequence[Internship]] = {}
+        self._cache_lookups: Dict[tuple, Any] = {}
+        self.cache_generation: Optional[int] = None  # Recommendation cache generation when the request began
+        self.single_flight: Optional[SingleFlight] = None  # Shares extractions with concurrent requests
+        self.admitted = False  # Holds an admission slot taken with AIMatchingAPI.admit
+    
+    def extract_preferences(self, text: str) -> ExtractedPreferences:
+        """Process natural language text once per request (and once across concurrent identical requests)"""
+        key = text or ""
+        hit = key in self._extracted
+        self.preference_processor.metrics.record_cache_lookup(hit)
+        if not hit:
+            with span("nl_extraction"):
+                extract = self.preference_processor.process_natural_language_preferences
+                if self.single_flight is not None:
+                    self._extracted[key] = self.single_flight.do(('nl_extraction', key), extract, text)[0]
+                else:
+                    self._extracted[key] = extract(text)
+        return self._extracted[key]
+    
+    def merge_profile(self, profile: CandidateProfile, text: str) -> CandidateProfile:
+        """Merge the preferences extracted from text into profile once per request"""
+        key = (id(profile), text or "")
+        if key not in self._merged:
+            preferences = self.extract_preferences(text)
+            with span("profile_merge"):
+                merged = self.preference_processor.merge_with_profile(profile, preferences)
+            # Keep a reference to the source profile so its id() stays unique
+            self._merged[key] = (profile, merged)
+        return self._merged[key][1]
+    
+    def get_profile(self, user_identifier: Union[int, str]) -> Optional[CandidateProfile]:
+        """Fetch a user profile by ID (int) or email (str) once per request"""
+        if user_identifier not in self._profiles:
+            with span("profile_fetch"):
+                if isinstance(user_identifier, int):
+                    self._profiles[user_identifier] = self.db.get_user_profile_by_id(user_identifier)
+                else:
+                    self._profiles[user_identifier] = self.db.get_user_profile_by_email(user_identifier)
+        return self._profiles[user_identifier]
+    
+    def get_cached_recommendations(self, cache: RecommendationCache, key: tuple) -> Optional[Any]:
+        """Look a recommendation up in the result cache once per request"""
+        if key not in self._cache_lookups:
+            with span("cache_lookup"):
+                self._cache_lookups[key] = cache.get(key)
+        return self._cache_lookups[key]
+    
+    def get_catalog_snapshot(self) -> Optional[CatalogSnapshot]:
+        """Pin the catalog snapshot used for the rest of the request"""
+        if self._snapshot is None and self.catalog is not None:
+            with span("catalog_snapshot"):
+                self._snapshot = self.catalog.snapshot()
+        return self._snapshot
+    
+    def get_internships(self, sector_filter: Optional[str] = None) -> Sequence[Internship]:
+        """Fetch active internships, optionally filtered by sector, once per request"""
+        if sector_filter not in self._internships:
+            snapshot = self.get_catalog_snapshot()
+            with span("catalog_fetch"):
+                if snapshot is not None:
+                    self._internships[sector_filter] = snapshot.get_internships(sector_filter)
+                elif sector_filter:
+                    self._internships[sector_filter] = self.db.get_internships_by_sector(sector_filter)
+                else:
+                    self._internships[sector_filter] = self.db.get_active_internships()
+        return self._internships[sector_filter]
+
+
 class AIMatchingAPI:
     """
     Main API class for the AI matching engine
@@ -55,21 +206,86 @@ class AIMatchingAPI:
     def __init__(self, 
                  db_connector: Optional[DatabaseConnector] = None,
                  use_llm: bool = True, 
-                 gemini_api_key: str = None):
+                 gemini_api_key: str = None,
+                 recommendation_cache_size: int = 1024,
+                 precomputed_stats_max_age: float = 86400.0,
+                 recommendation_page_ttl: float = 900.0,
+                 health_check_interval: float = 30.0,
+                 trace_sample_rate: float = 0.0,
+                 max_concurrent_requests: int = 16,
+                 max_queued_requests: int = 64,
+                 queue_timeout: float = 2.0):
         
         # Initialize components
         self.db = db_connector or DatabaseConnector()
         self.matching_engine = EnhancedRankingEngine(use_llm=use_llm, api_key=gemini_api_key)
+        self.catalog = InternshipCatalog.for_database(self.db)
+        self.recommendation_cache = RecommendationCache(recommendation_cache_size)
+        # Nightly stats stay servable this long after the catalog changes (0: only for the same catalog version)
+        self.precomputed_stats_max_age = precomputed_stats_max_age
+        # Recommendation page cursors stay valid this long after the first page
+        self.recommendation_page_ttl = recommendation_page_ttl
+        # Filled in by the Flask and ASGI apps; exposed by get_prometheus_metrics
+        self.request_metrics = RequestMetrics()
+        # Health probes read the status cached by this monitor's background self-test
+        self.health = HealthMonitor(self, interval=health_check_interval)
+        # Fraction of requests whose stage timings feed the tracing histograms
+        self.tracer = Tracer(trace_sample_rate)
+        # Identical concurrent requests share one computation; the rest wait for a bounded number of slots
+        self.single_flight = SingleFlight()
+        self.admission = AdmissionController(max_concurrent_requests, max_queued_requests, queue_timeout)
         self.logger = logging.getLogger(__name__)
         
         # Configure logging
         logging.basicConfig(level=logging.INFO)
     
+    def create_context(self) -> RequestContext:
+        """Create a fresh request context for memoizing work within one call"""
+        context = RequestContext(self.db, self.matching_engine.preference_processor, self.catalog)
+        context.cache_generation = self.recommendation_cache.generation
+        context.single_flight = self.single_flight
+        return context
+    
+    def _acquire_admission(self, operation: str) -> Optional[APIResponse]:
+        """Take an admission slot; returns None once admitted or an OVERLOADED response if shed"""
+        try:
+            with span("admission_wait"):
+                self.admission.acquire()
+        except Overloaded as e:
+            self.logger.warning(f"Shedding {operation} request: {e}")
+            return APIResponse(success=False, message=str(e), error_code="OVERLOADED")
+        return None
+    
+    def admit(self, context: RequestContext, operation: str) -> Optional[APIResponse]:
+        """
+        Take this request's admission slot before its load-controlled call
+        
+        For callers that run expensive steps themselves first, such as preference
+        extraction on a separate pool, so the request is shed before that work
+        rather than after it. The load-controlled call made with the same context
+        does not take a second slot. Always pair with release_admission.
+        
+        Returns:
+            None once admitted, or an OVERLOADED response if the request was shed
+        """
+        shed = self._acquire_admission(operation)
+        if shed is None:
+            context.admitted = True
+        return shed
+    
+    def release_admission(self, context: RequestContext):
+        """Return the slot taken by admit, if it was granted"""
+        if context.admitted:
+            context.admitted = False
+            self.admission.release()
+    
+    @load_controlled("recommendations_by_user_id")
     def get_recommendations_by_user_id(self, 
                                      user_id: int, 
                                      natural_language_input: str = None,
                                      top_n: int = 10,
-                                     sector_filter: str = None) -> APIResponse:
+                                     sector_filter: str = None,
+                                     context: Optional[RequestContext] = None) -> APIResponse:
         """
         Get personalized internship recommendations for a user by ID
         
@@ -78,13 +294,16 @@ class AIMatchingAPI:
             natural_language_input: Optional free-form text preferences
             top_n: Number of recommendations to return
             sector_filter: Optional sector to filter by
+            context: Optional request context to share memoized work with
             
         Returns:
             APIResponse with recommendations
         """
         try:
+            context = context or self.create_context()
+            
             # Fetch user profile
-            profile = self.db.get_user_profile_by_id(user_id)
+            profile = context.get_profile(user_id)
             if not profile:
                 return APIResponse(
                     success=False,
@@ -92,7 +311,7 @@ class AIMatchingAPI:
                     error_code="USER_NOT_FOUND"
                 )
             
-            return self._get_recommendations(profile, natural_language_input, top_n, sector_filter)
+            return self._get_recommendations(profile, natural_language_input, top_n, sector_filter, context)
             
         except Exception as e:
             self.logger.error(f"Error getting recommendations for user {user_id}: {e}")
@@ -102,11 +321,13 @@ class AIMatchingAPI:
                 error_code="INTERNAL_ERROR"
             )
     
+    @load_controlled("recommendations_by_email")
     def get_recommendations_by_email(self, 
                                    email: str, 
                                    natural_language_input: str = None,
                                    top_n: int = 10,
-                                   sector_filter: str = None) -> APIResponse:
+                                   sector_filter: str = None,
+                                   context: Optional[RequestContext] = None) -> APIResponse:
         """
         Get personalized internship recommendations for a user by email
         
@@ -115,13 +336,16 @@ class AIMatchingAPI:
             natural_language_input: Optional free-form text preferences
             top_n: Number of recommendations to return
             sector_filter: Optional sector to filter by
+            context: Optional request context to share memoized work with
             
         Returns:
             APIResponse with recommendations
         """
         try:
+            context = context or self.create_context()
+            
             # Fetch user profile
-            profile = self.db.get_user_profile_by_email(email)
+            profile = context.get_profile(email)
             if not profile:
                 return APIResponse(
                     success=False,
@@ -129,7 +353,7 @@ class AIMatchingAPI:
                     error_code="USER_NOT_FOUND"
                 )
             
-            return self._get_recommendations(profile, natural_language_input, top_n, sector_filter)
+            return self._get_recommendations(profile, natural_language_input, top_n, sector_filter, context)
             
         except Exception as e:
             self.logger.error(f"Error getting recommendations for user {email}: {e}")
@@ -139,18 +363,210 @@ class AIMatchingAPI:
                 error_code="INTERNAL_ERROR"
             )
     
+    def iter_recommendations_batch(self,
+                                   user_ids: Sequence[int],
+                                   top_n: int = 10,
+                                   sector_filter: str = None,
+                                   chunk_size: int = 500,
+                                   context: Optional[RequestContext] = None) -> Iterator[Tuple[int, APIResponse]]:
+        """
+        Stream recommendations for many users, yielding (user_id, APIResponse) as each is ready
+        
+        Profiles are loaded chunk_size at a time with one query per chunk, every user is
+        ranked against the same catalog snapshot, and the engine's precomputed internship
+        features for that snapshot are shared by all of them. Duplicate IDs are served once;
+        unknown IDs yield a USER_NOT_FOUND response.
+        
+        Args:
+            user_ids: Database user IDs
+            top_n: Number of recommendations per user
+            sector_filter: Optional sector to filter by
+            chunk_size: Profiles loaded per database round trip
+            context: Optional request context to share memoized work with
+        """
+        context = context or self.create_context()
+        user_ids = list(dict.fromkeys(user_ids))
+        
+        for start in range(0, len(user_ids), chunk_size):
+            chunk = user_ids[start:start + chunk_size]
+            try:
+                profiles = self.db.get_user_profiles(chunk)
+            except Exception as e:
+                self.logger.error(f"Error loading profiles for batch recommendations: {e}")
+                profiles = None
+            
+            for user_id in chunk:
+                if profiles is None:
+                    yield user_id, APIResponse(
+                        success=False,
+                        message="Internal server error",
+                        error_code="INTERNAL_ERROR"
+                    )
+                elif user_id not in profiles:
+                    yield user_id, APIResponse(
+                        success=False,
+                        message=f"User with ID {user_id} not found",
+                        error_code="USER_NOT_FOUND"
+                    )
+                else:
+                    yield user_id, self._get_recommendations(profiles[user_id], None, top_n, sector_filter, context)
+    
+    def stream_recommendations_batch(self,
+                                     user_ids: Sequence[int],
+                                     top_n: int = 10,
+                                     sector_filter: str = None) -> Union[APIResponse, Iterator[Tuple[int, APIResponse]]]:
+        """
+        Admit a streamed batch and return its results as an iterator
+        
+        The admission slot is taken before anything is ranked and held until the
+        returned iterator is exhausted or closed, so streamed batches are shed
+        under overload like every other expensive request. Close the iterator if
+        the stream is abandoned.
+        
+        Returns:
+            Iterator of (user_id, APIResponse) like iter_recommendations_batch,
+            or an OVERLOADED response if the batch was shed
+        """
+        shed = self._acquire_admission("recommendations_batch_stream")
+        if shed is not None:
+            return shed
+        return AdmittedIterator(self.admission, self.iter_recommendations_batch(user_ids, top_n, sector_filter))
+    
+    @load_controlled("recommendations_batch", coalesce=False)
+    def get_recommendations_batch(self,
+                                  user_ids: Sequence[int],
+                                  top_n: int = 10,
+                                  sector_filter: str = None,
+                                  context: Optional[RequestContext] = None) -> APIResponse:
+        """
+        Get recommendations for many users in one call
+        
+        Args:
+            user_ids: Database user IDs
+            top_n: Number of recommendations per user
+            sector_filter: Optional sector to filter by
+            context: Optional request context to share memoized work with
+            
+        Returns:
+            APIResponse whose data lists one entry per distinct user, in request order,
+            each with user_id and that user's success, data, message and error_code
+        """
+        if not self._valid_user_ids(user_ids):
+            return APIResponse(
+                success=False,
+                message="user_ids must be a list of integer user IDs",
+                error_code="INVALID_REQUEST"
+            )
+        
+        try:
+            results = [self._batch_entry(user_id, response) for user_id, response in
+                       self.iter_recommendations_batch(user_ids, top_n, sector_filter, context=context)]
+            succeeded = sum(1 for entry in results if entry['success'])
+            
+            return APIResponse(
+                success=True,
+                data={
+                    'results': results,
+                    'total_users': len(results),
+                    'succeeded': succeeded,
+                    'failed': len(results) - succeeded
+                },
+                message=f"Generated recommendations for {succeeded} of {len(results)} users"
+            )
+            
+        except Exception as e:
+            self.logger.error(f"Error getting batch recommendations: {e}")
+            return APIResponse(
+                success=False,
+                message="Internal server error",
+                error_code="INTERNAL_ERROR"
+            )
+    
+    @staticmethod
+    def _valid_user_ids(user_ids: Any) -> bool:
+        """Whether user_ids is a list of integer IDs (booleans excluded)"""
+        return isinstance(user_ids, (list, tuple)) and all(
+            isinstance(user_id, int) and not isinstance(user_id, bool) for user_id in user_ids)
+    
+    @staticmethod
+    def _batch_entry(user_id: int, response: APIResponse) -> Dict[str, Any]:
+        """Flatten one user's response into a batch result entry"""
+        return {
+            'user_id': user_id,
+            'success': response.success,
+            'data': response.data,
+            'message': response.message,
+            'error_code': response.error_code
+        }
+    
+    def peek_recommendations(self,
+                             user_identifier: Union[int, str],
+                             natural_language_input: str = None,
+                             top_n: int = 10,
+                             sector_filter: str = None,
+                             context: Optional[RequestContext] = None) -> Optional[APIResponse]:
+        """
+        Answer a recommendation request without ranking or preference extraction, if possible
+        
+        Returns the response for an unknown user or a cached result, and None when the
+        request needs the full pipeline. Pass the same context to the follow-up
+        get_recommendations_by_user_id/email call so the lookups are not repeated.
+        """
+        try:
+            context = context or self.create_context()
+            profile = context.get_profile(user_identifier)
+            if not profile:
+                label = "ID" if isinstance(user_identifier, int) else "email"
+                return APIResponse(
+                    success=False,
+                    message=f"User with {label} {user_identifier} not found",
+                    error_code="USER_NOT_FOUND"
+                )
+            
+            cache_key = self._recommendation_cache_key(profile, natural_language_input, top_n, sector_filter, context)
+            if cache_key is None:
+                return None
+            cached = context.get_cached_recommendations(self.recommendation_cache, cache_key)
+            if cached is None:
+                return None
+            return APIResponse(success=True, data=cached[0], message=cached[1])
+            
+        except Exception as e:
+            self.logger.error(f"Error checking cached recommendations for user {user_identifier}: {e}")
+            return None
+    
+    def _recommendation_cache_key(self,
+                                  profile: CandidateProfile,
+                                  natural_language_input: str,
+                                  top_n: int,
+                                  sector_filter: str,
+                                  context: RequestContext) -> Optional[tuple]:
+        """Cache key for a request by this exact profile against the context's catalog snapshot, or None without a catalog"""
+        snapshot = context.get_catalog_snapshot()
+        if snapshot is None:
+            return None
+        return self.recommendation_cache.make_key(
+            profile.email, profile_fingerprint(profile), natural_language_input, top_n, sector_filter,
+            snapshot.version, self.matching_engine.get_weights_version()
+        )
+    
     def _get_recommendations(self, 
                            profile: CandidateProfile, 
                            natural_language_input: str,
                            top_n: int,
-                           sector_filter: str) -> APIResponse:
+                           sector_filter: str,
+                           context: RequestContext) -> APIResponse:
         """Internal method to generate recommendations"""
         try:
+            # Serve repeated requests from the cache while the profile, catalog and weights are unchanged
+            cache_key = self._recommendation_cache_key(profile, natural_language_input, top_n, sector_filter, context)
+            if cache_key is not None:
+                cached = context.get_cached_recommendations(self.recommendation_cache, cache_key)
+                if cached is not None:
+                    return APIResponse(success=True, data=cached[0], message=cached[1])
+            
             # Fetch internships
-            if sector_filter:
-                internships = self.db.get_internships_by_sector(sector_filter)
-            else:
-                internships = self.db.get_active_internships()
+            internships = context.get_internships(sector_filter)
             
             if not internships:
                 return APIResponse(
@@ -161,34 +577,22 @@ class AIMatchingAPI:
             
             # Get matches
             if natural_language_input:
-                matches, extracted_prefs = self.matching_engine.match_with_enhanced_ranking(
-                    profile, natural_language_input, internships, top_n
-                )
+                extracted_prefs = context.extract_preferences(natural_language_input)
+                enhanced_profile = context.merge_profile(profile, natural_language_input)
+                with span("scoring"):
+                    matches = self.matching_engine.rank_internships_enhanced(enhanced_profile, internships, top_n)
                 
                 # Include extracted preferences in response
-                extracted_prefs_dict = asdict(extracted_prefs)
+                extracted_prefs_dict = shallow_dict(extracted_prefs)
             else:
-                matches = self.matching_engine.rank_internships_enhanced(profile, internships, top_n)
+                with span("scoring"):
+                    matches = self.matching_engine.rank_internships_enhanced(profile, internships, top_n)
                 extracted_prefs_dict = None
             
             # Convert to API format
-            match_results = []
-            for i, (internship, score, components) in enumerate(matches):
-                match_result = MatchResult(
-                    internship_id=f"{internship.title.lower().replace(' ', '_')}_{i}",
-                    title=internship.title,
-                    company=getattr(internship, 'company_name', 'Unknown'),
-                    sector=internship.sector,
-                    location=internship.location,
-                    duration=internship.duration,
-                    skills_required=internship.skills_required,
-                    application_link=internship.link,
-                    overall_score=round(score, 3),
-                    component_scores={k: round(v, 3) for k, v in components.items()},
-                    match_explanation=self._generate_match_explanation(internship, score, components),
-                    remote_available=internship.remote_available
-                )
-                match_results.append(asdict(match_result))
+            with span("explanations"):
+                match_results = [self._match_result(internship, score, components, i)
+                                 for i, (internship, score, components) in enumerate(matches)]
             
             response_data = {
                 'recommendations': match_results,
@@ -204,10 +608,14 @@ class AIMatchingAPI:
             if extracted_prefs_dict:
                 response_data['extracted_preferences'] = extracted_prefs_dict
             
+            message = f"Found {len(match_results)} recommendations"
+            if cache_key is not None:
+                self.recommendation_cache.put(cache_key, (response_data, message), context.cache_generation)
+            
             return APIResponse(
                 success=True,
                 data=response_data,
-                message=f"Found {len(match_results)} recommendations"
+                message=message
             )
             
         except Exception as e:
@@ -218,6 +626,175 @@ class AIMatchingAPI:
                 error_code="RECOMMENDATION_ERROR"
             )
     
+    def _match_result(self, internship: Internship, score: float, components: Dict[str, float],
+                      rank: int) -> Dict[str, Any]:
+        """API representation of one ranked internship; rank is its 0-based position in the full ranking"""
+        return shallow_dict(MatchResult(
+            internship_id=f"{internship.title.lower().replace(' ', '_')}_{rank}",
+            title=internship.title,
+            company=getattr(internship, 'company_name', 'Unknown'),
+            sector=internship.sector,
+            location=internship.location,
+            duration=internship.duration,
+            skills_required=internship.skills_required,
+            application_link=internship.link,
+            overall_score=round(score, 3),
+            component_scores={k: round(v, 3) for k, v in components.items()},
+            match_explanation=self._generate_match_explanation(internship, score, components),
+            remote_available=internship.remote_available
+        ))
+    
+    @load_controlled("recommendations_page")
+    def get_recommendations_page(self,
+                                 user_identifier: Union[int, str],
+                                 natural_language_input: str = None,
+                                 limit: int = 10,
+                                 sector_filter: str = None,
+                                 cursor: Optional[str] = None,
+                                 context: Optional[RequestContext] = None) -> APIResponse:
+        """
+        Page through a user's full ranking with an opaque cursor
+        
+        The first page ranks every internship once and stores the ranked IDs and scores,
+        with the preferences extracted from the query, for recommendation_page_ttl seconds.
+        Later pages slice the stored ranking and report its scores; they neither extract
+        preferences again nor rescore, and only break their own internships' scores into
+        components for the explanations. Results never shift between pages and deep pages
+        cost the same as the first. A cursor expires with its TTL or as soon as the
+        catalog, the weights or the user's profile change.
+        
+        Args:
+            user_identifier: Database user ID (int) or email (str)
+            natural_language_input: Optional free-form text preferences (first page only)
+            limit: Page size (1-100)
+            sector_filter: Optional sector to filter by (first page only)
+            cursor: next_cursor from the previous page, or None for the first page
+            context: Optional request context to share memoized work with
+            
+        Returns:
+            APIResponse with one page of recommendations and the cursor for the next page
+        """
+        limit = self._page_limit(limit, 100)
+        if limit is None:
+            return APIResponse(
+                success=False,
+                message="limit must be an integer",
+                error_code="INVALID_REQUEST"
+            )
+        
+        try:
+            context = context or self.create_context()
+            profile = context.get_profile(user_identifier)
+            if not profile:
+                label = "ID" if isinstance(user_identifier, int) else "email"
+                return APIResponse(
+                    success=False,
+                    message=f"User with {label} {user_identifier} not found",
+                    error_code="USER_NOT_FOUND"
+                )
+            
+            snapshot = context.get_catalog_snapshot()
+            if snapshot is None:
+                return APIResponse(
+                    success=False,
+                    message="Recommendation paging requires the internship catalog",
+                    error_code="PAGINATION_ERROR"
+                )
+            
+            if cursor:
+                ranking_id, offset = self.decode_ranking_cursor(cursor)
+                page = self.db.get_recommendation_ranking_page(ranking_id, offset, limit)
+                if page is not None and page['user_key'] != profile.email.lower():
+                    raise ValueError("Recommendation cursor belongs to another user")
+                if (page is None or page['catalog_version'] != snapshot.version
+                        or page['weights_version'] != self.matching_engine.get_weights_version()
+                        or page['profile_hash'] != profile_fingerprint(profile)):
+                    return APIResponse(
+                        success=False,
+                        message="Recommendation cursor has expired; request the first page again",
+                        error_code="CURSOR_EXPIRED"
+                    )
+                items, total_count, expires_at = page['items'], page['total_count'], page['expires_at']
+                scoring_profile = profile
+                if page['preferences'] is not None:
+                    # The preferences the ranking was built with; never a second (possibly different) extraction
+                    with span("profile_merge"):
+                        scoring_profile = self.matching_engine.preference_processor.merge_with_profile(
+                            profile, ExtractedPreferences(**page['preferences']))
+            else:
+                preferences = context.extract_preferences(natural_language_input) if natural_language_input else None
+                scoring_profile = context.merge_profile(profile, natural_language_input) if preferences else profile
+                ranking_id, offset = secrets.token_urlsafe(12), 0
+                scored = self.matching_engine.iter_scores(scoring_profile, context.get_internships(sector_filter))
+                ranked = [(internship.internship_id, score)
+                          for internship, score in sorted(scored, key=lambda item: item[1], reverse=True)
+                          if internship.internship_id is not None]
+                expires_at = time.time() + self.recommendation_page_ttl
+                if not self.db.save_recommendation_ranking(
+                        ranking_id, profile.email.lower(), snapshot.version,
+                        self.matching_engine.get_weights_version(), profile_fingerprint(profile),
+                        natural_language_input or None, sector_filter, ranked, self.recommendation_page_ttl,
+                        shallow_dict(preferences) if preferences else None):
+                    return APIResponse(
+                        success=False,
+                        message="Error storing recommendation ranking",
+                        error_code="PAGINATION_ERROR"
+                    )
+                items, total_count = ranked[:limit], len(ranked)
+            
+            # Scores come from the stored ranking; only this page's components are computed, to explain them
+            internships = [snapshot.by_id[internship_id] for internship_id, _ in items]
+            explained = self.matching_engine.explain_scores(scoring_profile, internships)
+            recommendations = [self._match_result(internship, score, components, offset + i)
+                               for i, ((_, score), (internship, _, components)) in enumerate(zip(items, explained))]
+            
+            next_offset = offset + len(items)
+            next_cursor = self.encode_ranking_cursor(ranking_id, next_offset) if next_offset < total_count else None
+            return APIResponse(
+                success=True,
+                data={
+                    'recommendations': recommendations,
+                    'count': len(recommendations),
+                    'offset': offset,
+                    'total_count': total_count,
+                    'next_cursor': next_cursor,
+                    'has_more': next_cursor is not None,
+                    'expires_at': datetime.fromtimestamp(expires_at).isoformat()
+                },
+                message=f"Returned recommendations {offset + 1}-{next_offset} of {total_count}"
+                        if recommendations else "No more recommendations"
+            )
+            
+        except ValueError as e:
+            return APIResponse(
+                success=False,
+                message=str(e),
+                error_code="INVALID_CURSOR"
+            )
+        except Exception as e:
+            self.logger.error(f"Error paging recommendations for user {user_identifier}: {e}")
+            return APIResponse(
+                success=False,
+                message="Error paging recommendations",
+                error_code="PAGINATION_ERROR"
+            )
+    
+    @staticmethod
+    def encode_ranking_cursor(ranking_id: str, offset: int) -> str:
+        """Encode a stored ranking and position as an opaque URL-safe token"""
+        return base64.urlsafe_b64encode(json.dumps([ranking_id, offset]).encode()).decode().rstrip('=')
+    
+    @staticmethod
+    def decode_ranking_cursor(token: str) -> Tuple[str, int]:
+        """Decode a recommendation cursor token; raises ValueError if it is malformed"""
+        try:
+            ranking_id, offset = json.loads(base64.urlsafe_b64decode(token + '=' * (-len(token) % 4)))
+            if not isinstance(ranking_id, str) or not isinstance(offset, int) or offset < 0:
+                raise TypeError("cursor fields have the wrong types")
+            return ranking_id, offset
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"Invalid recommendation cursor: {token!r}") from e
+    
     def _generate_match_explanation(self, internship: Internship, score: float, components: Dict[str, float]) -> str:
         """Generate human-readable explanation for the match"""
         explanations = []
@@ -260,22 +837,27 @@ class AIMatchingAPI:
         if components.get('company_reputation', 0) > 0.8:
             explanations.append("High company reputation")
         
+        # Stipend
+        if components.get('stipend_fit', 0) > 0.8:
+            explanations.append("Stipend meets expectations")
+        
         if not explanations:
             explanations.append("Basic compatibility match")
         
         return "; ".join(explanations)
     
-    def process_natural_language_query(self, query: str) -> APIResponse:
+    def process_natural_language_query(self, query: str, context: Optional[RequestContext] = None) -> APIResponse:
         """
         Process natural language query to extract preferences
         Useful for showing users what was understood from their input
         """
         try:
-            extracted = self.matching_engine.preference_processor.process_natural_language_preferences(query)
+            context = context or self.create_context()
+            extracted = context.extract_preferences(query)
             
             return APIResponse(
                 success=True,
-                data=asdict(extracted),
+                data=shallow_dict(extracted),
                 message="Successfully processed natural language input"
             )
             
@@ -287,21 +869,94 @@ class AIMatchingAPI:
                 error_code="NLP_ERROR"
             )
     
-    def get_user_profile(self, user_identifier: Union[int, str]) -> APIResponse:
+    def get_llm_metrics(self) -> APIResponse:
+        """
+        Get a snapshot of LLM instrumentation metrics
+        Useful for sizing LLM timeouts and preference caches from real traffic
+        """
+        try:
+            return APIResponse(
+                success=True,
+                data=self.matching_engine.preference_processor.get_metrics_snapshot(),
+                message="LLM metrics retrieved successfully"
+            )
+            
+        except Exception as e:
+            self.logger.error(f"Error getting LLM metrics: {e}")
+            return APIResponse(
+                success=False,
+                message="Error retrieving LLM metrics",
+                error_code="METRICS_ERROR"
+            )
+    
+    def get_trace_metrics(self) -> APIResponse:
+        """Get per-stage latency histograms from sampled and forced request traces"""
+        try:
+            return APIResponse(
+                success=True,
+                data=self.tracer.snapshot(),
+                message="Trace metrics retrieved successfully"
+            )
+            
+        except Exception as e:
+            self.logger.error(f"Error getting trace metrics: {e}")
+            return APIResponse(
+                success=False,
+                message="Error retrieving trace metrics",
+                error_code="METRICS_ERROR"
+            )
+    
+    def get_load_metrics(self) -> APIResponse:
+        """Get admission control and request coalescing counters"""
+        try:
+            return APIResponse(
+                success=True,
+                data={
+                    'admission': self.admission.snapshot(),
+                    'coalescing': self.single_flight.snapshot()
+                },
+                message="Load metrics retrieved successfully"
+            )
+            
+        except Exception as e:
+            self.logger.error(f"Error getting load metrics: {e}")
+            return APIResponse(
+                success=False,
+                message="Error retrieving load metrics",
+                error_code="METRICS_ERROR"
+            )
+    
+    def get_cache_metrics(self) -> APIResponse:
+        """Get recommendation cache statistics (size, hit rate, evictions, invalidations)"""
+        try:
+            return APIResponse(
+                success=True,
+                data=self.recommendation_cache.snapshot(),
+                message="Cache metrics retrieved successfully"
+            )
+            
+        except Exception as e:
+            self.logger.error(f"Error getting cache metrics: {e}")
+            return APIResponse(
+                success=False,
+                message="Error retrieving cache metrics",
+                error_code="METRICS_ERROR"
+            )
+    
+    def get_user_profile(self, user_identifier: Union[int, str], context: Optional[RequestContext] = None) -> APIResponse:
         """
         Get user profile by ID or email
         
         Args:
             user_identifier: User ID (int) or email (str)
+            context: Optional request context to share memoized work with
             
         Returns:
             APIResponse with user profile data
         """
         try:
-            if isinstance(user_identifier, int):
-                profile = self.db.get_user_profile_by_id(user_identifier)
-            else:
-                profile = self.db.get_user_profile_by_email(user_identifier)
+            context = context or self.create_context()
+            profile = context.get_profile(user_identifier)
             
             if not profile:
                 return APIResponse(
@@ -310,7 +965,7 @@ class AIMatchingAPI:
                     error_code="USER_NOT_FOUND"
                 )
             
-            profile_data = asdict(profile)
+            profile_data = shallow_dict(profile)
             return APIResponse(
                 success=True,
                 data=profile_data,
@@ -328,7 +983,8 @@ class AIMatchingAPI:
     def update_user_preferences(self, 
                               user_identifier: Union[int, str], 
                               preferences: Dict[str, Any],
-                              natural_language_input: str = None) -> APIResponse:
+                              natural_language_input: str = None,
+                              context: Optional[RequestContext] = None) -> APIResponse:
         """
         Update user preferences
         
@@ -336,14 +992,17 @@ class AIMatchingAPI:
             user_identifier: User ID (int) or email (str)
             preferences: Dictionary of preferences to update
             natural_language_input: Optional natural language to merge with preferences
+            context: Optional request context to share memoized work with
             
         Returns:
             APIResponse confirming update
         """
         try:
+            context = context or self.create_context()
+            
             # Get user email for database operations
             if isinstance(user_identifier, int):
-                profile = self.db.get_user_profile_by_id(user_identifier)
+                profile = context.get_profile(user_identifier)
                 if not profile:
                     return APIResponse(
                         success=False,
@@ -356,9 +1015,7 @@ class AIMatchingAPI:
             
             # Process natural language input if provided
             if natural_language_input:
-                extracted = self.matching_engine.preference_processor.process_natural_language_preferences(
-                    natural_language_input
-                )
+                extracted = context.extract_preferences(natural_language_input)
                 
                 # Merge with existing preferences
                 if extracted.preferred_sectors:
@@ -374,6 +1031,7 @@ class AIMatchingAPI:
             success = self.db.update_user_preferences(email, preferences)
             
             if success:
+                self.recommendation_cache.evict_user(email)
                 return APIResponse(
                     success=True,
                     data=preferences,
@@ -404,38 +1062,24 @@ class AIMatchingAPI:
         Get internships filtered by specific criteria
         
         Args:
-            sector: Filter by sector
-            location: Filter by location
-            duration: Filter by duration
+            sector: Filter by sector (exact, case-insensitive)
+            location: Filter by location (exact, case-insensitive)
+            duration: Filter by duration, e.g. "3 months" (exact, case-insensitive)
             remote_only: Only remote internships
-            limit: Maximum number of results
+            limit: Maximum number of results, applied after filtering
             
         Returns:
             APIResponse with filtered internships
         """
         try:
-            # Get base internships
-            if sector:
-                internships = self.db.get_internships_by_sector(sector)
-            else:
-                internships = self.db.get_active_internships(limit=limit)
-            
-            # Apply additional filters
-            filtered_internships = []
-            for internship in internships:
-                # Location filter
-                if location and location.lower() not in internship.location.lower():
-                    continue
-                
-                # Duration filter
-                if duration and duration.lower() not in internship.duration.lower():
-                    continue
-                
-                # Remote filter
-                if remote_only and not internship.remote_available:
-                    continue
-                
-                filtered_internships.append(internship)
+            # All criteria are applied in SQL, so the limit counts matching rows only
+            filtered_internships = self.db.find_internships(
+                sector=sector,
+                location=location,
+                duration=duration,
+                remote_only=remote_only,
+                limit=limit
+            )
             
             # Convert to API format
             internship_data = []
@@ -476,22 +1120,97 @@ class AIMatchingAPI:
                 error_code="FILTER_ERROR"
             )
     
-    def get_matching_stats(self, user_identifier: Union[int, str]) -> APIResponse:
+    @staticmethod
+    def _page_limit(limit: Any, maximum: int) -> Optional[int]:
+        """Page size clamped to 1..maximum, or None if limit is not an integer"""
+        if isinstance(limit, bool):
+            return None
+        try:
+            return max(1, min(int(limit), maximum))
+        except (TypeError, ValueError):
+            return None
+    
+    def get_internships_page(self,
+                             limit: int = 50,
+                             cursor: Optional[str] = None,
+                             sector: Optional[str] = None) -> APIResponse:
+        """
+        Page through active internships with an opaque keyset cursor
+        
+        Args:
+            limit: Page size (1-500)
+            cursor: next_cursor from the previous page, or None for the first page
+            sector: Optional sector filter
+            
+        Returns:
+            APIResponse with one page of internships and the cursor for the next page
+        """
+        limit = self._page_limit(limit, 500)
+        if limit is None:
+            return APIResponse(
+                success=False,
+                message="limit must be an integer",
+                error_code="INVALID_REQUEST"
+            )
+        
+        try:
+            internships, next_cursor = self.db.get_internships_page(limit, cursor, sector)
+            
+            internship_data = [{
+                'internship_id': internship.internship_id,
+                'title': internship.title,
+                'sector': internship.sector,
+                'location': internship.location,
+                'duration': internship.duration,
+                'company_type': internship.company_type,
+                'skills_required': internship.skills_required,
+                'application_link': internship.link,
+                'capacity': internship.capacity,
+                'remote_available': internship.remote_available
+            } for internship in internships]
+            
+            return APIResponse(
+                success=True,
+                data={
+                    'internships': internship_data,
+                    'count': len(internship_data),
+                    'next_cursor': next_cursor,
+                    'has_more': next_cursor is not None
+                },
+                message=f"Returned {len(internship_data)} internships"
+            )
+            
+        except ValueError as e:
+            return APIResponse(
+                success=False,
+                message=str(e),
+                error_code="INVALID_CURSOR"
+            )
+        except Exception as e:
+            self.logger.error(f"Error paging internships: {e}")
+            return APIResponse(
+                success=False,
+                message="Error paging internships",
+                error_code="PAGINATION_ERROR"
+            )
+    
+    @load_controlled("matching_stats")
+    def get_matching_stats(self, user_identifier: Union[int, str], context: Optional[RequestContext] = None) -> APIResponse:
         """
         Get matching statistics and insights for a user
         
         Args:
             user_identifier: User ID (int) or email (str)
+            context: Optional request context to share memoized work with
             
         Returns:
             APIResponse with matching statistics
         """
         try:
+            context = context or self.create_context()
+            
             # Get user profile
-            if isinstance(user_identifier, int):
-                profile = self.db.get_user_profile_by_id(user_identifier)
-            else:
-                profile = self.db.get_user_profile_by_email(user_identifier)
+            profile = context.get_profile(user_identifier)
             
             if not profile:
                 return APIResponse(
@@ -500,56 +1219,27 @@ class AIMatchingAPI:
                     error_code="USER_NOT_FOUND"
                 )
             
-            # Get all internships for analysis
-            all_internships = self.db.get_active_internships()
-            
-            if not all_internships:
-                return APIResponse(
-                    success=True,
-                    data={'total_internships': 0},
-                    message="No internships available for analysis"
-                )
-            
-            # Analyze matches
-            matches = self.matching_engine.rank_internships_enhanced(profile, all_internships, len(all_internships))
-            
-            # Calculate statistics
-            scores = [match[1] for match in matches]
-            high_matches = sum(1 for score in scores if score >= 0.7)
-            medium_matches = sum(1 for score in scores if 0.4 <= score < 0.7)
-            low_matches = sum(1 for score in scores if score < 0.4)
-            
-            # Sector distribution
-            sector_matches = {}
-            for internship, score, _ in matches[:20]:  # Top 20 for sector analysis
-                sector = internship.sector
-                if sector not in sector_matches:
-                    sector_matches[sector] = []
-                sector_matches[sector].append(score)
-            
-            sector_stats = {
-                sector: {
-                    'count': len(scores),
-                    'avg_score': sum(scores) / len(scores) if scores else 0
-                }
-                for sector, scores in sector_matches.items()
-            }
+            # Nightly precomputed stats when still valid, otherwise one streaming pass over the catalog
+            stats_data = self._load_precomputed_stats(user_identifier, profile, context)
+            if stats_data is None:
+                all_internships = context.get_internships()
+                
+                if not all_internships:
+                    return APIResponse(
+                        success=True,
+                        data={'total_internships': 0},
+                        message="No internships available for analysis"
+                    )
+                
+                stats_data = compute_matching_stats(self.matching_engine, profile, all_internships)
+                stats_data['precomputed'] = False
             
-            stats_data = {
-                'total_internships': len(all_internships),
-                'match_distribution': {
-                    'high_matches': high_matches,
-                    'medium_matches': medium_matches,
-                    'low_matches': low_matches
-                },
-                'average_score': sum(scores) / len(scores) if scores else 0,
-                'best_score': max(scores) if scores else 0,
-                'sector_performance': sector_stats,
-                'top_skills_in_demand': self._get_top_skills_in_demand(all_internships),
-                'recommendations': {
-                    'skill_gaps': self._identify_skill_gaps(profile, all_internships),
-                    'sector_suggestions': list(sector_stats.keys())[:3]
-                }
+            # Demand comes from the trigger-maintained skill counts, so it is always current
+            stats_data['top_skills_in_demand'] = self._get_top_skills_in_demand(stats_data['total_internships'])
+            skill_gaps = stats_data.pop('skill_gaps', None)  # Stored by the nightly job
+            stats_data['recommendations'] = {
+                'skill_gaps': skill_gaps if skill_gaps is not None else self._identify_skill_gaps(profile, context),
+                'sector_suggestions': list(stats_data['sector_performance'].keys())[:3]
             }
             
             return APIResponse(
@@ -566,69 +1256,120 @@ class AIMatchingAPI:
                 error_code="STATS_ERROR"
             )
     
-    def _get_top_skills_in_demand(self, internships: List[Internship], top_n: int = 10) -> List[Dict[str, Any]]:
-        """Get most frequently required skills across internships"""
-        skill_counts = {}
-        
-        for internship in internships:
-            for skill in internship.skills_required:
-                skill_counts[skill] = skill_counts.get(skill, 0) + 1
+    def _load_precomputed_stats(self, user_identifier: Union[int, str], profile: CandidateProfile,
+                                context: RequestContext) -> Optional[Dict[str, Any]]:
+        """
+        Stored stats for the user if they were computed for this profile and these weights,
+        against the current catalog version or within precomputed_stats_max_age seconds
+        """
+        stored = self.db.get_precomputed_matching_stats(user_identifier)
+        if (stored is None or stored['weights_version'] != self.matching_engine.get_weights_version()
+                or stored['profile_hash'] != profile_fingerprint(profile)):
+            return None
         
-        sorted_skills = sorted(skill_counts.items(), key=lambda x: x[1], reverse=True)
+        snapshot = context.get_catalog_snapshot()
+        current = snapshot is not None and stored['catalog_version'] == snapshot.version
+        if not current and time.time() - stored['computed_at'] > self.precomputed_stats_max_age:
+            return None
         
+        stats_data = stored['stats']
+        stats_data['precomputed'] = True
+        stats_data['computed_at'] = datetime.fromtimestamp(stored['computed_at']).isoformat()
+        return stats_data
+    
+    def _get_top_skills_in_demand(self, total_internships: int, top_n: int = 10) -> List[Dict[str, Any]]:
+        """Get most frequently required skills across active internships (precomputed counts)"""
         return [
-            {'skill': skill, 'demand_count': count, 'percentage': round(count/len(internships)*100, 1)}
-            for skill, count in sorted_skills[:top_n]
+            {'skill': skill, 'demand_count': count,
+             'percentage': round(count / total_internships * 100, 1) if total_internships else 0.0}
+            for skill, count in self.db.get_top_skills_in_demand(top_n)
         ]
     
-    def _identify_skill_gaps(self, profile: CandidateProfile, internships: List[Internship]) -> List[str]:
-        """Identify skills that would improve matching scores"""
-        user_skills = set(skill.lower() for skill in profile.skills)
-        
-        # Count missing skills in high-scoring potential matches
-        missing_skills = {}
+    def _identify_skill_gaps(self, profile: CandidateProfile, context: RequestContext, top_n: int = 5) -> List[str]:
+        """Identify the missing skills that would most improve the candidate's top recommendations"""
+        internships = context.get_internships()
+        return [impact.skill for impact in self.matching_engine.analyze_skill_gaps(profile, internships, limit=top_n)]
+    
+    @load_controlled("skill_gap_analysis")
+    def get_skill_gap_analysis(self,
+                               user_identifier: Union[int, str],
+                               top_n: int = 10,
+                               limit: int = 5,
+                               context: Optional[RequestContext] = None) -> APIResponse:
+        """
+        Estimate how adding each missing skill would change a user's top recommendations
         
-        for internship in internships:
-            required_skills = set(skill.lower() for skill in internship.skills_required)
-            missing = required_skills - user_skills
+        Args:
+            user_identifier: User ID (int) or email (str)
+            top_n: Size of the recommendation list compared before and after
+            limit: Number of skills to return
+            context: Optional request context to share memoized work with
             
-            for skill in missing:
-                missing_skills[skill] = missing_skills.get(skill, 0) + 1
-        
-        # Return top missing skills
-        sorted_missing = sorted(missing_skills.items(), key=lambda x: x[1], reverse=True)
-        return [skill.title() for skill, _ in sorted_missing[:5]]
-    
-    def health_check(self) -> APIResponse:
-        """Health check endpoint for monitoring"""
+        Returns:
+            APIResponse with skill impacts, largest average top-N score gain first
+        """
         try:
-            # Test database connection
-            test_internships = self.db.get_active_internships(limit=1)
+            context = context or self.create_context()
+            profile = context.get_profile(user_identifier)
+            if not profile:
+                return APIResponse(
+                    success=False,
+                    message="User not found",
+                    error_code="USER_NOT_FOUND"
+                )
+            
+            impacts = self.matching_engine.analyze_skill_gaps(profile, context.get_internships(), top_n, limit)
+            skill_gaps = []
+            for impact in impacts:
+                entry = shallow_dict(impact)
+                entry['top_n_score_gain'] = round(impact.top_n_score_gain, 4)
+                entry['best_score_gain'] = round(impact.best_score_gain, 4)
+                entry['rank_improvements'] = [dict(move, score=round(move['score'], 3))
+                                              for move in impact.rank_improvements]
+                skill_gaps.append(entry)
             
-            # Test AI engine
-            test_profile = CandidateProfile(
-                full_name="Test User",
-                education="Test",
-                contact_number="",
-                current_address="",
-                email="test@test.com",
-                linkedin="",
-                experience=[],
-                skills=["Python"],
-                gender="",
-                disability_status=False,
-                veteran=False
+            return APIResponse(
+                success=True,
+                data={'top_n': top_n, 'skill_gaps': skill_gaps},
+                message=f"Analyzed {len(skill_gaps)} skill gaps"
             )
             
-            test_matches = self.matching_engine.rank_internships_enhanced(test_profile, test_internships[:1], 1)
+        except Exception as e:
+            self.logger.error(f"Error analyzing skill gaps: {e}")
+            return APIResponse(
+                success=False,
+                message="Error analyzing skill gaps",
+                error_code="SKILL_GAP_ERROR"
+            )
+    
+    def health_check(self) -> APIResponse:
+        """
+        Health check endpoint for monitoring
+        
+        Answered from the health monitor's cached self-test, so it costs no database
+        query or ranking call; see get_liveness and get_readiness for probe endpoints.
+        """
+        try:
+            ready, report = self.health.readiness()
+            components = report['components']
+            data = {
+                'database_status': 'connected' if components['database']['healthy'] else 'error',
+                'ai_engine_status': 'operational' if components['ranking_engine']['healthy'] else 'error',
+                'total_active_internships': components['catalog'].get('internships', 0),
+                'catalog_version': components['catalog'].get('version'),
+                **report
+            }
+            if not ready:
+                return APIResponse(
+                    success=False,
+                    data=data,
+                    message="AI Matching Engine is not ready",
+                    error_code="HEALTH_CHECK_ERROR"
+                )
             
             return APIResponse(
                 success=True,
-                data={
-                    'database_status': 'connected',
-                    'ai_engine_status': 'operational',
-                    'total_active_internships': len(test_internships)
-                },
+                data=data,
                 message="AI Matching Engine is healthy"
             )
             
@@ -639,6 +1380,112 @@ class AIMatchingAPI:
                 message="Health check failed",
                 error_code="HEALTH_CHECK_ERROR"
             )
+    
+    def get_liveness(self) -> APIResponse:
+        """Liveness probe: the process is up and serving; touches no dependencies"""
+        return APIResponse(
+            success=True,
+            data=self.health.liveness(),
+            message="AI Matching Engine is alive"
+        )
+    
+    def get_readiness(self) -> APIResponse:
+        """Readiness probe: every component passed the latest background self-test, and it is recent"""
+        try:
+            ready, report = self.health.readiness()
+            return APIResponse(
+                success=ready,
+                data=report,
+                message="AI Matching Engine is ready" if ready else "AI Matching Engine is not ready",
+                error_code=None if ready else "NOT_READY"
+            )
+            
+        except Exception as e:
+            self.logger.error(f"Readiness check failed: {e}")
+            return APIResponse(
+                success=False,
+                message="Readiness check failed",
+                error_code="NOT_READY"
+            )
+    
+    def get_prometheus_metrics(self) -> str:
+        """
+        Request, cache, catalog, LLM, health and load metrics in Prometheus text format
+        
+        Reads only in-memory state; scraping never queries the database.
+        """
+        prefix = METRICS_PREFIX
+        lines = self.request_metrics.prometheus_lines(prefix)
+        
+        cache = self.recommendation_cache.snapshot()
+        lines += prometheus_metric(f"{prefix}_recommendation_cache_entries", "gauge",
+                                   "Cached recommendation results", [(None, cache['size'])])
+        lines += prometheus_metric(f"{prefix}_recommendation_cache_max_entries", "gauge",
+                                   "Recommendation cache capacity", [(None, cache['max_entries'])])
+        lines += prometheus_metric(f"{prefix}_recommendation_cache_lookups_total", "counter",
+                                   "Recommendation cache lookups by result",
+                                   [({'result': 'hit'}, cache['hits']), ({'result': 'miss'}, cache['misses'])])
+        lines += prometheus_metric(f"{prefix}_recommendation_cache_evictions_total", "counter",
+                                   "Entries evicted by the LRU bound", [(None, cache['evictions'])])
+        lines += prometheus_metric(f"{prefix}_recommendation_cache_invalidations_total", "counter",
+                                   "Entries dropped by profile, preference or catalog changes",
+                                   [(None, cache['invalidations'])])
+        lines += prometheus_metric(f"{prefix}_features_cache_entries", "gauge",
+                                   "Catalogs with precomputed ranking features",
+                                   [(None, self.matching_engine.get_features_cache_size())])
+        
+        snapshot = self.catalog.peek()  # Never trigger a load from a scrape
+        if snapshot is not None:
+            lines += prometheus_metric(f"{prefix}_catalog_version", "gauge",
+                                       "Catalog version currently served", [(None, snapshot.version or 0)])
+            lines += prometheus_metric(f"{prefix}_catalog_internships", "gauge",
+                                       "Active internships in the served catalog", [(None, len(snapshot.internships))])
+            lines += prometheus_metric(f"{prefix}_catalog_age_seconds", "gauge",
+                                       "Seconds since the served catalog was loaded",
+                                       [(None, round(time.time() - snapshot.loaded_at, 3))])
+        lines += prometheus_metric(f"{prefix}_catalog_refreshes_total", "counter",
+                                   "Catalog snapshots loaded", [(None, self.catalog.refresh_count)])
+        
+        llm = self.matching_engine.preference_processor.metrics
+        llm_counters = llm.snapshot()
+        lines += prometheus_metric(f"{prefix}_llm_calls_total", "counter", "LLM API calls by outcome",
+                                   [({'outcome': 'success'}, llm_counters['calls'] - llm_counters['call_errors']),
+                                    ({'outcome': 'error'}, llm_counters['call_errors'])])
+        lines += prometheus_metric(f"{prefix}_llm_fallbacks_total", "counter",
+                                   "Fallbacks to rule-based preference extraction",
+                                   [(None, llm_counters['fallback_total'])])
+        name = f"{prefix}_llm_call_duration_seconds"
+        lines += [f"# HELP {name} LLM API call latency", f"# TYPE {name} histogram"]
+        lines += llm.call_latency.prometheus_lines(name)
+        
+        if self.health.last_run is not None:
+            status = self.health.status()
+            lines += prometheus_metric(f"{prefix}_component_up", "gauge",
+                                       "1 if the component passed the latest health self-test",
+                                       [({'component': name}, int(component.healthy))
+                                        for name, component in status.items()])
+            lines += prometheus_metric(f"{prefix}_health_self_test_age_seconds", "gauge",
+                                       "Seconds since the latest health self-test",
+                                       [(None, round(time.time() - self.health.last_run, 3))])
+        admission = self.admission.snapshot()
+        lines += prometheus_metric(f"{prefix}_admission_running", "gauge",
+                                   "Requests holding an admission slot", [(None, admission['running'])])
+        lines += prometheus_metric(f"{prefix}_admission_waiting", "gauge",
+                                   "Requests queued for an admission slot", [(None, admission['waiting'])])
+        lines += prometheus_metric(f"{prefix}_admission_decisions_total", "counter",
+                                   "Admission outcomes; shed requests were answered with OVERLOADED",
+                                   [({'outcome': 'admitted'}, admission['admitted']),
+                                    ({'outcome': 'rejected'}, admission['rejected']),
+                                    ({'outcome': 'timed_out'}, admission['timed_out'])])
+        coalescing = self.single_flight.snapshot()
+        lines += prometheus_metric(f"{prefix}_coalesced_calls_total", "counter",
+                                   "Calls by whether they ran or shared a concurrent identical call",
+                                   [({'result': 'executed'}, coalescing['executions']),
+                                    ({'result': 'shared'}, coalescing['shared'])])
+        lines += self.tracer.prometheus_lines(prefix)
+        lines += prometheus_metric(f"{prefix}_uptime_seconds", "gauge", "Seconds since the API was created",
+                                   [(None, round(time.time() - self.health.started_at, 3))])
+        return "\n".join(lines) + "\n"
 
 
 # Flask/FastAPI integration examples
@@ -647,10 +1494,46 @@ def create_flask_routes(api_instance: AIMatchingAPI):
     Example Flask routes for easy backend integration
     Backend developers can use these as templates
     """
-    from flask import Flask, request, jsonify
+    from dataclasses import replace
+    from flask import Flask, Response, g, request
+    from werkzeug.wsgi import ClosingIterator
     
     app = Flask(__name__)
     
+    @app.before_request
+    def start_timer():
+        g.request_started = time.perf_counter()
+        # ?timings=true traces this request and returns its stage breakdown; otherwise sampled
+        g.trace, g.trace_token = api_instance.tracer.start(force=request.args.get('timings', '').lower() == 'true')
+    
+    @app.teardown_request
+    def finish_trace(error):
+        api_instance.tracer.finish(g.pop('trace', None), g.pop('trace_token', None))
+    
+    @app.after_request
+    def record_request(response):
+        # Streamed responses are timed until their headers are ready
+        route = route_template(request.url_rule.rule) if request.url_rule is not None else "unmatched"
+        api_instance.request_metrics.observe(request.method, route, response.status_code,
+                                             time.perf_counter() - g.request_started)
+        return response
+    
+    def respond(result: APIResponse, status: int = 200):
+        trace = current_trace()
+        if trace is not None and trace.forced:
+            result = replace(result, timings=trace.timings())
+        retry_after = None
+        if result.error_code == "OVERLOADED":
+            status, retry_after = 503, RETRY_AFTER_SECONDS
+        # Serialized without deep copies; GETs get an ETag and 304 on If-None-Match, large bodies are gzipped
+        with span("serialization"):
+            rendered = render_response(result, status,
+                                       method=request.method,
+                                       if_none_match=request.headers.get('If-None-Match'),
+                                       accept_encoding=request.headers.get('Accept-Encoding'),
+                                       retry_after=retry_after)
+        return Response(rendered.body, status=rendered.status, headers=rendered.headers)
+    
     @app.route('/api/ai/recommendations/<int:user_id>', methods=['GET'])
     def get_recommendations(user_id):
         natural_input = request.args.get('query', '')
@@ -658,7 +1541,41 @@ def create_flask_routes(api_instance: AIMatchingAPI):
         sector = request.args.get('sector', None)
         
         result = api_instance.get_recommendations_by_user_id(user_id, natural_input, top_n, sector)
-        return jsonify(asdict(result))
+        return respond(result)
+    
+    @app.route('/api/ai/recommendations/<int:user_id>/page', methods=['GET'])
+    def get_recommendations_page(user_id):
+        natural_input = request.args.get('query', '')
+        limit = request.args.get('limit', 10)
+        sector = request.args.get('sector', None)
+        cursor = request.args.get('cursor')
+        
+        result = api_instance.get_recommendations_page(user_id, natural_input, limit, sector, cursor)
+        return respond(result)
+    
+    @app.route('/api/ai/recommendations/batch', methods=['POST'])
+    def get_recommendations_batch():
+        data = request.get_json(silent=True) or {}
+        user_ids = data.get('user_ids', [])
+        top_n = int(data.get('top_n', 10))
+        sector = data.get('sector')
+        
+        # ?stream=true sends one JSON line per user as soon as it is ranked
+        stream = request.args.get('stream', 'false').lower() == 'true'
+        if stream and api_instance._valid_user_ids(user_ids):
+            results = api_instance.stream_recommendations_batch(user_ids, top_n, sector)
+            if isinstance(results, APIResponse):
+                return respond(results)
+            
+            def generate():
+                for user_id, result in results:
+                    yield encode_json(api_instance._batch_entry(user_id, result)) + b"\n"
+            
+            # Werkzeug closes the response iterable even if the client disconnects, which frees the slot
+            return Response(ClosingIterator(generate(), results.close), mimetype='application/x-ndjson')
+        
+        result = api_instance.get_recommendations_batch(user_ids, top_n, sector)
+        return respond(result)
     
     @app.route('/api/ai/process-query', methods=['POST'])
     def process_query():
@@ -666,32 +1583,84 @@ def create_flask_routes(api_instance: AIMatchingAPI):
         query = data.get('query', '')
         
         result = api_instance.process_natural_language_query(query)
-        return jsonify(asdict(result))
+        return respond(result)
     
     @app.route('/api/ai/profile/<int:user_id>', methods=['GET'])
     def get_profile(user_id):
         result = api_instance.get_user_profile(user_id)
-        return jsonify(asdict(result))
+        return respond(result)
     
     @app.route('/api/ai/internships', methods=['GET'])
     def get_internships():
         sector = request.args.get('sector')
         location = request.args.get('location')
+        duration = request.args.get('duration')
         remote_only = request.args.get('remote_only', 'false').lower() == 'true'
         limit = int(request.args.get('limit', 50))
         
-        result = api_instance.get_internships_by_criteria(sector, location, None, remote_only, limit)
-        return jsonify(asdict(result))
+        result = api_instance.get_internships_by_criteria(sector, location, duration, remote_only, limit)
+        return respond(result)
+    
+    @app.route('/api/ai/internships/page', methods=['GET'])
+    def get_internships_page():
+        limit = request.args.get('limit', 50)
+        cursor = request.args.get('cursor')
+        sector = request.args.get('sector')
+        
+        result = api_instance.get_internships_page(limit, cursor, sector)
+        return respond(result)
     
     @app.route('/api/ai/stats/<int:user_id>', methods=['GET'])
     def get_stats(user_id):
         result = api_instance.get_matching_stats(user_id)
-        return jsonify(asdict(result))
+        return respond(result)
+    
+    @app.route('/api/ai/skill-gaps/<int:user_id>', methods=['GET'])
+    def get_skill_gaps(user_id):
+        top_n = int(request.args.get('top_n', 10))
+        limit = int(request.args.get('limit', 5))
+        
+        result = api_instance.get_skill_gap_analysis(user_id, top_n, limit)
+        return respond(result)
+    
+    @app.route('/api/ai/metrics/llm', methods=['GET'])
+    def get_llm_metrics():
+        result = api_instance.get_llm_metrics()
+        return respond(result)
+    
+    @app.route('/api/ai/metrics/traces', methods=['GET'])
+    def get_trace_metrics():
+        result = api_instance.get_trace_metrics()
+        return respond(result)
+    
+    @app.route('/api/ai/metrics/load', methods=['GET'])
+    def get_load_metrics():
+        result = api_instance.get_load_metrics()
+        return respond(result)
+    
+    @app.route('/api/ai/metrics/cache', methods=['GET'])
+    def get_cache_metrics():
+        result = api_instance.get_cache_metrics()
+        return respond(result)
     
     @app.route('/api/ai/health', methods=['GET'])
     def health_check():
         result = api_instance.health_check()
-        return jsonify(asdict(result))
+        return respond(result)
+    
+    @app.route('/api/ai/health/live', methods=['GET'])
+    def liveness():
+        result = api_instance.get_liveness()
+        return respond(result)
+    
+    @app.route('/api/ai/health/ready', methods=['GET'])
+    def readiness():
+        result = api_instance.get_readiness()
+        return respond(result, 200 if result.success else 503)
+    
+    @app.route('/api/ai/metrics', methods=['GET'])
+    def prometheus_metrics():
+        return Response(api_instance.get_prometheus_metrics(), content_type=PROMETHEUS_CONTENT_TYPE)
     
     return app
 
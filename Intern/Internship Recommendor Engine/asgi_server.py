@@ -0,0 +1,619 @@
+"""
+ASGI Server for the AI Internship Matching Engine
+Features:
+1. Async counterpart of create_flask_routes: same routes, parameters and JSON bodies
+2. Handlers await database/scoring and LLM work on separate executors, so a slow LLM
+   call holds a coroutine instead of a server worker
+3. Independent concurrency limits for database and LLM work
+4. Lifespan startup and graceful shutdown that drains in-flight requests
+5. Benchmark against the Flask app with simulated LLM latency
+
+Usage:
+    uvicorn --factory asgi_server:create_asgi_app
+    python asgi_server.py [--host HOST] [--port PORT]
+    python asgi_server.py --benchmark [--requests N] [--concurrency N] [--flask-workers N] [--llm-latency S]
+"""
+
+import argparse
+import asyncio
+import contextvars
+import functools
+import json
+import logging
+import re
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, replace
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl
+
+from api_interface import AIMatchingAPI, APIResponse, RequestContext
+from metrics import PROMETHEUS_CONTENT_TYPE, route_template
+from tracing import current_trace, span
+from response_serializer import encode_json, render_response
+from load_control import RETRY_AFTER_SECONDS
+
+NDJSON_HEADERS = [(b"content-type", b"application/x-ndjson")]
+PROMETHEUS_HEADERS = [(b"content-type", PROMETHEUS_CONTENT_TYPE.encode("latin-1"))]
+
+
+@dataclass
+class Request:
+    """The parts of an ASGI HTTP request the handlers use"""
+    method: str
+    path: str
+    args: Dict[str, str]
+    body: bytes = b""
+    path_params: Dict[str, str] = field(default_factory=dict)
+    headers: Dict[str, str] = field(default_factory=dict)  # Lower-cased names
+
+    def json(self) -> Any:
+        """Parsed JSON body, or None if it is missing or malformed (like Flask's get_json(silent=True))"""
+        try:
+            return json.loads(self.body) if self.body else None
+        except ValueError:
+            return None
+
+
+class BadRequest(Exception):
+    """Raised by handlers for malformed parameters; answered with 400 INVALID_REQUEST"""
+
+
+class AsyncMatchingServer:
+    """
+    ASGI application serving the AIMatchingAPI routes
+
+    AIMatchingAPI is synchronous, so each handler splits its work into steps and
+    awaits them on bounded executors: database reads and scoring on the database
+    pool, natural language extraction on the LLM pool. Waiting requests queue on
+    semaphores rather than threads, so hundreds can be in flight at once.
+    """
+
+    def __init__(self,
+                 api_instance: AIMatchingAPI,
+                 db_concurrency: int = 16,
+                 llm_concurrency: int = 32,
+                 shutdown_timeout: float = 30.0):
+        """
+        Args:
+            api_instance: API to serve
+            db_concurrency: Database/scoring steps running at once (threads and pooled connections)
+            llm_concurrency: Preference extraction calls running at once
+            shutdown_timeout: Seconds to wait for in-flight requests on shutdown
+        """
+        self.api = api_instance
+        self.db_concurrency = db_concurrency
+        self.llm_concurrency = llm_concurrency
+        self.shutdown_timeout = shutdown_timeout
+        self.logger = logging.getLogger(__name__)
+
+        self.db_executor: Optional[ThreadPoolExecutor] = None
+        self.llm_executor: Optional[ThreadPoolExecutor] = None
+        self._db_slots: Optional[asyncio.Semaphore] = None
+        self._llm_slots: Optional[asyncio.Semaphore] = None
+        self._idle: Optional[asyncio.Event] = None
+        self.in_flight = 0
+        self.accepting = False
+
+        self.routes: List[Tuple[str, re.Pattern, Callable[[Request, Callable], Awaitable[Optional[APIResponse]]]]] = [
+            ('GET', re.compile(r'/api/ai/recommendations/(?P<user_id>\d+)'), self.get_recommendations),
+            ('GET', re.compile(r'/api/ai/recommendations/(?P<user_id>\d+)/page'), self.get_recommendations_page),
+            ('POST', re.compile(r'/api/ai/recommendations/batch'), self.get_recommendations_batch),
+            ('POST', re.compile(r'/api/ai/process-query'), self.process_query),
+            ('GET', re.compile(r'/api/ai/profile/(?P<user_id>\d+)'), self.get_profile),
+            ('GET', re.compile(r'/api/ai/internships'), self.get_internships),
+            ('GET', re.compile(r'/api/ai/internships/page'), self.get_internships_page),
+            ('GET', re.compile(r'/api/ai/stats/(?P<user_id>\d+)'), self.get_stats),
+            ('GET', re.compile(r'/api/ai/skill-gaps/(?P<user_id>\d+)'), self.get_skill_gaps),
+            ('GET', re.compile(r'/api/ai/metrics/llm'), self.get_llm_metrics),
+            ('GET', re.compile(r'/api/ai/metrics/traces'), self.get_trace_metrics),
+            ('GET', re.compile(r'/api/ai/metrics/load'), self.get_load_metrics),
+            ('GET', re.compile(r'/api/ai/metrics/cache'), self.get_cache_metrics),
+            ('GET', re.compile(r'/api/ai/health'), self.health_check),
+            ('GET', re.compile(r'/api/ai/health/live'), self.liveness),
+            ('GET', re.compile(r'/api/ai/health/ready'), self.readiness),
+            ('GET', re.compile(r'/api/ai/metrics'), self.prometheus_metrics),
+        ]
+        # Route templates used as metric labels, in the same form as Flask rules
+        self._route_labels = {pattern: route_template(pattern.pattern) for _, pattern, _ in self.routes}
+
+    # Lifecycle
+
+    def start(self):
+        """Create the executors and limits; called on lifespan startup or by the first request"""
+        if self.accepting:
+            return
+        self.db_executor = ThreadPoolExecutor(self.db_concurrency, thread_name_prefix="asgi-db")
+        self.llm_executor = ThreadPoolExecutor(self.llm_concurrency, thread_name_prefix="asgi-llm")
+        self._db_slots = asyncio.Semaphore(self.db_concurrency)
+        self._llm_slots = asyncio.Semaphore(self.llm_concurrency)
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self.accepting = True
+
+    async def shutdown(self):
+        """Stop accepting requests, wait for in-flight ones to finish, then stop the executors"""
+        if not self.accepting:
+            return
+        self.accepting = False
+
+        try:
+            await asyncio.wait_for(self._idle.wait(), self.shutdown_timeout)
+        except asyncio.TimeoutError:
+            self.logger.warning(f"Shutting down with {self.in_flight} requests still in flight")
+
+        loop = asyncio.get_running_loop()
+        for executor in (self.db_executor, self.llm_executor):
+            await loop.run_in_executor(None, functools.partial(executor.shutdown, cancel_futures=True))
+        self.api.catalog.close()
+        self.api.health.close()
+        self.logger.info("ASGI server shut down")
+
+    async def run_db(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run a blocking database/scoring step within the database concurrency limit"""
+        async with self._db_slots:
+            loop = asyncio.get_running_loop()
+            # The executor thread runs in a copy of this request's context, so its spans join the trace
+            return await loop.run_in_executor(self.db_executor, functools.partial(
+                contextvars.copy_context().run, func, *args, **kwargs))
+
+    async def run_llm(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run a blocking preference extraction step within the LLM concurrency limit"""
+        async with self._llm_slots:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.llm_executor, functools.partial(
+                contextvars.copy_context().run, func, *args, **kwargs))
+
+    async def _admitted(self, context: RequestContext, operation: str, natural_input: str,
+                        func: Callable[..., APIResponse], *args) -> APIResponse:
+        """Take the request's admission slot, extract its preferences on the LLM pool, then run func"""
+        shed = await self.run_db(self.api.admit, context, operation)
+        if shed is not None:
+            return shed
+        try:
+            await self.run_llm(context.extract_preferences, natural_input)
+            return await self.run_db(func, *args)
+        finally:
+            self.api.release_admission(context)
+
+    # ASGI entry point
+
+    async def __call__(self, scope: Dict[str, Any], receive: Callable, send: Callable):
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+        elif scope['type'] == 'http':
+            await self._http(scope, receive, send)
+
+    async def _lifespan(self, receive: Callable, send: Callable):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                self.start()
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await self.shutdown()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def _http(self, scope: Dict[str, Any], receive: Callable, send: Callable):
+        if self._idle is None:
+            self.start()  # Servers that do not send lifespan events
+        if not self.accepting:
+            await self._send_json(send, 503, APIResponse(
+                success=False, message="Server is shutting down", error_code="SHUTTING_DOWN"))
+            return
+
+        self.in_flight += 1
+        self._idle.clear()
+        started = time.perf_counter()
+        status = 500
+
+        async def send_and_record_status(message):
+            nonlocal status
+            if message['type'] == 'http.response.start':
+                status = message['status']
+            await send(message)
+
+        # ?timings=true traces this request and returns its stage breakdown; otherwise sampled
+        forced = any(name == 'timings' and value.lower() == 'true'
+                     for name, value in parse_qsl(scope.get('query_string', b'').decode('latin-1')))
+        trace, trace_token = self.api.tracer.start(force=forced)
+        route = "unmatched"
+        try:
+            route = await self._dispatch(scope, receive, send_and_record_status)
+        finally:
+            self.api.tracer.finish(trace, trace_token)
+            # Streamed responses are timed until their last chunk is sent
+            self.api.request_metrics.observe(scope['method'], route, status, time.perf_counter() - started)
+            self.in_flight -= 1
+            if self.in_flight == 0:
+                self._idle.set()
+
+    async def _dispatch(self, scope: Dict[str, Any], receive: Callable, send: Callable) -> str:
+        """Route and answer one request; returns the matched route template for metrics"""
+        path = scope['path'].rstrip('/') or '/'
+        allowed = []
+        for method, pattern, handler in self.routes:
+            match = pattern.fullmatch(path)
+            if match is None:
+                continue
+            if method != scope['method']:
+                allowed.append(method)
+                continue
+
+            route = self._route_labels[pattern]
+            request = Request(
+                method=scope['method'],
+                path=path,
+                args=dict(parse_qsl(scope.get('query_string', b'').decode('latin-1'))),
+                body=await self._read_body(receive),
+                path_params=match.groupdict(),
+                headers={name.decode('latin-1').lower(): value.decode('latin-1')
+                         for name, value in scope.get('headers', [])}
+            )
+            try:
+                result = await handler(request, send)
+            except BadRequest as e:
+                result = APIResponse(success=False, message=str(e), error_code="INVALID_REQUEST")
+                await self._send_json(send, 400, result, request)
+                return route
+            except Exception as e:
+                self.logger.error(f"Error handling {scope['method']} {path}: {e}")
+                await self._send_json(send, 500, APIResponse(
+                    success=False, message="Internal server error", error_code="INTERNAL_ERROR"), request)
+                return route
+
+            if result is not None:  # Streaming handlers send their own response
+                await self._send_json(send, 200, result, request)
+            return route
+
+        status = 405 if allowed else 404
+        message = "Method not allowed" if allowed else "Not found"
+        await self._send_json(send, status, APIResponse(success=False, message=message,
+                                                        error_code="METHOD_NOT_ALLOWED" if allowed else "NOT_FOUND"))
+        return "unmatched"
+
+    @staticmethod
+    async def _read_body(receive: Callable) -> bytes:
+        chunks = []
+        while True:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                break
+            chunks.append(message.get('body', b''))
+            if not message.get('more_body', False):
+                break
+        return b''.join(chunks)
+
+    @staticmethod
+    async def _send_json(send: Callable, status: int, result: APIResponse, request: Optional[Request] = None):
+        trace = current_trace()
+        if trace is not None and trace.forced:
+            result = replace(result, timings=trace.timings())
+        retry_after = None
+        if result.error_code == "OVERLOADED":
+            status, retry_after = 503, RETRY_AFTER_SECONDS
+        # Same conditional GET, gzip and overload handling as the Flask routes
+        headers = request.headers if request is not None else {}
+        with span("serialization"):
+            rendered = render_response(result, status,
+                                       method=request.method if request is not None else 'GET',
+                                       if_none_match=headers.get('if-none-match'),
+                                       accept_encoding=headers.get('accept-encoding'),
+                                       retry_after=retry_after)
+        await send({'type': 'http.response.start', 'status': rendered.status,
+                    'headers': [(name.lower().encode('latin-1'), value.encode('latin-1'))
+                                for name, value in rendered.headers]})
+        await send({'type': 'http.response.body', 'body': rendered.body})
+
+    @staticmethod
+    def _int_arg(request: Request, name: str, default: int) -> int:
+        try:
+            return int(request.args.get(name, default))
+        except (TypeError, ValueError):
+            raise BadRequest(f"{name} must be an integer")
+
+    # Route handlers (same parameters as create_flask_routes)
+
+    async def get_recommendations(self, request: Request, send: Callable) -> APIResponse:
+        user_id = int(request.path_params['user_id'])
+        natural_input = request.args.get('query', '')
+        top_n = self._int_arg(request, 'top_n', 10)
+        sector = request.args.get('sector')
+
+        # Unknown users and cached results never reach the LLM or the ranking step
+        context = self.api.create_context()
+        result = await self.run_db(self.api.peek_recommendations, user_id, natural_input, top_n, sector, context)
+        if result is not None:
+            return result
+
+        if not natural_input:
+            return await self.run_db(self.api.get_recommendations_by_user_id,
+                                     user_id, natural_input, top_n, sector, context)
+        # Admission comes before the LLM call so an overloaded server sheds the request before its costliest step
+        return await self._admitted(context, "recommendations_by_user_id", natural_input,
+                                    self.api.get_recommendations_by_user_id,
+                                    user_id, natural_input, top_n, sector, context)
+
+    async def get_recommendations_page(self, request: Request, send: Callable) -> APIResponse:
+        user_id = int(request.path_params['user_id'])
+        natural_input = request.args.get('query', '')
+        limit = self._int_arg(request, 'limit', 10)
+        cursor = request.args.get('cursor')
+
+        # Only the first page ranks, so only the first page waits on preference extraction
+        context = self.api.create_context()
+        if not natural_input or cursor:
+            return await self.run_db(self.api.get_recommendations_page, user_id, natural_input, limit,
+                                     request.args.get('sector'), cursor, context)
+        return await self._admitted(context, "recommendations_page", natural_input,
+                                    self.api.get_recommendations_page, user_id, natural_input, limit,
+                                    request.args.get('sector'), cursor, context)
+
+    async def get_recommendations_batch(self, request: Request, send: Callable) -> Optional[APIResponse]:
+        data = request.json() or {}
+        user_ids = data.get('user_ids', [])
+        try:
+            top_n = int(data.get('top_n', 10))
+        except (TypeError, ValueError):
+            raise BadRequest("top_n must be an integer")
+        sector = data.get('sector')
+
+        if request.args.get('stream', 'false').lower() == 'true' and self.api._valid_user_ids(user_ids):
+            # Admitted (or shed) before the 200 goes out; the slot is held until the stream ends
+            iterator = await self.run_db(self.api.stream_recommendations_batch, user_ids, top_n, sector)
+            if isinstance(iterator, APIResponse):
+                return iterator
+            # One JSON line per user; each user is ranked in its own database step so others interleave
+            try:
+                await send({'type': 'http.response.start', 'status': 200, 'headers': NDJSON_HEADERS})
+                while True:
+                    item = await self.run_db(next, iterator, None)
+                    if item is None:
+                        break
+                    line = encode_json(self.api._batch_entry(*item)) + b"\n"
+                    await send({'type': 'http.response.body', 'body': line, 'more_body': True})
+                await send({'type': 'http.response.body', 'body': b''})
+            finally:
+                iterator.close()
+            return None
+
+        return await self.run_db(self.api.get_recommendations_batch, user_ids, top_n, sector)
+
+    async def process_query(self, request: Request, send: Callable) -> APIResponse:
+        data = request.json() or {}
+        return await self.run_llm(self.api.process_natural_language_query, data.get('query', ''))
+
+    async def get_profile(self, request: Request, send: Callable) -> APIResponse:
+        return await self.run_db(self.api.get_user_profile, int(request.path_params['user_id']))
+
+    async def get_internships(self, request: Request, send: Callable) -> APIResponse:
+        args = request.args
+        remote_only = args.get('remote_only', 'false').lower() == 'true'
+        limit = self._int_arg(request, 'limit', 50)
+        return await self.run_db(self.api.get_internships_by_criteria, args.get('sector'), args.get('location'),
+                                 args.get('duration'), remote_only, limit)
+
+    async def get_internships_page(self, request: Request, send: Callable) -> APIResponse:
+        limit = self._int_arg(request, 'limit', 50)
+        return await self.run_db(self.api.get_internships_page, limit, request.args.get('cursor'),
+                                 request.args.get('sector'))
+
+    async def get_stats(self, request: Request, send: Callable) -> APIResponse:
+        return await self.run_db(self.api.get_matching_stats, int(request.path_params['user_id']))
+
+    async def get_skill_gaps(self, request: Request, send: Callable) -> APIResponse:
+        top_n = self._int_arg(request, 'top_n', 10)
+        limit = self._int_arg(request, 'limit', 5)
+        return await self.run_db(self.api.get_skill_gap_analysis, int(request.path_params['user_id']), top_n, limit)
+
+    async def get_llm_metrics(self, request: Request, send: Callable) -> APIResponse:
+        return self.api.get_llm_metrics()
+
+    async def get_trace_metrics(self, request: Request, send: Callable) -> APIResponse:
+        return self.api.get_trace_metrics()
+
+    async def get_load_metrics(self, request: Request, send: Callable) -> APIResponse:
+        return self.api.get_load_metrics()
+
+    async def get_cache_metrics(self, request: Request, send: Callable) -> APIResponse:
+        return self.api.get_cache_metrics()
+
+    async def health_check(self, request: Request, send: Callable) -> APIResponse:
+        return await self._cached_health(self.api.health_check)
+
+    async def liveness(self, request: Request, send: Callable) -> APIResponse:
+        return self.api.get_liveness()
+
+    async def readiness(self, request: Request, send: Callable) -> Optional[APIResponse]:
+        result = await self._cached_health(self.api.get_readiness)
+        if result.success:
+            return result
+        await self._send_json(send, 503, result, request)
+        return None
+
+    async def _cached_health(self, check: Callable[[], APIResponse]) -> APIResponse:
+        # Health reads are in-memory once the first self-test has run; only that one needs a thread
+        if self.api.health.last_run is not None:
+            return check()
+        return await self.run_db(check)
+
+    async def prometheus_metrics(self, request: Request, send: Callable) -> None:
+        body = self.api.get_prometheus_metrics().encode('utf-8')
+        await send({'type': 'http.response.start', 'status': 200, 'headers': PROMETHEUS_HEADERS})
+        await send({'type': 'http.response.body', 'body': body})
+
+
+def create_asgi_app(api_instance: Optional[AIMatchingAPI] = None, **server_options) -> AsyncMatchingServer:
+    """
+    Async counterpart of create_flask_routes
+
+    Args:
+        api_instance: API to serve; a default AIMatchingAPI is created when omitted
+        **server_options: db_concurrency, llm_concurrency, shutdown_timeout
+    """
+    return AsyncMatchingServer(api_instance or AIMatchingAPI(), **server_options)
+
+
+async def asgi_request(app: Callable, method: str, path: str, query: str = "",
+                       body: Any = None, headers: Optional[Dict[str, str]] = None) -> Tuple[int, bytes]:
+    """
+    Call an ASGI app in-process and return (status, body)
+
+    Used by the benchmark and tests in place of a network client.
+    """
+    payload = json.dumps(body).encode('utf-8') if body is not None else b''
+    scope = {'type': 'http', 'method': method, 'path': path, 'query_string': query.encode('latin-1'),
+             'headers': [(b'content-type', b'application/json')] +
+                        [(name.lower().encode('latin-1'), value.encode('latin-1'))
+                         for name, value in (headers or {}).items()]}
+    sent = False
+    status, chunks = 500, []
+
+    async def receive():
+        nonlocal sent
+        if sent:
+            await asyncio.Event().wait()  # No more request body; wait like a live connection
+        sent = True
+        return {'type': 'http.request', 'body': payload, 'more_body': False}
+
+    async def send(message):
+        nonlocal status
+        if message['type'] == 'http.response.start':
+            status = message['status']
+        elif message['type'] == 'http.response.body':
+            chunks.append(message.get('body', b''))
+
+    await app(scope, receive, send)
+    return status, b''.join(chunks)
+
+
+def _simulate_llm_latency(api_instance: AIMatchingAPI, seconds: float):
+    """Make preference extraction take `seconds`, standing in for a remote LLM call"""
+    processor = api_instance.matching_engine.preference_processor
+    extract = processor.process_natural_language_preferences
+
+    def slow_extract(text):
+        time.sleep(seconds)
+        return extract(text)
+
+    processor.process_natural_language_preferences = slow_extract
+
+
+def _latency_summary(name: str, latencies: List[float], elapsed: float) -> Dict[str, Any]:
+    ordered = sorted(latencies)
+    return {
+        'server': name,
+        'requests': len(ordered),
+        'seconds': round(elapsed, 3),
+        'requests_per_second': round(len(ordered) / elapsed, 1) if elapsed else 0.0,
+        'p50_ms': round(statistics.median(ordered) * 1000, 1),
+        'p95_ms': round(ordered[int(len(ordered) * 0.95) - 1] * 1000, 1)
+    }
+
+
+def run_benchmark(db_path: Optional[str] = None,
+                  requests: int = 200,
+                  concurrency: int = 100,
+                  flask_workers: int = 8,
+                  llm_latency: float = 0.2) -> List[Dict[str, Any]]:
+    """
+    Send the same recommendation requests (with a natural language query) from
+    `concurrency` clients to the Flask app handled by flask_workers workers and
+    to the ASGI app
+
+    The recommendation cache is disabled on both sides so every request ranks.
+    """
+    import os
+    import tempfile
+    from api_interface import create_flask_routes
+    from database_integration import DatabaseConnector
+
+    db = DatabaseConnector(db_path or os.path.join(tempfile.mkdtemp(), "asgi_benchmark.db"),
+                           seed_sample_data=db_path is None)
+    paths = [(f"/api/ai/recommendations/{1 + i % 3}", f"query=remote+python+internship+{i}&top_n=5")
+             for i in range(requests)]
+    results = []
+
+    # Flask: the same clients, but only flask_workers requests are handled at a time,
+    # like a WSGI server with that many sync workers; waiting for a worker counts as latency
+    flask_api = AIMatchingAPI(db, use_llm=False, recommendation_cache_size=0)
+    _simulate_llm_latency(flask_api, llm_latency)
+    flask_app = create_flask_routes(flask_api)
+    workers = threading.BoundedSemaphore(flask_workers)
+
+    def flask_call(item):
+        path, query = item
+        call_start = time.perf_counter()
+        with workers:
+            flask_app.test_client().get(f"{path}?{query}")
+        return time.perf_counter() - call_start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as clients:
+        latencies = list(clients.map(flask_call, paths))
+    results.append(_latency_summary(f"flask ({flask_workers} workers)", latencies, time.perf_counter() - start))
+
+    # ASGI: one event loop, up to `concurrency` requests in flight
+    asgi_api = AIMatchingAPI(db, use_llm=False, recommendation_cache_size=0)
+    _simulate_llm_latency(asgi_api, llm_latency)
+    server = create_asgi_app(asgi_api)
+
+    async def drive():
+        server.start()
+        slots = asyncio.Semaphore(concurrency)
+
+        async def call(item):
+            path, query = item
+            async with slots:
+                call_start = time.perf_counter()
+                await asgi_request(server, 'GET', path, query)
+                return time.perf_counter() - call_start
+
+        drive_start = time.perf_counter()
+        asgi_latencies = await asyncio.gather(*(call(item) for item in paths))
+        elapsed = time.perf_counter() - drive_start
+        await server.shutdown()
+        return asgi_latencies, elapsed
+
+    latencies, elapsed = asyncio.run(drive())
+    results.append(_latency_summary("asgi", latencies, elapsed))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the matching API over ASGI or benchmark it against Flask")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--db", help="SQLite database path (default: the API default; "
+                                     "a temporary sample database when benchmarking)")
+    parser.add_argument("--benchmark", action="store_true", help="Compare against the Flask app instead of serving")
+    parser.add_argument("--requests", type=int, default=200, help="Benchmark requests")
+    parser.add_argument("--concurrency", type=int, default=100, help="Concurrent benchmark clients")
+    parser.add_argument("--flask-workers", type=int, default=8, help="Flask worker threads")
+    parser.add_argument("--llm-latency", type=float, default=0.2, help="Simulated LLM latency in seconds")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    if args.benchmark:
+        for result in run_benchmark(args.db, args.requests, args.concurrency, args.flask_workers, args.llm_latency):
+            print(f"{result['server']:<24} {result['requests_per_second']:>8.1f} req/s  "
+                  f"p50 {result['p50_ms']:>8.1f} ms  p95 {result['p95_ms']:>8.1f} ms  ({result['seconds']}s)")
+        return 0
+
+    try:
+        import uvicorn
+    except ImportError:
+        print("uvicorn is required to serve the ASGI app: pip install uvicorn")
+        return 1
+
+    from database_integration import DatabaseConnector
+    api_instance = AIMatchingAPI(DatabaseConnector(args.db) if args.db else None)
+    uvicorn.run(create_asgi_app(api_instance), host=args.host, port=args.port, lifespan="on")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,163 @@
+"""
+Async Database Access Layer for the AI Internship Matching Engine
+Features:
+1. Awaitable versions of every public DatabaseConnector query and write
+   method for async API handlers (the pure cursor and filter helpers are
+   static and can be called on DatabaseConnector directly)
+2. Dedicated thread pool so blocking SQLite calls never run on the event loop
+3. Each pool thread keeps its own pooled WAL connection, so reads overlap
+   (sqlite3 releases the GIL while a statement runs)
+4. Async generator over active internships using keyset pages
+"""
+
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple, Union
+
+from matching_engine import CandidateProfile, Internship
+from database_integration import DatabaseConnector
+
+
+class AsyncDatabaseConnector:
+    """
+    Async facade over DatabaseConnector
+
+    Every method mirrors the synchronous one of the same name and runs it on a
+    dedicated executor, leaving the event loop free to overlap database I/O
+    with preference extraction and scoring of other requests.
+    """
+
+    def __init__(self, db: Optional[DatabaseConnector] = None, max_workers: int = 8, **connector_kwargs):
+        """
+        Args:
+            db: Existing connector to wrap; when omitted one is created from connector_kwargs
+            max_workers: Threads (and therefore SQLite connections) in the dedicated pool
+            **connector_kwargs: DatabaseConnector arguments (db_path, pragmas, seed_sample_data, ...)
+        """
+        self._owns_db = db is None
+        self.db = db or DatabaseConnector(**connector_kwargs)
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="async-db")
+
+    @classmethod
+    async def open(cls, max_workers: int = 8, **connector_kwargs) -> 'AsyncDatabaseConnector':
+        """Create a connector without blocking the event loop on schema migration"""
+        loop = asyncio.get_running_loop()
+        db = await loop.run_in_executor(None, functools.partial(DatabaseConnector, **connector_kwargs))
+        connector = cls(db, max_workers)
+        connector._owns_db = True
+        return connector
+
+    async def run(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run any blocking callable on the database executor and await its result"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, functools.partial(func, *args, **kwargs))
+
+    async def close(self):
+        """Stop the executor and, if this facade created the connector, close its connections"""
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self.executor.shutdown)
+        if self._owns_db:
+            self.db.close()
+
+    async def __aenter__(self) -> 'AsyncDatabaseConnector':
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    # Schema
+
+    async def migrate(self) -> int:
+        return await self.run(self.db.migrate)
+
+    # Profiles
+
+    async def get_user_profile_by_email(self, email: str) -> Optional[CandidateProfile]:
+        return await self.run(self.db.get_user_profile_by_email, email)
+
+    async def get_user_profile_by_id(self, user_id: int) -> Optional[CandidateProfile]:
+        return await self.run(self.db.get_user_profile_by_id, user_id)
+
+    async def get_user_profiles(self, user_ids: List[int], chunk_size: int = 5000) -> Dict[int, CandidateProfile]:
+        return await self.run(self.db.get_user_profiles, user_ids, chunk_size)
+
+    async def add_user_profile(self, profile: CandidateProfile) -> bool:
+        return await self.run(self.db.add_user_profile, profile)
+
+    async def update_user_preferences(self, email: str, preferences: Dict[str, Any]) -> bool:
+        return await self.run(self.db.update_user_preferences, email, preferences)
+
+    async def get_user_applications(self, user_id: int) -> List[Dict[str, Any]]:
+        return await self.run(self.db.get_user_applications, user_id)
+
+    async def iter_user_ids(self, batch_size: int = 5000) -> AsyncIterator[List[int]]:
+        """Yield every user ID in ascending lists, awaiting one keyset query per list"""
+        batches = self.db.iter_user_ids(batch_size)
+        while True:
+            ids = await self.run(next, batches, None)
+            if ids is None:
+                return
+            yield ids
+
+    # Internships
+
+    async def get_catalog_version(self) -> Optional[int]:
+        return await self.run(self.db.get_catalog_version)
+
+    async def load_catalog(self) -> Tuple[Optional[int], List[Internship]]:
+        return await self.run(self.db.load_catalog)
+
+    async def get_active_internships(self, limit: Optional[int] = None) -> List[Internship]:
+        return await self.run(self.db.get_active_internships, limit)
+
+    async def get_internships_by_sector(self, sector: str) -> List[Internship]:
+        return await self.run(self.db.get_internships_by_sector, sector)
+
+    async def get_top_skills_in_demand(self, top_n: int = 10,
+                                       exclude: Optional[List[str]] = None) -> List[Tuple[str, int]]:
+        return await self.run(self.db.get_top_skills_in_demand, top_n, exclude)
+
+    async def find_internships(self,
+                               sector: Optional[str] = None,
+                               location: Optional[str] = None,
+                               duration: Optional[str] = None,
+                               remote_only: bool = False,
+                               limit: Optional[int] = None) -> List[Internship]:
+        return await self.run(self.db.find_internships, sector, location, duration, remote_only, limit)
+
+    async def get_internships_page(self, limit: int = 50, cursor: Optional[str] = None,
+                                   sector: Optional[str] = None) -> Tuple[List[Internship], Optional[str]]:
+        return await self.run(self.db.get_internships_page, limit, cursor, sector)
+
+    async def iter_active_internships(self, batch_size: int = 500,
+                                      sector: Optional[str] = None) -> AsyncIterator[Internship]:
+        """Yield every active internship, newest first, awaiting one keyset page at a time"""
+        after = None
+        while True:
+            batch, after = await self.run(self.db._fetch_internship_page, batch_size, after, sector)
+            for internship in batch:
+                yield internship
+            if after is None:
+                return
+
+    # Matching statistics
+
+    async def save_matching_stats(self, rows: List[Tuple[int, Optional[int], int, str, str, float]]) -> bool:
+        return await self.run(self.db.save_matching_stats, rows)
+
+    async def get_precomputed_matching_stats(self, user_identifier: Union[int, str]) -> Optional[Dict[str, Any]]:
+        return await self.run(self.db.get_precomputed_matching_stats, user_identifier)
+
+    # Recommendation rankings
+
+    async def save_recommendation_ranking(self, ranking_id: str, user_key: str, catalog_version: Optional[int],
+                                          weights_version: int, profile_hash: str, query: Optional[str],
+                                          sector_filter: Optional[str], ranked: List[Tuple[int, float]],
+                                          ttl: float, preferences: Optional[Dict[str, Any]] = None) -> bool:
+        return await self.run(self.db.save_recommendation_ranking, ranking_id, user_key, catalog_version,
+                              weights_version, profile_hash, query, sector_filter, ranked, ttl, preferences)
+
+    async def get_recommendation_ranking_page(self, ranking_id: str, offset: int,
+                                              limit: int) -> Optional[Dict[str, Any]]:
+        return await self.run(self.db.get_recommendation_ranking_page, ranking_id, offset, limit)
@@ -0,0 +1,323 @@
+"""
+Bulk CSV Ingest for the AI Internship Matching Engine
+Features:
+1. Streams Data/candidates.csv and Data/internships.csv without loading them into memory
+2. Maps the dump formats onto the users/internships schema and splits skill lists into skill tables
+3. Idempotent upserts on the CSV ID (source_id) in large executemany batches, all in one transaction;
+   rows and skill lists that did not change are left untouched
+4. Drops the managed indexes and the skill demand and catalog version triggers for the load, rebuilds
+   the indexes once at the end, and moves the catalog version once, only if the catalog changed
+5. Reports rows per second for each file
+
+Usage: python bulk_ingest.py [--db PATH] [--candidates CSV] [--internships CSV] [--batch-size N]
+"""
+
+import argparse
+import csv
+import logging
+import os
+import sqlite3
+import time
+from dataclasses import dataclass
+from itertools import islice
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from database_integration import (DatabaseConnector, create_managed_indexes, drop_managed_indexes,
+                                  create_skill_demand_triggers, drop_skill_demand_triggers,
+                                  rebuild_skill_demand, create_catalog_version_triggers,
+                                  drop_catalog_version_triggers, bump_catalog_version)
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "Data")
+DEFAULT_CANDIDATES_CSV = os.path.join(DATA_DIR, "candidates.csv")
+DEFAULT_INTERNSHIPS_CSV = os.path.join(DATA_DIR, "internships.csv")
+
+# Candidates in the dumps have no email; users.email is required and unique, so derive a stable one
+CANDIDATE_EMAIL_TEMPLATE = "candidate-{source_id}@import.invalid"
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class IngestReport:
+    """Outcome of ingesting one CSV file"""
+    file: str
+    rows: int = 0
+    skills: int = 0
+    skipped: int = 0
+    seconds: float = 0.0
+    changed_rows: int = 0        # Rows inserted or updated with different values
+    skills_changed: bool = False  # Whether any ingested row's skill list changed
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds else 0.0
+
+    @property
+    def changed(self) -> bool:
+        return bool(self.changed_rows) or self.skills_changed
+
+
+def split_skills(text: Optional[str]) -> List[str]:
+    """Split a comma-joined skill list, trimming blanks and dropping duplicates"""
+    skills = [skill.strip() for skill in (text or "").split(',')]
+    return list(dict.fromkeys(skill for skill in skills if skill))
+
+
+def _to_int(value: Optional[str]) -> Optional[int]:
+    try:
+        return int(value.strip())
+    except (AttributeError, ValueError):
+        return None
+
+
+def _to_float(value: Optional[str]) -> Optional[float]:
+    try:
+        return float(value.strip())
+    except (AttributeError, ValueError):
+        return None
+
+
+def _clean(value: Optional[str]) -> Optional[str]:
+    value = (value or "").strip()
+    return value or None
+
+
+def candidate_row(record: Dict[str, str]) -> Optional[Tuple[tuple, List[str]]]:
+    """Map a candidates.csv record to a users row and its skills (None if it has no usable ID)"""
+    source_id = _to_int(record.get('ID'))
+    if source_id is None:
+        return None
+
+    city, state = _clean(record.get('City')), _clean(record.get('State'))
+    first_time = _clean(record.get('First_Time_Applicant'))
+    row = (
+        source_id,
+        CANDIDATE_EMAIL_TEMPLATE.format(source_id=source_id),
+        _clean(record.get('Name')) or f"Candidate {source_id}",
+        _clean(record.get('Qualifications')),
+        ", ".join(part for part in (city, state) if part),
+        state,
+        city,
+        _clean(record.get('Year_of_Study')),
+        _to_float(record.get('GPA')),
+        _clean(record.get('Rural_or_Urban')),
+        None if first_time is None else first_time.lower() in ('yes', 'y', 'true', '1'),
+    )
+    return row, split_skills(record.get('Skills'))
+
+
+def internship_row(record: Dict[str, str]) -> Optional[Tuple[tuple, List[str]]]:
+    """Map an internships.csv record to an internships row and its skills (None if it has no usable ID)"""
+    source_id = _to_int(record.get('ID'))
+    if source_id is None:
+        return None
+
+    months = _to_int(record.get('Duration_Months'))
+    row = (
+        source_id,
+        _clean(record.get('Role')) or f"Internship {source_id}",
+        _clean(record.get('Company')) or "Unknown",
+        _clean(record.get('Sector')) or "Unknown",
+        _clean(record.get('Location_City')) or _clean(record.get('Location_State')) or "Unknown",
+        f"{months} months" if months else "Unknown",
+        "Unspecified",  # The dump has no company type
+        "",             # ... and no application link
+        _to_int(record.get('Capacity')) or 1,
+        _clean(record.get('Stipend_Range')),
+        _clean(record.get('Qualification_Required')),
+        _clean(record.get('Location_State')),
+    )
+    return row, split_skills(record.get('Required_Skills'))
+
+
+USER_UPSERT = """
+    INSERT INTO users (source_id, email, full_name, education, current_address, state, city,
+                       year_of_study, gpa, rural_or_urban, first_time_applicant)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT (source_id) DO UPDATE SET
+        email = excluded.email, full_name = excluded.full_name, education = excluded.education,
+        current_address = excluded.current_address, state = excluded.state, city = excluded.city,
+        year_of_study = excluded.year_of_study, gpa = excluded.gpa,
+        rural_or_urban = excluded.rural_or_urban, first_time_applicant = excluded.first_time_applicant,
+        updated_at = CURRENT_TIMESTAMP
+    WHERE (email, full_name, education, current_address, state, city, year_of_study, gpa,
+           rural_or_urban, first_time_applicant)
+       IS NOT (excluded.email, excluded.full_name, excluded.education, excluded.current_address,
+               excluded.state, excluded.city, excluded.year_of_study, excluded.gpa,
+               excluded.rural_or_urban, excluded.first_time_applicant)
+"""
+
+INTERNSHIP_UPSERT = """
+    INSERT INTO internships (source_id, title, company_name, sector, location, duration, company_type,
+                             application_link, capacity, stipend_range, qualification_required, location_state)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT (source_id) DO UPDATE SET
+        title = excluded.title, company_name = excluded.company_name, sector = excluded.sector,
+        location = excluded.location, duration = excluded.duration, company_type = excluded.company_type,
+        application_link = excluded.application_link, capacity = excluded.capacity,
+        stipend_range = excluded.stipend_range, qualification_required = excluded.qualification_required,
+        location_state = excluded.location_state, is_active = TRUE
+    WHERE (title, company_name, sector, location, duration, company_type, application_link, capacity,
+           stipend_range, qualification_required, location_state, is_active)
+       IS NOT (excluded.title, excluded.company_name, excluded.sector, excluded.location, excluded.duration,
+               excluded.company_type, excluded.application_link, excluded.capacity, excluded.stipend_range,
+               excluded.qualification_required, excluded.location_state, TRUE)
+"""
+
+# (parent table, skill table, foreign key column, parent upsert, record mapper)
+TARGETS = {
+    'candidates': ('users', 'user_skills', 'user_id', USER_UPSERT, candidate_row),
+    'internships': ('internships', 'internship_skills', 'internship_id', INTERNSHIP_UPSERT, internship_row),
+}
+
+
+def _read_batches(path: str, batch_size: int) -> Iterator[List[Dict[str, str]]]:
+    """Stream CSV records in lists of at most batch_size"""
+    with open(path, newline='', encoding='utf-8-sig') as handle:
+        reader = csv.DictReader(handle)
+        while True:
+            batch = list(islice(reader, batch_size))
+            if not batch:
+                return
+            yield batch
+
+
+def _ingest_file(cursor: sqlite3.Cursor, kind: str, path: str, batch_size: int) -> IngestReport:
+    """
+    Upsert one CSV into its parent table and replace the skills of every ingested row
+
+    Parents are upserted batch by batch, skipping rows whose values are unchanged;
+    skills are staged in a temp table, compared with the stored lists and, if any
+    differ, merged with two set-based statements, so no per-row lookups are needed
+    while the skill table indexes are dropped.
+    """
+    parent, skill_table, foreign_key, upsert, to_row = TARGETS[kind]
+    report = IngestReport(file=path)
+    start = time.perf_counter()
+
+    stage = f"ingest_{skill_table}"
+    cursor.execute(f"CREATE TEMP TABLE IF NOT EXISTS {stage} (source_id INTEGER NOT NULL, skill_name TEXT)")
+    cursor.execute(f"DELETE FROM {stage}")
+
+    for records in _read_batches(path, batch_size):
+        parents, skills = [], []
+        for record in records:
+            mapped = to_row(record)
+            if mapped is None:
+                report.skipped += 1
+                continue
+            row, row_skills = mapped
+            parents.append(row)
+            # A NULL skill marks the row as ingested even if it lists no skills
+            skills.extend((row[0], skill) for skill in row_skills or [None])
+
+        cursor.executemany(upsert, parents)
+        report.changed_rows += max(cursor.rowcount, 0)
+        cursor.executemany(f"INSERT INTO {stage} (source_id, skill_name) VALUES (?, ?)", skills)
+        report.rows += len(parents)
+
+    stored = f"""
+        SELECT k.{foreign_key}, k.skill_name FROM {skill_table} k JOIN {parent} p ON p.id = k.{foreign_key}
+        WHERE p.source_id IN (SELECT source_id FROM {stage})
+    """
+    staged = f"""
+        SELECT p.id, s.skill_name FROM {stage} s JOIN {parent} p ON p.source_id = s.source_id
+        WHERE s.skill_name IS NOT NULL
+    """
+    # EXCEPT sorts both sides once, so the comparison needs no index
+    report.skills_changed = bool(cursor.execute(
+        f"SELECT EXISTS ({stored} EXCEPT {staged}) OR EXISTS ({staged} EXCEPT {stored})").fetchone()[0])
+    if report.skills_changed:
+        cursor.execute(f"""
+            DELETE FROM {skill_table} WHERE {foreign_key} IN (
+                SELECT p.id FROM {parent} p WHERE p.source_id IN (SELECT source_id FROM {stage})
+            )
+        """)
+        cursor.execute(f"INSERT INTO {skill_table} ({foreign_key}, skill_name) {staged}")
+        report.skills = cursor.rowcount
+    else:
+        report.skills = cursor.execute(f"SELECT COUNT(*) FROM ({staged})").fetchone()[0]
+    cursor.execute(f"DELETE FROM {stage}")
+
+    report.seconds = time.perf_counter() - start
+    return report
+
+
+def bulk_ingest(db: DatabaseConnector,
+                candidates_path: Optional[str] = None,
+                internships_path: Optional[str] = None,
+                batch_size: int = 5000) -> Dict[str, IngestReport]:
+    """
+    Ingest candidate and/or internship dumps in a single transaction
+
+    Rows are matched on their CSV ID. Re-running with the same files leaves the
+    database unchanged, including the catalog version, so catalog, recommendation
+    and stats caches stay valid.
+
+    Args:
+        db: Target database connector (schema is migrated on construction)
+        candidates_path: candidates.csv to load, or None to skip
+        internships_path: internships.csv to load, or None to skip
+        batch_size: Rows per executemany batch
+
+    Returns:
+        Mapping of 'candidates'/'internships' to their IngestReport
+    """
+    files = [(kind, path) for kind, path in (('candidates', candidates_path),
+                                             ('internships', internships_path)) if path]
+    reports = {}
+    conn = db.connections.begin()
+    cursor = conn.cursor()
+
+    try:
+        # Maintaining the secondary indexes, skill demand counts and catalog version row by row
+        # costs more than one rebuild (and would move the version once per row)
+        drop_managed_indexes(cursor)
+        drop_skill_demand_triggers(cursor)
+        drop_catalog_version_triggers(cursor)
+        for kind, path in files:
+            reports[kind] = _ingest_file(cursor, kind, path, batch_size)
+        create_managed_indexes(cursor)
+        if 'internships' in reports and reports['internships'].changed:
+            rebuild_skill_demand(cursor)
+            bump_catalog_version(cursor)
+        create_skill_demand_triggers(cursor)
+        create_catalog_version_triggers(cursor)
+        conn.commit()
+        return reports
+
+    except Exception as e:
+        logger.error(f"Bulk ingest failed, rolled back: {e}")
+        conn.rollback()
+        raise
+    finally:
+        db.connections.release(conn)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk load Data/*.csv dumps into the matching database")
+    parser.add_argument("--db", default="internship_matching.db", help="SQLite database path")
+    parser.add_argument("--candidates", default=DEFAULT_CANDIDATES_CSV, help="candidates.csv path ('' to skip)")
+    parser.add_argument("--internships", default=DEFAULT_INTERNSHIPS_CSV, help="internships.csv path ('' to skip)")
+    parser.add_argument("--batch-size", type=int, default=5000, help="Rows per executemany batch")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    db = DatabaseConnector(args.db)
+
+    start = time.perf_counter()
+    reports = bulk_ingest(db, args.candidates or None, args.internships or None, args.batch_size)
+    total = time.perf_counter() - start
+
+    for kind, report in reports.items():
+        print(f"{kind:<12} {report.rows:>9,} rows  {report.changed_rows:>9,} changed  {report.skills:>9,} skills  "
+              f"{report.skipped:>5} skipped  "
+              f"{report.seconds:7.2f}s  {report.rows_per_second:>10,.0f} rows/s")
+    print(f"Committed in {total:.2f}s (including index rebuild)")
+
+    db.close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
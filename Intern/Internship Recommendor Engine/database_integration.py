@@ -3,13 +3,558 @@ Database Integration Layer for AI Internship Matching Engine
 Provides abstraction layer for fetching user profiles and opportunities from database
 """
 
+import base64
 import json
+import os
 import sqlite3
-from typing import Dict, List, Any, Optional, Union
+import threading
+import time
+import uuid
+import weakref
+from array import array
+from typing import Dict, Iterator, List, Any, Optional, Tuple, Union
 from dataclasses import dataclass, asdict
 from datetime import datetime
 import logging
-from matching_engine import CandidateProfile, Internship
+from matching_engine import CandidateProfile, Internship, parse_stipend_range
+from tracing import traced
+
+
+def _create_initial_schema(cursor: sqlite3.Cursor):
+    """Migration 1: tables of the original schema (IF NOT EXISTS adopts older databases)"""
+    # Create users table
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS users (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            email TEXT UNIQUE NOT NULL,
+            full_name TEXT NOT NULL,
+            education TEXT,
+            contact_number TEXT,
+            current_address TEXT,
+            linkedin TEXT,
+            gender TEXT,
+            disability_status BOOLEAN DEFAULT FALSE,
+            veteran BOOLEAN DEFAULT FALSE,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    
+    # Create user_experience table
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS user_experience (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER,
+            experience_text TEXT NOT NULL,
+            FOREIGN KEY (user_id) REFERENCES users (id)
+        )
+    """)
+    
+    # Create user_skills table
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS user_skills (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER,
+            skill_name TEXT NOT NULL,
+            proficiency_level INTEGER DEFAULT 1,
+            FOREIGN KEY (user_id) REFERENCES users (id)
+        )
+    """)
+    
+    # Create user_preferences table
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS user_preferences (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER UNIQUE,
+            preferred_sectors TEXT, -- JSON array
+            preferred_location TEXT,
+            preferred_duration TEXT,
+            preferred_company_type TEXT,
+            FOREIGN KEY (user_id) REFERENCES users (id)
+        )
+    """)
+    
+    # Create internships table
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS internships (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            title TEXT NOT NULL,
+            company_name TEXT NOT NULL,
+            sector TEXT NOT NULL,
+            location TEXT NOT NULL,
+            duration TEXT NOT NULL,
+            company_type TEXT NOT NULL,
+            application_link TEXT NOT NULL,
+            capacity INTEGER DEFAULT 1,
+            remote_available BOOLEAN DEFAULT FALSE,
+            is_active BOOLEAN DEFAULT TRUE,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            expires_at TIMESTAMP
+        )
+    """)
+    
+    # Create internship_skills table
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS internship_skills (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            internship_id INTEGER,
+            skill_name TEXT NOT NULL,
+            is_required BOOLEAN DEFAULT TRUE,
+            FOREIGN KEY (internship_id) REFERENCES internships (id)
+        )
+    """)
+    
+    # Create applications table for tracking past participation
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS applications (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER,
+            internship_id INTEGER,
+            status TEXT DEFAULT 'applied', -- applied, accepted, rejected, completed, dropped
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            completed_at TIMESTAMP,
+            rating REAL,
+            feedback TEXT,
+            FOREIGN KEY (user_id) REFERENCES users (id),
+            FOREIGN KEY (internship_id) REFERENCES internships (id)
+        )
+    """)
+
+
+def _add_stipend_range(cursor: sqlite3.Cursor):
+    """Migration 2: stipend range text on internships"""
+    cursor.execute("PRAGMA table_info(internships)")
+    if 'stipend_range' not in {row[1] for row in cursor.fetchall()}:
+        cursor.execute("ALTER TABLE internships ADD COLUMN stipend_range TEXT")  # e.g. "₹6k–₹37k"
+
+
+# Tables whose changes invalidate in-memory internship catalogs
+CATALOG_TABLES = ('internships', 'internship_skills')
+
+
+def create_catalog_version_triggers(cursor: sqlite3.Cursor):
+    """Install the triggers that bump the catalog version on every catalog row change"""
+    for table in CATALOG_TABLES:
+        for event in ('INSERT', 'UPDATE', 'DELETE'):
+            cursor.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS trg_{table}_{event.lower()}_catalog_version
+                AFTER {event} ON {table}
+                BEGIN
+                    UPDATE catalog_meta SET version = version + 1 WHERE id = 1;
+                END
+            """)
+
+
+def drop_catalog_version_triggers(cursor: sqlite3.Cursor):
+    """Remove the catalog version triggers (bulk loads bump the version once instead)"""
+    for table in CATALOG_TABLES:
+        for event in ('insert', 'update', 'delete'):
+            cursor.execute(f"DROP TRIGGER IF EXISTS trg_{table}_{event}_catalog_version")
+
+
+def bump_catalog_version(cursor: sqlite3.Cursor):
+    """Move the catalog watermark once, for changes made with the triggers dropped"""
+    cursor.execute("UPDATE catalog_meta SET version = version + 1 WHERE id = 1")
+
+
+def _add_catalog_version(cursor: sqlite3.Cursor):
+    """Migration 4: catalog version watermark bumped by triggers on every catalog change"""
+    # Random ID telling this database apart from a later one at the same path; it keys shared catalogs
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS database_identity (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            instance_id TEXT NOT NULL
+        )
+    """)
+    cursor.execute("INSERT OR IGNORE INTO database_identity (id, instance_id) VALUES (1, ?)", (uuid.uuid4().hex,))
+    
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS catalog_meta (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            version INTEGER NOT NULL DEFAULT 0
+        )
+    """)
+    cursor.execute("INSERT OR IGNORE INTO catalog_meta (id, version) VALUES (1, 0)")
+    create_catalog_version_triggers(cursor)
+
+
+# Columns carried over from the Data/*.csv dumps that the original schema had no place for
+CSV_INGEST_COLUMNS = {
+    'users': [
+        ('source_id', 'INTEGER'),  # ID column of candidates.csv
+        ('state', 'TEXT'),
+        ('city', 'TEXT'),
+        ('year_of_study', 'TEXT'),
+        ('gpa', 'REAL'),
+        ('rural_or_urban', 'TEXT'),
+        ('first_time_applicant', 'BOOLEAN'),
+    ],
+    'internships': [
+        ('source_id', 'INTEGER'),  # ID column of internships.csv
+        ('qualification_required', 'TEXT'),
+        ('location_state', 'TEXT'),
+    ],
+}
+
+
+def _add_csv_ingest_columns(cursor: sqlite3.Cursor):
+    """Migration 5: CSV dump columns plus unique source IDs that bulk ingest upserts on"""
+    for table, columns in CSV_INGEST_COLUMNS.items():
+        cursor.execute(f"PRAGMA table_info({table})")
+        existing = {row[1] for row in cursor.fetchall()}
+        for name, column_type in columns:
+            if name not in existing:
+                cursor.execute(f"ALTER TABLE {table} ADD COLUMN {name} {column_type}")
+        
+        # Rows created through the API have no source ID; UNIQUE allows any number of NULLs
+        cursor.execute(f"CREATE UNIQUE INDEX IF NOT EXISTS ux_{table}_source_id ON {table} (source_id)")
+
+
+# Secondary indexes maintained by the schema, by name, grouped by the migration that added them.
+# Applied migrations must not change: new indexes go in a new group with its own migration.
+READ_PATH_INDEXES = {
+    'idx_user_skills_user': "CREATE INDEX IF NOT EXISTS idx_user_skills_user ON user_skills (user_id)",
+    'idx_user_experience_user': "CREATE INDEX IF NOT EXISTS idx_user_experience_user ON user_experience (user_id)",
+    'idx_internship_skills_internship': "CREATE INDEX IF NOT EXISTS idx_internship_skills_internship ON internship_skills (internship_id)",
+    'idx_applications_user': "CREATE INDEX IF NOT EXISTS idx_applications_user ON applications (user_id, applied_at)",
+    'idx_internships_active_created': "CREATE INDEX IF NOT EXISTS idx_internships_active_created ON internships (is_active, created_at)",
+    # Expression index so LOWER(sector) = LOWER(?) is a search, not a scan
+    'idx_internships_sector_lower': "CREATE INDEX IF NOT EXISTS idx_internships_sector_lower ON internships (LOWER(sector), is_active, created_at)",
+}
+
+FILTER_INDEXES = {
+    # Expression indexes so LOWER(column) = LOWER(?) filters are searches, not scans
+    'idx_internships_location_lower': "CREATE INDEX IF NOT EXISTS idx_internships_location_lower ON internships (LOWER(location), is_active, created_at)",
+    'idx_internships_duration_lower': "CREATE INDEX IF NOT EXISTS idx_internships_duration_lower ON internships (LOWER(duration), is_active, created_at)",
+    # Partial index: only remote internships, already in listing order
+    'idx_internships_remote': "CREATE INDEX IF NOT EXISTS idx_internships_remote ON internships (is_active, created_at) WHERE remote_available = TRUE",
+}
+
+MANAGED_INDEXES = {**READ_PATH_INDEXES, **FILTER_INDEXES}
+
+
+def create_managed_indexes(cursor: sqlite3.Cursor):
+    """Create every managed index that does not exist yet"""
+    for statement in MANAGED_INDEXES.values():
+        cursor.execute(statement)
+
+
+def drop_managed_indexes(cursor: sqlite3.Cursor):
+    """Drop every managed index (e.g. before a bulk load)"""
+    for name in MANAGED_INDEXES:
+        cursor.execute(f"DROP INDEX IF EXISTS {name}")
+
+
+def _add_read_path_indexes(cursor: sqlite3.Cursor):
+    """Migration 3: indexes for the hot read paths"""
+    for statement in READ_PATH_INDEXES.values():
+        cursor.execute(statement)
+
+
+def _add_filter_indexes(cursor: sqlite3.Cursor):
+    """Migration 6: indexes for the location, duration and remote criteria filters"""
+    for statement in FILTER_INDEXES.values():
+        cursor.execute(statement)
+
+
+# Canonical form of a skill name used as the skill_demand key
+SKILL_KEY_SQL = "LOWER(TRIM({column}))"
+
+
+def _skill_key(column: str) -> str:
+    return SKILL_KEY_SQL.format(column=column)
+
+
+# Triggers that keep skill_demand.active_count equal to the number of distinct active
+# internships requiring each canonical skill. Duplicate spellings of one skill within an
+# internship count once, so a row only moves the count when it is the first/last of its key.
+# Blank names are never counted, matching rebuild_skill_demand.
+SKILL_DEMAND_TRIGGERS = {
+    'trg_skill_demand_skill_insert': f"""
+        CREATE TRIGGER IF NOT EXISTS trg_skill_demand_skill_insert
+        AFTER INSERT ON internship_skills
+        WHEN TRIM(NEW.skill_name) != ''
+         AND (SELECT is_active FROM internships WHERE id = NEW.internship_id)
+         AND NOT EXISTS (SELECT 1 FROM internship_skills
+                         WHERE internship_id = NEW.internship_id AND id != NEW.id
+                           AND {_skill_key('skill_name')} = {_skill_key('NEW.skill_name')})
+        BEGIN
+            INSERT INTO skill_demand (skill_key, display_name, active_count)
+            VALUES ({_skill_key('NEW.skill_name')}, TRIM(NEW.skill_name), 1)
+            ON CONFLICT (skill_key) DO UPDATE SET active_count = active_count + 1;
+        END
+    """,
+    'trg_skill_demand_skill_delete': f"""
+        CREATE TRIGGER IF NOT EXISTS trg_skill_demand_skill_delete
+        AFTER DELETE ON internship_skills
+        WHEN TRIM(OLD.skill_name) != ''
+         AND (SELECT is_active FROM internships WHERE id = OLD.internship_id)
+         AND NOT EXISTS (SELECT 1 FROM internship_skills
+                         WHERE internship_id = OLD.internship_id
+                           AND {_skill_key('skill_name')} = {_skill_key('OLD.skill_name')})
+        BEGIN
+            UPDATE skill_demand SET active_count = active_count - 1
+            WHERE skill_key = {_skill_key('OLD.skill_name')};
+        END
+    """,
+    # An edit that changes the key or the internship is a delete of the old pair plus an insert of the new
+    'trg_skill_demand_skill_update_old': f"""
+        CREATE TRIGGER IF NOT EXISTS trg_skill_demand_skill_update_old
+        AFTER UPDATE OF skill_name, internship_id ON internship_skills
+        WHEN ({_skill_key('OLD.skill_name')} != {_skill_key('NEW.skill_name')}
+              OR OLD.internship_id != NEW.internship_id)
+         AND TRIM(OLD.skill_name) != ''
+         AND (SELECT is_active FROM internships WHERE id = OLD.internship_id)
+         AND NOT EXISTS (SELECT 1 FROM internship_skills
+                         WHERE internship_id = OLD.internship_id
+                           AND {_skill_key('skill_name')} = {_skill_key('OLD.skill_name')})
+        BEGIN
+            UPDATE skill_demand SET active_count = active_count - 1
+            WHERE skill_key = {_skill_key('OLD.skill_name')};
+        END
+    """,
+    'trg_skill_demand_skill_update_new': f"""
+        CREATE TRIGGER IF NOT EXISTS trg_skill_demand_skill_update_new
+        AFTER UPDATE OF skill_name, internship_id ON internship_skills
+        WHEN ({_skill_key('OLD.skill_name')} != {_skill_key('NEW.skill_name')}
+              OR OLD.internship_id != NEW.internship_id)
+         AND TRIM(NEW.skill_name) != ''
+         AND (SELECT is_active FROM internships WHERE id = NEW.internship_id)
+         AND NOT EXISTS (SELECT 1 FROM internship_skills
+                         WHERE internship_id = NEW.internship_id AND id != NEW.id
+                           AND {_skill_key('skill_name')} = {_skill_key('NEW.skill_name')})
+        BEGIN
+            INSERT INTO skill_demand (skill_key, display_name, active_count)
+            VALUES ({_skill_key('NEW.skill_name')}, TRIM(NEW.skill_name), 1)
+            ON CONFLICT (skill_key) DO UPDATE SET active_count = active_count + 1;
+        END
+    """,
+    'trg_skill_demand_activate': f"""
+        CREATE TRIGGER IF NOT EXISTS trg_skill_demand_activate
+        AFTER UPDATE OF is_active ON internships
+        WHEN NEW.is_active AND NOT OLD.is_active
+        BEGIN
+            INSERT INTO skill_demand (skill_key, display_name, active_count)
+            SELECT {_skill_key('skill_name')}, MIN(TRIM(skill_name)), 1
+            FROM internship_skills WHERE internship_id = NEW.id AND TRIM(skill_name) != ''
+            GROUP BY {_skill_key('skill_name')}
+            ON CONFLICT (skill_key) DO UPDATE SET active_count = active_count + 1;
+        END
+    """,
+    'trg_skill_demand_deactivate': f"""
+        CREATE TRIGGER IF NOT EXISTS trg_skill_demand_deactivate
+        AFTER UPDATE OF is_active ON internships
+        WHEN OLD.is_active AND NOT NEW.is_active
+        BEGIN
+            UPDATE skill_demand SET active_count = active_count - 1
+            WHERE skill_key IN (SELECT {_skill_key('skill_name')} FROM internship_skills
+                                WHERE internship_id = NEW.id);
+        END
+    """,
+    'trg_skill_demand_internship_delete': f"""
+        CREATE TRIGGER IF NOT EXISTS trg_skill_demand_internship_delete
+        AFTER DELETE ON internships
+        WHEN OLD.is_active
+        BEGIN
+            UPDATE skill_demand SET active_count = active_count - 1
+            WHERE skill_key IN (SELECT {_skill_key('skill_name')} FROM internship_skills
+                                WHERE internship_id = OLD.id);
+        END
+    """,
+}
+
+
+def create_skill_demand_triggers(cursor: sqlite3.Cursor):
+    """Install the triggers that maintain skill_demand"""
+    for statement in SKILL_DEMAND_TRIGGERS.values():
+        cursor.execute(statement)
+
+
+def drop_skill_demand_triggers(cursor: sqlite3.Cursor):
+    """Remove the skill_demand triggers (bulk loads rebuild the table once instead)"""
+    for name in SKILL_DEMAND_TRIGGERS:
+        cursor.execute(f"DROP TRIGGER IF EXISTS {name}")
+
+
+def rebuild_skill_demand(cursor: sqlite3.Cursor):
+    """Recount skill_demand from scratch in one set-based pass"""
+    cursor.execute("DELETE FROM skill_demand")
+    cursor.execute(f"""
+        INSERT INTO skill_demand (skill_key, display_name, active_count)
+        SELECT {_skill_key('isk.skill_name')}, MIN(TRIM(isk.skill_name)), COUNT(DISTINCT isk.internship_id)
+        FROM internship_skills isk
+        JOIN internships i ON i.id = isk.internship_id
+        WHERE i.is_active AND TRIM(isk.skill_name) != ''
+        GROUP BY {_skill_key('isk.skill_name')}
+    """)
+
+
+def _add_skill_demand(cursor: sqlite3.Cursor):
+    """Migration 7: trigger-maintained count of active internships per canonical skill"""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS skill_demand (
+            skill_key TEXT PRIMARY KEY,        -- LOWER(TRIM(skill_name))
+            display_name TEXT NOT NULL,
+            active_count INTEGER NOT NULL DEFAULT 0
+        )
+    """)
+    # Top-N reads walk this index and stop after N rows
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_skill_demand_count ON skill_demand (active_count DESC, skill_key)")
+    rebuild_skill_demand(cursor)
+    create_skill_demand_triggers(cursor)
+
+
+def _add_matching_stats(cursor: sqlite3.Cursor):
+    """Migration 8: per-user matching statistics precomputed by the nightly job"""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS matching_stats (
+            user_id INTEGER PRIMARY KEY,
+            catalog_version INTEGER,           -- catalog_meta.version the stats were computed against
+            weights_version INTEGER NOT NULL,  -- EnhancedRankingEngine.get_weights_version()
+            profile_hash TEXT NOT NULL,        -- fingerprint of the profile that was scored
+            stats_json TEXT NOT NULL,
+            computed_at REAL NOT NULL,         -- Unix time
+            FOREIGN KEY (user_id) REFERENCES users (id) ON DELETE CASCADE
+        )
+    """)
+
+
+def _add_recommendation_rankings(cursor: sqlite3.Cursor):
+    """Migration 9: stored full rankings that recommendation page cursors slice"""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS recommendation_rankings (
+            ranking_id TEXT PRIMARY KEY,
+            user_key TEXT NOT NULL,            -- Lower-cased email of the ranked user
+            catalog_version INTEGER,
+            weights_version INTEGER NOT NULL,
+            profile_hash TEXT NOT NULL,
+            query TEXT,                        -- Natural language input merged into the profile
+            preferences TEXT,                  -- JSON preferences extracted from query, reused by later pages
+            sector_filter TEXT,
+            internship_ids BLOB NOT NULL,      -- Packed int64 IDs, best match first
+            scores BLOB NOT NULL,              -- Packed float64 scores, same order
+            created_at REAL NOT NULL,          -- Unix time
+            expires_at REAL NOT NULL
+        )
+    """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_recommendation_rankings_expires "
+                   "ON recommendation_rankings (expires_at)")
+
+
+# Schema migrations as (version, description, function); each runs once per database, in order
+MIGRATIONS = [
+    (1, "Initial schema", _create_initial_schema),
+    (2, "Add internships.stipend_range", _add_stipend_range),
+    (3, "Add managed secondary and expression indexes", _add_read_path_indexes),
+    (4, "Add catalog version watermark", _add_catalog_version),
+    (5, "Add CSV ingest columns and source IDs", _add_csv_ingest_columns),
+    (6, "Add location, duration and remote filter indexes", _add_filter_indexes),
+    (7, "Add trigger-maintained skill demand counts", _add_skill_demand),
+    (8, "Add precomputed matching statistics", _add_matching_stats),
+    (9, "Add stored recommendation rankings for page cursors", _add_recommendation_rankings),
+]
+
+
+def _close_quietly(conn: sqlite3.Connection):
+    try:
+        conn.close()
+    except sqlite3.Error:
+        pass
+
+
+class _ThreadConnection:
+    """Holds one thread's connection and closes it when the thread's locals are released"""
+    __slots__ = ('conn', 'pid', 'finalizer', '__weakref__')
+    
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+        self.pid = os.getpid()
+        self.finalizer = weakref.finalize(self, _close_quietly, conn)
+
+
+class ConnectionManager:
+    """
+    Long-lived SQLite connections, one per live thread (and per process after a fork)
+    
+    Connections are opened once with WAL journaling and tuned pragmas, so
+    concurrent readers never wait for a writer and each call skips connection
+    setup. Every connection keeps its own prepared statement cache, which is
+    reused across calls because the connection is.
+    
+    A connection lives in its thread's thread-local storage and is closed when
+    that thread ends, so servers that start a thread per request don't
+    accumulate open connections.
+    
+    Connections run in autocommit mode; writers call begin() to open an
+    IMMEDIATE transaction and take the write lock up front.
+    """
+    
+    DEFAULT_PRAGMAS = {
+        'journal_mode': 'WAL',        # Readers don't block the writer and vice versa
+        'synchronous': 'NORMAL',      # Safe with WAL, avoids an fsync per commit
+        'cache_size': -16000,         # ~16 MB page cache per connection
+        'mmap_size': 268435456,       # 256 MB of memory-mapped reads
+        'temp_store': 'MEMORY',
+        'busy_timeout': 5000          # Wait up to 5s for the write lock
+    }
+    
+    def __init__(self, db_path: str, pragmas: Optional[Dict[str, Any]] = None, cached_statements: int = 256):
+        self.db_path = db_path
+        self.pragmas = {**self.DEFAULT_PRAGMAS, **(pragmas or {})}
+        self.cached_statements = cached_statements
+        self._local = threading.local()
+        # Holders of the connections of live threads; entries vanish when their thread ends
+        self._holders: weakref.WeakSet = weakref.WeakSet()
+        self._lock = threading.Lock()
+    
+    def _connect(self) -> sqlite3.Connection:
+        """Open and configure a new connection"""
+        # Only its own thread uses a connection, but it may be closed from another (close_all, thread exit)
+        conn = sqlite3.connect(self.db_path, isolation_level=None, cached_statements=self.cached_statements,
+                               check_same_thread=False)
+        for name, value in self.pragmas.items():
+            conn.execute(f"PRAGMA {name} = {value}")
+        return conn
+    
+    def get_connection(self) -> sqlite3.Connection:
+        """Return this thread's connection, opening it on first use"""
+        holder = getattr(self._local, 'holder', None)
+        
+        # A connection inherited through fork() must not be shared with the parent
+        if holder is None or holder.pid != os.getpid():
+            if holder is not None:
+                holder.finalizer.detach()  # Closing it here could touch the parent's WAL state
+            holder = _ThreadConnection(self._connect())
+            self._local.holder = holder
+            with self._lock:
+                self._holders.add(holder)
+        
+        return holder.conn
+    
+    def open_connections(self) -> int:
+        """Number of connections currently held by live threads"""
+        with self._lock:
+            return sum(1 for holder in self._holders if holder.finalizer.alive)
+    
+    def begin(self) -> sqlite3.Connection:
+        """Return this thread's connection inside a new write transaction"""
+        conn = self.get_connection()
+        conn.execute("BEGIN IMMEDIATE")
+        return conn
+    
+    def release(self, conn: sqlite3.Connection):
+        """Finish a call: roll back anything left uncommitted but keep the connection open"""
+        if conn.in_transaction:
+            conn.rollback()
+    
+    def close_all(self):
+        """Close every open connection of this manager"""
+        with self._lock:
+            holders, self._holders = list(self._holders), weakref.WeakSet()
+        
+        for holder in holders:
+            holder.finalizer()
+        self._local = threading.local()
 
 
 class DatabaseConnector:
@@ -18,126 +563,101 @@ class DatabaseConnector:
     (SQLite for testing, PostgreSQL/MySQL for production)
     """
     
-    def __init__(self, db_path: str = "internship_matching.db", db_type: str = "sqlite"):
+    def __init__(self, db_path: str = "internship_matching.db", db_type: str = "sqlite",
+                 pragmas: Optional[Dict[str, Any]] = None, seed_sample_data: bool = False):
         self.db_path = db_path
         self.db_type = db_type
         self.logger = logging.getLogger(__name__)
+        self.migrations_applied = 0
         
         if db_type == "sqlite":
-            self._init_sqlite()
+            self.connections = ConnectionManager(db_path, pragmas)
+            self._init_sqlite(seed_sample_data)
     
-    def _init_sqlite(self):
-        """Initialize SQLite database with sample schema"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+    def close(self):
+        """Close all pooled database connections"""
+        self.connections.close_all()
+    
+    def _init_sqlite(self, seed_sample_data: bool = False):
+        """Bring the SQLite schema up to date and optionally seed sample data"""
+        self.migrations_applied = self.migrate()
         
-        # Create users table
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS users (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                email TEXT UNIQUE NOT NULL,
-                full_name TEXT NOT NULL,
-                education TEXT,
-                contact_number TEXT,
-                current_address TEXT,
-                linkedin TEXT,
-                gender TEXT,
-                disability_status BOOLEAN DEFAULT FALSE,
-                veteran BOOLEAN DEFAULT FALSE,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
-        
-        # Create user_experience table
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS user_experience (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER,
-                experience_text TEXT NOT NULL,
-                FOREIGN KEY (user_id) REFERENCES users (id)
-            )
-        """)
-        
-        # Create user_skills table
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS user_skills (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER,
-                skill_name TEXT NOT NULL,
-                proficiency_level INTEGER DEFAULT 1,
-                FOREIGN KEY (user_id) REFERENCES users (id)
-            )
-        """)
-        
-        # Create user_preferences table
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS user_preferences (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER UNIQUE,
-                preferred_sectors TEXT, -- JSON array
-                preferred_location TEXT,
-                preferred_duration TEXT,
-                preferred_company_type TEXT,
-                FOREIGN KEY (user_id) REFERENCES users (id)
-            )
-        """)
-        
-        # Create internships table
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS internships (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                title TEXT NOT NULL,
-                company_name TEXT NOT NULL,
-                sector TEXT NOT NULL,
-                location TEXT NOT NULL,
-                duration TEXT NOT NULL,
-                company_type TEXT NOT NULL,
-                application_link TEXT NOT NULL,
-                capacity INTEGER DEFAULT 1,
-                remote_available BOOLEAN DEFAULT FALSE,
-                is_active BOOLEAN DEFAULT TRUE,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                expires_at TIMESTAMP
-            )
-        """)
-        
-        # Create internship_skills table
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS internship_skills (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                internship_id INTEGER,
-                skill_name TEXT NOT NULL,
-                is_required BOOLEAN DEFAULT TRUE,
-                FOREIGN KEY (internship_id) REFERENCES internships (id)
-            )
-        """)
-        
-        # Create applications table for tracking past participation
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS applications (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER,
-                internship_id INTEGER,
-                status TEXT DEFAULT 'applied', -- applied, accepted, rejected, completed, dropped
-                applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                completed_at TIMESTAMP,
-                rating REAL,
-                feedback TEXT,
-                FOREIGN KEY (user_id) REFERENCES users (id),
-                FOREIGN KEY (internship_id) REFERENCES internships (id)
-            )
-        """)
-        
-        conn.commit()
-        conn.close()
+        if seed_sample_data:
+            self._insert_sample_data()
+    
+    def _database_key(self) -> Optional[tuple]:
+        """
+        Identify the database for state shared across connectors (the catalog)
+        
+        Uses the instance ID stored in the database rather than anything about the
+        file, so a database deleted and recreated at the same path gets a new key.
+        """
+        if self.db_path == ":memory:":
+            return None
+        conn = self.connections.get_connection()
+        try:
+            row = conn.execute("SELECT instance_id FROM database_identity WHERE id = 1").fetchone()
+        except sqlite3.OperationalError:
+            return None  # Not migrated
+        finally:
+            self.connections.release(conn)
+        return (os.path.realpath(self.db_path), row[0]) if row else None
+    
+    def migrate(self) -> int:
+        """
+        Apply pending schema migrations
         
-        # Insert sample data
-        self._insert_sample_data()
+        Costs a single version lookup when the schema is current.
+        
+        Returns:
+            Number of migrations applied
+        """
+        latest = MIGRATIONS[-1][0]
+        conn = self.connections.get_connection()
+        
+        try:
+            try:
+                current = conn.execute("SELECT MAX(version) FROM schema_version").fetchone()[0] or 0
+            except sqlite3.OperationalError:
+                current = 0  # No schema_version table yet
+            
+            applied = 0
+            if current < latest:
+                conn.execute("BEGIN IMMEDIATE")
+                cursor = conn.cursor()
+                cursor.execute("""
+                    CREATE TABLE IF NOT EXISTS schema_version (
+                        version INTEGER PRIMARY KEY,
+                        description TEXT NOT NULL,
+                        applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                    )
+                """)
+                
+                # Another process may have migrated while we waited for the write lock
+                current = cursor.execute("SELECT MAX(version) FROM schema_version").fetchone()[0] or 0
+                
+                for version, description, migration in MIGRATIONS:
+                    if version <= current:
+                        continue
+                    migration(cursor)
+                    cursor.execute("INSERT INTO schema_version (version, description) VALUES (?, ?)",
+                                   (version, description))
+                    self.logger.info(f"Applied schema migration {version}: {description}")
+                    applied += 1
+                
+                conn.commit()
+            
+            return applied
+            
+        except Exception as e:
+            self.logger.error(f"Error migrating database schema: {e}")
+            raise
+        finally:
+            self.connections.release(conn)
     
     def _insert_sample_data(self):
-        """Insert sample data for testing"""
-        conn = sqlite3.connect(self.db_path)
+        """Insert sample data for testing (idempotent; opt in with seed_sample_data=True)"""
+        conn = self.connections.begin()
         cursor = conn.cursor()
         
         try:
@@ -170,9 +690,11 @@ class DatabaseConnector:
                 (3, "Statistics", 5), (3, "SQL", 4)
             ]
             
+            # Skill tables have no unique key, so skip rows that are already there
             cursor.executemany("""
-                INSERT OR IGNORE INTO user_skills (user_id, skill_name, proficiency_level) 
-                VALUES (?, ?, ?)
+                INSERT INTO user_skills (user_id, skill_name, proficiency_level) 
+                SELECT ?1, ?2, ?3
+                WHERE NOT EXISTS (SELECT 1 FROM user_skills WHERE user_id = ?1 AND skill_name = ?2)
             """, sample_skills)
             
             # Sample preferences
@@ -191,22 +713,22 @@ class DatabaseConnector:
             # Sample internships
             sample_internships = [
                 (1, "Python Developer Intern", "TechCorp", "Technology", "Bangalore", 
-                 "6 months", "Startup", "https://techcorp.com/internships/python", 5, True, True),
+                 "6 months", "Startup", "https://techcorp.com/internships/python", 5, True, True, "₹15k–₹25k"),
                 (2, "Frontend Developer Intern", "WebCorp", "Technology", "Mumbai", 
-                 "3 months", "MNC", "https://webcorp.com/careers/frontend", 8, False, True),
+                 "3 months", "MNC", "https://webcorp.com/careers/frontend", 8, False, True, "₹20k–₹30k"),
                 (3, "Data Science Intern", "DataCorp", "Technology", "Bangalore", 
-                 "6 months", "Startup", "https://datacorp.com/internships/datascience", 3, True, True),
+                 "6 months", "Startup", "https://datacorp.com/internships/datascience", 3, True, True, "₹18k–₹35k"),
                 (4, "Full Stack Developer Intern", "StartupXYZ", "Technology", "Delhi", 
-                 "4 months", "Startup", "https://startupxyz.com/careers", 6, True, True),
+                 "4 months", "Startup", "https://startupxyz.com/careers", 6, True, True, "₹10k–₹20k"),
                 (5, "AI/ML Research Intern", "AICorp", "Technology", "Bangalore", 
-                 "8 months", "MNC", "https://aicorp.com/research-internships", 2, False, True)
+                 "8 months", "MNC", "https://aicorp.com/research-internships", 2, False, True, "₹30k–₹50k")
             ]
             
             cursor.executemany("""
                 INSERT OR IGNORE INTO internships 
                 (id, title, company_name, sector, location, duration, company_type, 
-                 application_link, capacity, remote_available, is_active) 
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                 application_link, capacity, remote_available, is_active, stipend_range) 
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
             """, sample_internships)
             
             # Sample internship skills
@@ -219,8 +741,9 @@ class DatabaseConnector:
             ]
             
             cursor.executemany("""
-                INSERT OR IGNORE INTO internship_skills (internship_id, skill_name, is_required) 
-                VALUES (?, ?, ?)
+                INSERT INTO internship_skills (internship_id, skill_name, is_required) 
+                SELECT ?1, ?2, ?3
+                WHERE NOT EXISTS (SELECT 1 FROM internship_skills WHERE internship_id = ?1 AND skill_name = ?2)
             """, sample_internship_skills)
             
             conn.commit()
@@ -230,186 +753,448 @@ class DatabaseConnector:
             self.logger.error(f"Error inserting sample data: {e}")
             conn.rollback()
         finally:
-            conn.close()
+            self.connections.release(conn)
     
-    def get_user_profile_by_email(self, email: str) -> Optional[CandidateProfile]:
-        """Fetch complete user profile by email"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+    # Users joined with their preferences, skills and experience in a single row;
+    # the JSON aggregates keep one round-trip per lookup (or per bulk chunk)
+    PROFILE_QUERY = """
+        SELECT u.id, u.email, u.full_name, u.education, u.contact_number, u.current_address,
+               u.linkedin, u.gender, u.disability_status, u.veteran,
+               up.preferred_sectors, up.preferred_location, up.preferred_duration,
+               up.preferred_company_type,
+               (SELECT json_group_array(us.skill_name) FROM user_skills us
+                WHERE us.user_id = u.id) AS skills,
+               (SELECT json_group_array(ue.experience_text) FROM user_experience ue
+                WHERE ue.user_id = u.id) AS experience
+        FROM users u
+        LEFT JOIN user_preferences up ON u.id = up.user_id
+        WHERE {where}
+    """
+    
+    def _row_to_profile(self, row: tuple) -> CandidateProfile:
+        """Build a CandidateProfile from a PROFILE_QUERY row"""
+        # Parse preferred sectors from JSON
+        preferred_sectors = None
+        if row[10]:  # preferred_sectors column
+            try:
+                preferred_sectors = json.loads(row[10])
+            except json.JSONDecodeError:
+                preferred_sectors = [row[10]]  # Fallback to single sector
+        
+        return CandidateProfile(
+            full_name=row[2],
+            education=row[3] or "",
+            contact_number=row[4] or "",
+            current_address=row[5] or "",
+            email=row[1],
+            linkedin=row[6] or "",
+            experience=json.loads(row[15]),
+            skills=json.loads(row[14]),
+            gender=row[7] or "",
+            disability_status=bool(row[8]),
+            veteran=bool(row[9]),
+            preferred_sectors=preferred_sectors,
+            preferred_location=row[11],
+            preferred_duration=row[12],
+            preferred_company_type=row[13]
+        )
+    
+    def _fetch_profile(self, where: str, params: tuple) -> Optional[CandidateProfile]:
+        """Load at most one profile matching `where` in a single query"""
+        conn = self.connections.get_connection()
         
         try:
-            # Get basic user info
-            cursor.execute("""
-                SELECT u.*, up.preferred_sectors, up.preferred_location, 
-                       up.preferred_duration, up.preferred_company_type
-                FROM users u
-                LEFT JOIN user_preferences up ON u.id = up.user_id
-                WHERE u.email = ?
-            """, (email,))
-            
-            user_row = cursor.fetchone()
-            if not user_row:
-                return None
-            
-            user_id = user_row[0]
-            
-            # Get user skills
-            cursor.execute("""
-                SELECT skill_name FROM user_skills WHERE user_id = ?
-            """, (user_id,))
-            skills = [row[0] for row in cursor.fetchall()]
-            
-            # Get user experience
-            cursor.execute("""
-                SELECT experience_text FROM user_experience WHERE user_id = ?
-            """, (user_id,))
-            experience = [row[0] for row in cursor.fetchall()]
-            
-            # Parse preferred sectors from JSON
-            preferred_sectors = None
-            if user_row[12]:  # preferred_sectors column
-                try:
-                    preferred_sectors = json.loads(user_row[12])
-                except json.JSONDecodeError:
-                    preferred_sectors = [user_row[12]]  # Fallback to single sector
-            
-            # Create CandidateProfile object
-            profile = CandidateProfile(
-                full_name=user_row[2],
-                education=user_row[3] or "",
-                contact_number=user_row[4] or "",
-                current_address=user_row[5] or "",
-                email=user_row[1],
-                linkedin=user_row[6] or "",
-                experience=experience,
-                skills=skills,
-                gender=user_row[7] or "",
-                disability_status=bool(user_row[8]),
-                veteran=bool(user_row[9]),
-                preferred_sectors=preferred_sectors,
-                preferred_location=user_row[13],
-                preferred_duration=user_row[14],
-                preferred_company_type=user_row[15]
-            )
-            
-            return profile
-            
+            row = conn.execute(self.PROFILE_QUERY.format(where=where), params).fetchone()
+            return self._row_to_profile(row) if row else None
         except Exception as e:
             self.logger.error(f"Error fetching user profile: {e}")
             return None
         finally:
-            conn.close()
+            self.connections.release(conn)
+    
+    @traced("db.get_user_profile_by_email")
+    def get_user_profile_by_email(self, email: str) -> Optional[CandidateProfile]:
+        """Fetch complete user profile by email"""
+        return self._fetch_profile("u.email = ?", (email,))
     
+    @traced("db.get_user_profile_by_id")
     def get_user_profile_by_id(self, user_id: int) -> Optional[CandidateProfile]:
         """Fetch complete user profile by user ID"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        return self._fetch_profile("u.id = ?", (user_id,))
+    
+    @traced("db.get_user_profiles")
+    def get_user_profiles(self, user_ids: List[int], chunk_size: int = 5000) -> Dict[int, CandidateProfile]:
+        """
+        Fetch many user profiles with one set-based query per chunk of IDs
+        
+        Args:
+            user_ids: User IDs to load; unknown IDs are simply absent from the result
+            chunk_size: IDs bound per query (passed as a single JSON array parameter)
+            
+        Returns:
+            Mapping of user ID to CandidateProfile
+        """
+        profiles = {}
+        unique_ids = list(dict.fromkeys(int(user_id) for user_id in user_ids))
+        if not unique_ids:
+            return profiles
+        
+        conn = self.connections.get_connection()
+        query = self.PROFILE_QUERY.format(where="u.id IN (SELECT value FROM json_each(?))")
         
         try:
-            cursor.execute("SELECT email FROM users WHERE id = ?", (user_id,))
-            result = cursor.fetchone()
-            if result:
-                return self.get_user_profile_by_email(result[0])
-            return None
+            for start in range(0, len(unique_ids), chunk_size):
+                chunk = json.dumps(unique_ids[start:start + chunk_size])
+                for row in conn.execute(query, (chunk,)):
+                    profiles[row[0]] = self._row_to_profile(row)
+            return profiles
         except Exception as e:
-            self.logger.error(f"Error fetching user by ID: {e}")
+            self.logger.error(f"Error fetching user profiles in bulk: {e}")
+            return {}
+        finally:
+            self.connections.release(conn)
+    
+    # Column list shared by the internship queries, in the order _row_to_internship expects
+    INTERNSHIP_COLUMNS = """
+        i.id, i.title, i.company_name, i.sector, i.location, i.duration, i.company_type,
+        i.application_link, i.capacity, i.remote_available, i.stipend_range
+    """
+    
+    # Skills aggregate per internship; a correlated subquery lets the outer query
+    # walk the (is_active, created_at) index in order instead of grouping and sorting
+    INTERNSHIP_SKILLS = """
+        (SELECT GROUP_CONCAT(isk.skill_name) FROM internship_skills isk
+         WHERE isk.internship_id = i.id) AS skills
+    """
+    
+    ACTIVE_INTERNSHIPS_QUERY = f"""
+        SELECT {INTERNSHIP_COLUMNS}, {INTERNSHIP_SKILLS}
+        FROM internships i
+        WHERE i.is_active = TRUE
+        ORDER BY i.created_at DESC, i.id DESC
+        LIMIT ?
+    """
+    
+    def _row_to_internship(self, row: tuple) -> Internship:
+        """Build an Internship from an INTERNSHIP_COLUMNS row followed by the skills aggregate"""
+        skills = row[11].split(',') if row[11] else []
+        skills = [s.strip() for s in skills if s.strip()]
+        
+        # Parse the stipend range once here so ranking works with numbers
+        stipend_min, stipend_max = parse_stipend_range(row[10])
+        
+        return Internship(
+            title=row[1],
+            skills_required=skills,
+            sector=row[3],
+            location=row[4],
+            duration=row[5],
+            company_type=row[6],
+            link=row[7],
+            capacity=row[8] or 1,
+            remote_available=bool(row[9]),
+            stipend_min=stipend_min,
+            stipend_max=stipend_max,
+            internship_id=row[0]
+        )
+    
+    @traced("db.get_catalog_version")
+    def get_catalog_version(self) -> Optional[int]:
+        """Return the catalog watermark; it changes whenever internships or their skills change"""
+        conn = self.connections.get_connection()
+        
+        try:
+            return conn.execute("SELECT version FROM catalog_meta WHERE id = 1").fetchone()[0]
+        except Exception as e:
+            self.logger.error(f"Error reading catalog version: {e}")
             return None
         finally:
-            conn.close()
+            self.connections.release(conn)
+    
+    @traced("db.load_catalog")
+    def load_catalog(self) -> Tuple[Optional[int], List[Internship]]:
+        """
+        Read the catalog version and every active internship in one read transaction
+        
+        Returns:
+            (version, internships); the version describes exactly the rows returned
+        """
+        conn = self.connections.get_connection()
+        
+        try:
+            conn.execute("BEGIN")
+            version = conn.execute("SELECT version FROM catalog_meta WHERE id = 1").fetchone()[0]
+            rows = conn.execute(self.ACTIVE_INTERNSHIPS_QUERY, (-1,)).fetchall()
+            conn.execute("COMMIT")
+            
+            return version, [self._row_to_internship(row) for row in rows]
+            
+        except Exception as e:
+            self.logger.error(f"Error loading internship catalog: {e}")
+            return None, []
+        finally:
+            self.connections.release(conn)
+    
+    @traced("db.get_top_skills_in_demand")
+    def get_top_skills_in_demand(self, top_n: int = 10,
+                                 exclude: Optional[List[str]] = None) -> List[Tuple[str, int]]:
+        """
+        Most required skills across active internships, from the precomputed skill_demand counts
+        
+        Args:
+            top_n: Number of skills to return
+            exclude: Skills to leave out (matched case-insensitively), e.g. ones a candidate already has
+            
+        Returns:
+            List of (display name, number of active internships requiring it), highest first
+        """
+        exclude_keys = sorted({skill.strip().lower() for skill in exclude or [] if skill.strip()})
+        conn = self.connections.get_connection()
+        
+        try:
+            rows = conn.execute("""
+                SELECT display_name, active_count FROM skill_demand
+                WHERE active_count > 0 AND skill_key NOT IN (SELECT value FROM json_each(?))
+                ORDER BY active_count DESC, skill_key
+                LIMIT ?
+            """, (json.dumps(exclude_keys), top_n)).fetchall()
+            return [(row[0], row[1]) for row in rows]
+        except Exception as e:
+            self.logger.error(f"Error reading skill demand: {e}")
+            return []
+        finally:
+            self.connections.release(conn)
     
+    @traced("db.get_active_internships")
     def get_active_internships(self, limit: Optional[int] = None) -> List[Internship]:
         """Fetch all active internships"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self.connections.get_connection()
         cursor = conn.cursor()
         
         try:
-            query = """
-                SELECT i.*, GROUP_CONCAT(isk.skill_name) as skills
-                FROM internships i
-                LEFT JOIN internship_skills isk ON i.id = isk.internship_id
-                WHERE i.is_active = TRUE
-                GROUP BY i.id
-                ORDER BY i.created_at DESC
-            """
-            
-            if limit:
-                query += f" LIMIT {limit}"
-            
-            cursor.execute(query)
+            # One statement text for every limit keeps it in the prepared statement cache
+            cursor.execute(self.ACTIVE_INTERNSHIPS_QUERY, (limit if limit else -1,))
             internship_rows = cursor.fetchall()
             
-            internships = []
-            for row in internship_rows:
-                skills = row[12].split(',') if row[12] else []
-                skills = [s.strip() for s in skills if s.strip()]
-                
-                internship = Internship(
-                    title=row[1],
-                    skills_required=skills,
-                    sector=row[3],
-                    location=row[4],
-                    duration=row[5],
-                    company_type=row[6],
-                    link=row[7],
-                    capacity=row[8] or 1,
-                    remote_available=bool(row[9])
-                )
-                internships.append(internship)
-            
-            return internships
+            return [self._row_to_internship(row) for row in internship_rows]
             
         except Exception as e:
             self.logger.error(f"Error fetching internships: {e}")
             return []
         finally:
-            conn.close()
+            self.connections.release(conn)
     
+    @traced("db.get_internships_by_sector")
     def get_internships_by_sector(self, sector: str) -> List[Internship]:
         """Fetch internships filtered by sector"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self.connections.get_connection()
         cursor = conn.cursor()
         
         try:
-            cursor.execute("""
-                SELECT i.*, GROUP_CONCAT(isk.skill_name) as skills
+            cursor.execute(f"""
+                SELECT {self.INTERNSHIP_COLUMNS}, {self.INTERNSHIP_SKILLS}
                 FROM internships i
-                LEFT JOIN internship_skills isk ON i.id = isk.internship_id
-                WHERE i.is_active = TRUE AND LOWER(i.sector) = LOWER(?)
-                GROUP BY i.id
-                ORDER BY i.created_at DESC
+                WHERE LOWER(i.sector) = LOWER(?) AND i.is_active = TRUE
+                ORDER BY i.created_at DESC, i.id DESC
             """, (sector,))
             
             internship_rows = cursor.fetchall()
             
-            internships = []
-            for row in internship_rows:
-                skills = row[12].split(',') if row[12] else []
-                skills = [s.strip() for s in skills if s.strip()]
-                
-                internship = Internship(
-                    title=row[1],
-                    skills_required=skills,
-                    sector=row[3],
-                    location=row[4],
-                    duration=row[5],
-                    company_type=row[6],
-                    link=row[7],
-                    capacity=row[8] or 1,
-                    remote_available=bool(row[9])
-                )
-                internships.append(internship)
-            
-            return internships
+            return [self._row_to_internship(row) for row in internship_rows]
             
         except Exception as e:
             self.logger.error(f"Error fetching internships by sector: {e}")
             return []
         finally:
-            conn.close()
+            self.connections.release(conn)
+    
+    @staticmethod
+    def encode_page_cursor(key: Tuple[Optional[str], int]) -> str:
+        """Encode a (created_at, id) keyset position as an opaque URL-safe token (created_at may be NULL)"""
+        return base64.urlsafe_b64encode(json.dumps(list(key)).encode()).decode().rstrip('=')
+    
+    @staticmethod
+    def decode_page_cursor(token: str) -> Tuple[Optional[str], int]:
+        """Decode a page cursor token; raises ValueError if it is malformed"""
+        try:
+            created_at, internship_id = json.loads(base64.urlsafe_b64decode(token + '=' * (-len(token) % 4)))
+            if not isinstance(created_at, (str, type(None))) or not isinstance(internship_id, int):
+                raise TypeError("cursor fields have the wrong types")
+            return created_at, internship_id
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"Invalid page cursor: {token!r}") from e
+    
+    @staticmethod
+    def build_internship_filters(sector: Optional[str] = None,
+                                 location: Optional[str] = None,
+                                 duration: Optional[str] = None,
+                                 remote_only: bool = False) -> Tuple[List[str], List[Any]]:
+        """
+        Translate internship criteria into parameterized WHERE terms
+        
+        Each term matches a managed index (exact, case-insensitive text
+        matches via expression indexes; remote via a partial index), so the
+        planner can search the most selective one instead of scanning.
+        
+        Returns:
+            (conditions to AND together, their parameters in order)
+        """
+        conditions: List[str] = []
+        params: List[Any] = []
+        
+        for column, value in (('sector', sector), ('location', location), ('duration', duration)):
+            if value and value.strip():
+                value = value.strip()
+                if column == 'duration' and value.isdigit():
+                    value = f"{value} months"  # Durations are stored as "N months"
+                conditions.append(f"LOWER(i.{column}) = LOWER(?)")
+                params.append(value)
+        
+        conditions.append("i.is_active = TRUE")
+        if remote_only:
+            conditions.append("i.remote_available = TRUE")
+        
+        return conditions, params
+    
+    @traced("db.find_internships")
+    def find_internships(self,
+                         sector: Optional[str] = None,
+                         location: Optional[str] = None,
+                         duration: Optional[str] = None,
+                         remote_only: bool = False,
+                         limit: Optional[int] = None) -> List[Internship]:
+        """
+        Fetch active internships matching all given criteria, newest first
+        
+        Filtering happens in SQL and LIMIT applies to the filtered rows, so the
+        result is never under-filled and nothing is fetched only to be dropped.
+        
+        Args:
+            sector: Exact sector (case-insensitive)
+            location: Exact location (case-insensitive)
+            duration: Exact duration such as "3 months" (a bare number means months)
+            remote_only: Only internships that allow remote work
+            limit: Maximum number of results (None for all)
+        """
+        conditions, params = self.build_internship_filters(sector, location, duration, remote_only)
+        params.append(limit if limit else -1)
+        
+        conn = self.connections.get_connection()
+        try:
+            rows = conn.execute(f"""
+                SELECT {self.INTERNSHIP_COLUMNS}, {self.INTERNSHIP_SKILLS}
+                FROM internships i
+                WHERE {' AND '.join(conditions)}
+                ORDER BY i.created_at DESC, i.id DESC
+                LIMIT ?
+            """, params).fetchall()
+            
+            return [self._row_to_internship(row) for row in rows]
+            
+        except Exception as e:
+            self.logger.error(f"Error finding internships: {e}")
+            return []
+        finally:
+            self.connections.release(conn)
+    
+    def _fetch_internship_page(self, limit: int, after: Optional[Tuple[Optional[str], int]] = None,
+                               sector: Optional[str] = None) -> Tuple[List[Internship], Optional[Tuple[Optional[str], int]]]:
+        """
+        Fetch one keyset page of active internships, newest first
+        
+        Reads limit + 1 rows so the last page is known without an extra query.
+        Rows with a NULL created_at come last, ordered by id. A row-value
+        comparison never matches them, so once a page runs past the dated
+        rows it continues with a second query over the NULL ones; both stay
+        range searches on the (is_active, created_at) indexes.
+        
+        Returns:
+            (internships, key of the last row) where the key is None on the last page
+        """
+        filters, filter_params = self.build_internship_filters(sector=sector)
+        
+        def fetch(conn, condition: Optional[str], condition_params: Tuple, count: int) -> List[tuple]:
+            conditions = filters + [condition] if condition else filters
+            return conn.execute(f"""
+                SELECT {self.INTERNSHIP_COLUMNS}, {self.INTERNSHIP_SKILLS}, i.created_at
+                FROM internships i
+                WHERE {' AND '.join(conditions)}
+                ORDER BY i.created_at DESC NULLS LAST, i.id DESC
+                LIMIT ?
+            """, [*filter_params, *condition_params, count]).fetchall()
+        
+        conn = self.connections.get_connection()
+        try:
+            if after is None:
+                rows = fetch(conn, None, (), limit + 1)
+            elif after[0] is None:
+                rows = fetch(conn, "i.created_at IS NULL AND i.id < ?", (after[1],), limit + 1)
+            else:
+                rows = fetch(conn, "(i.created_at, i.id) < (?, ?)", after, limit + 1)
+                if len(rows) <= limit:
+                    rows += fetch(conn, "i.created_at IS NULL", (), limit + 1 - len(rows))
+        finally:
+            self.connections.release(conn)
+        
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        last_key = (rows[-1][12], rows[-1][0]) if has_more else None
+        return [self._row_to_internship(row) for row in rows], last_key
+    
+    def iter_active_internships(self, batch_size: int = 500, sector: Optional[str] = None) -> Iterator[Internship]:
+        """
+        Yield every active internship, newest first, in constant memory
+        
+        Each batch is a separate keyset query on (created_at, id), so no read
+        transaction or connection is held between batches and rows inserted
+        meanwhile never shift or duplicate results.
+        
+        Args:
+            batch_size: Rows fetched per query
+            sector: Optional sector filter (case-insensitive)
+        """
+        after = None
+        while True:
+            try:
+                batch, after = self._fetch_internship_page(batch_size, after, sector)
+            except Exception as e:
+                self.logger.error(f"Error iterating internships: {e}")
+                raise
+            
+            yield from batch
+            if after is None:
+                return
+    
+    @traced("db.get_internships_page")
+    def get_internships_page(self, limit: int = 50, cursor: Optional[str] = None,
+                             sector: Optional[str] = None) -> Tuple[List[Internship], Optional[str]]:
+        """
+        Fetch one page of active internships for cursor-based pagination
+        
+        Args:
+            limit: Page size
+            cursor: Token from the previous page, or None for the first page
+            sector: Optional sector filter (case-insensitive)
+            
+        Returns:
+            (internships, next cursor token or None on the last page)
+            
+        Raises:
+            ValueError: If the cursor token is malformed
+            sqlite3.Error: If the page cannot be read; an empty last page would end the client's walk
+        """
+        after = self.decode_page_cursor(cursor) if cursor else None
+        
+        try:
+            internships, last_key = self._fetch_internship_page(limit, after, sector)
+        except Exception as e:
+            self.logger.error(f"Error fetching internship page: {e}")
+            raise
+        return internships, self.encode_page_cursor(last_key) if last_key else None
     
     def get_user_applications(self, user_id: int) -> List[Dict[str, Any]]:
         """Get user's past applications for participation tracking"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self.connections.get_connection()
         cursor = conn.cursor()
         
         try:
@@ -441,11 +1226,11 @@ class DatabaseConnector:
             self.logger.error(f"Error fetching user applications: {e}")
             return []
         finally:
-            conn.close()
+            self.connections.release(conn)
     
     def add_user_profile(self, profile: CandidateProfile) -> bool:
         """Add a new user profile to the database"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self.connections.begin()
         cursor = conn.cursor()
         
         try:
@@ -493,11 +1278,12 @@ class DatabaseConnector:
             conn.rollback()
             return False
         finally:
-            conn.close()
+            self.connections.release(conn)
     
+    @traced("db.update_user_preferences")
     def update_user_preferences(self, email: str, preferences: Dict[str, Any]) -> bool:
         """Update user preferences"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self.connections.begin()
         cursor = conn.cursor()
         
         try:
@@ -529,8 +1315,172 @@ class DatabaseConnector:
             conn.rollback()
             return False
         finally:
-            conn.close()
+            self.connections.release(conn)
 
+    
+    def iter_user_ids(self, batch_size: int = 5000) -> Iterator[List[int]]:
+        """Yield every user ID in ascending lists of at most batch_size, one keyset query per list"""
+        after = 0
+        while True:
+            conn = self.connections.get_connection()
+            try:
+                ids = [row[0] for row in conn.execute(
+                    "SELECT id FROM users WHERE id > ? ORDER BY id LIMIT ?", (after, batch_size))]
+            except Exception as e:
+                self.logger.error(f"Error listing user IDs: {e}")
+                return
+            finally:
+                self.connections.release(conn)
+            
+            if not ids:
+                return
+            yield ids
+            after = ids[-1]
+    
+    @traced("db.save_matching_stats")
+    def save_matching_stats(self, rows: List[Tuple[int, Optional[int], int, str, str, float]]) -> bool:
+        """
+        Store precomputed matching statistics, replacing any previous row per user
+        
+        Args:
+            rows: (user_id, catalog_version, weights_version, profile_hash, stats_json, computed_at) tuples
+        """
+        conn = self.connections.begin()
+        
+        try:
+            conn.executemany("""
+                INSERT OR REPLACE INTO matching_stats
+                (user_id, catalog_version, weights_version, profile_hash, stats_json, computed_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """, rows)
+            conn.commit()
+            return True
+            
+        except Exception as e:
+            self.logger.error(f"Error saving matching stats: {e}")
+            conn.rollback()
+            return False
+        finally:
+            self.connections.release(conn)
+    
+    @traced("db.get_precomputed_matching_stats")
+    def get_precomputed_matching_stats(self, user_identifier: Union[int, str]) -> Optional[Dict[str, Any]]:
+        """
+        Fetch a user's precomputed matching statistics by user ID (int) or email (str)
+        
+        Returns:
+            Dict with catalog_version, weights_version, profile_hash, stats and computed_at, or None
+        """
+        if isinstance(user_identifier, int):
+            where, param = "user_id = ?", user_identifier
+        else:
+            where, param = "user_id = (SELECT id FROM users WHERE email = ?)", user_identifier
+        conn = self.connections.get_connection()
+        
+        try:
+            row = conn.execute(f"""
+                SELECT catalog_version, weights_version, profile_hash, stats_json, computed_at
+                FROM matching_stats WHERE {where}
+            """, (param,)).fetchone()
+            if not row:
+                return None
+            return {
+                'catalog_version': row[0],
+                'weights_version': row[1],
+                'profile_hash': row[2],
+                'stats': json.loads(row[3]),
+                'computed_at': row[4]
+            }
+        except Exception as e:
+            self.logger.error(f"Error reading precomputed matching stats: {e}")
+            return None
+        finally:
+            self.connections.release(conn)
+    
+    # Packed element width of the ranking ID and score arrays
+    RANKING_ITEM_SIZE = 8
+    
+    @traced("db.save_recommendation_ranking")
+    def save_recommendation_ranking(self, ranking_id: str, user_key: str, catalog_version: Optional[int],
+                                    weights_version: int, profile_hash: str, query: Optional[str],
+                                    sector_filter: Optional[str], ranked: List[Tuple[int, float]],
+                                    ttl: float, preferences: Optional[Dict[str, Any]] = None) -> bool:
+        """
+        Store a user's full ranking as packed ID and score arrays, and purge expired rankings
+        
+        Args:
+            ranked: (internship_id, score) pairs, best match first
+            ttl: Seconds the ranking stays readable
+            preferences: Preferences extracted from query, so later pages don't extract them again
+        """
+        now = time.time()
+        ids = array('q', [internship_id for internship_id, _ in ranked])
+        scores = array('d', [score for _, score in ranked])
+        conn = self.connections.begin()
+        
+        try:
+            conn.execute("DELETE FROM recommendation_rankings WHERE expires_at < ?", (now,))
+            conn.execute("""
+                INSERT OR REPLACE INTO recommendation_rankings
+                (ranking_id, user_key, catalog_version, weights_version, profile_hash, query,
+                 preferences, sector_filter, internship_ids, scores, created_at, expires_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, (ranking_id, user_key, catalog_version, weights_version, profile_hash, query,
+                  json.dumps(preferences) if preferences is not None else None,
+                  sector_filter, ids.tobytes(), scores.tobytes(), now, now + ttl))
+            conn.commit()
+            return True
+            
+        except Exception as e:
+            self.logger.error(f"Error saving recommendation ranking: {e}")
+            conn.rollback()
+            return False
+        finally:
+            self.connections.release(conn)
+    
+    @traced("db.get_recommendation_ranking_page")
+    def get_recommendation_ranking_page(self, ranking_id: str, offset: int,
+                                        limit: int) -> Optional[Dict[str, Any]]:
+        """
+        Read one slice of a stored ranking without loading the rest of it
+        
+        Returns:
+            Dict with the ranking's metadata, total count and the (internship_id, score)
+            pairs at [offset, offset + limit), or None if it is missing or expired
+        """
+        size = self.RANKING_ITEM_SIZE
+        conn = self.connections.get_connection()
+        
+        try:
+            row = conn.execute("""
+                SELECT user_key, catalog_version, weights_version, profile_hash, query, sector_filter,
+                       length(internship_ids) / ?, substr(internship_ids, ?, ?), substr(scores, ?, ?),
+                       expires_at, preferences
+                FROM recommendation_rankings WHERE ranking_id = ? AND expires_at >= ?
+            """, (size, offset * size + 1, limit * size, offset * size + 1, limit * size,
+                  ranking_id, time.time())).fetchone()
+            if not row:
+                return None
+            ids, scores = array('q'), array('d')
+            ids.frombytes(row[7] or b'')
+            scores.frombytes(row[8] or b'')
+            return {
+                'user_key': row[0],
+                'catalog_version': row[1],
+                'weights_version': row[2],
+                'profile_hash': row[3],
+                'query': row[4],
+                'sector_filter': row[5],
+                'total_count': row[6],
+                'items': list(zip(ids, scores)),
+                'expires_at': row[9],
+                'preferences': json.loads(row[10]) if row[10] else None
+            }
+        except Exception as e:
+            self.logger.error(f"Error reading recommendation ranking: {e}")
+            return None
+        finally:
+            self.connections.release(conn)
 
 # Example usage and testing
 def test_database_integration():
@@ -538,7 +1488,7 @@ def test_database_integration():
     print("Testing Database Integration...")
     
     # Initialize database
-    db = DatabaseConnector()
+    db = DatabaseConnector(seed_sample_data=True)
     
     # Test fetching user profile
     profile = db.get_user_profile_by_email("priya.sharma@email.com")
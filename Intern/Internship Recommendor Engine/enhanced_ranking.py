@@ -9,15 +9,21 @@ This module adds:
 4. Time-based preferences
 5. Advanced skill matching
 6. Company reputation scoring
+7. Stipend fit against salary expectations
+8. Precomputed internship features shared by every profile ranked against a catalog
+9. Counterfactual skill gap impact on a candidate's top recommendations
 """
 
+import hashlib
+import heapq
 import json
 import math
-from typing import Dict, List, Any, Tuple, Optional
+from typing import Dict, FrozenSet, Iterator, List, Any, Sequence, Tuple, Optional
 from dataclasses import dataclass
 from datetime import datetime, timedelta
 from matching_engine import CandidateProfile, Internship, MatchingEngine
 from llm_preference_processor import EnhancedMatchingEngine
+from tracing import span
 
 
 @dataclass
@@ -43,6 +49,34 @@ class CompanyReputation:
     work_life_balance: float  # 0.0 to 1.0
 
 
+# Component scores in the order they are reported for each ranked internship
+SCORE_COMPONENTS = (
+    'skills', 'sector', 'location', 'duration', 'company_type', 'affirmative_action', 'capacity',
+    'past_participation', 'company_reputation', 'diversity_bonus', 'time_preference',
+    'skill_advanced_match', 'stipend_fit'
+)
+
+
+@dataclass(frozen=True)
+class InternshipFeatures:
+    """Profile-independent scoring inputs for one internship"""
+    internship: Internship
+    required_skills: Optional[FrozenSet[str]]  # Normalized; None when no skills are listed
+    capacity: float
+    company_reputation: float
+
+
+@dataclass
+class SkillGapImpact:
+    """Effect of adding one missing skill on a candidate's top-N recommendations"""
+    skill: str
+    internships_requiring: int
+    top_n_score_gain: float  # Mean top-N score after minus before
+    best_score_gain: float
+    entered_top_n: int  # Internships that move into the top N
+    rank_improvements: List[Dict[str, Any]]  # Top-N internships that move up, with old and new rank
+
+
 class EnhancedRankingEngine(EnhancedMatchingEngine):
     """
     Enhanced matching engine with advanced ranking features
@@ -57,19 +91,33 @@ class EnhancedRankingEngine(EnhancedMatchingEngine):
             'sector': 0.15,           # Reduced from 0.20
             'location': 0.10,         # Reduced from 0.15
             'duration': 0.08,         # Reduced from 0.10
-            'company_type': 0.08,     # Reduced from 0.10
+            'company_type': 0.05,     # Reduced from 0.10 (0.03 moved to stipend_fit)
             'affirmative_action': 0.05, # Same
-            'capacity': 0.05,         # Same
+            'capacity': 0.03,         # Reduced from 0.05 (0.02 moved to stipend_fit)
             'past_participation': 0.10,  # NEW
             'company_reputation': 0.08,  # NEW
             'diversity_bonus': 0.06,     # NEW
             'time_preference': 0.05,     # NEW
-            'skill_advanced_match': 0.05 # NEW
+            'skill_advanced_match': 0.05, # NEW
+            'stipend_fit': 0.05          # NEW; taken from company_type and capacity so the total stays 1.10
         }
         
         # Sample data for demonstration
         self.past_participations = self._create_sample_past_participations()
         self.company_reputations = self._create_sample_company_reputations()
+        
+        # Features of recently ranked catalog tuples: id(tuple) -> (tuple, features)
+        self._features_cache: Dict[int, Tuple[tuple, List[InternshipFeatures]]] = {}
+        self.features_cache_size = 64
+    
+    def get_features_cache_size(self) -> int:
+        """Number of catalogs whose precomputed features are cached"""
+        return len(self._features_cache)
+    
+    def get_weights_version(self) -> int:
+        """Fingerprint of the base and enhanced weights; it changes whenever any weight does and is stable across processes"""
+        payload = json.dumps([sorted(self.weights.items()), sorted(self.enhanced_weights.items())])
+        return int(hashlib.sha256(payload.encode('utf-8')).hexdigest()[:15], 16)
     
     def _create_sample_past_participations(self) -> List[PastParticipation]:
         """Create sample past participation data"""
@@ -234,11 +282,15 @@ class EnhancedRankingEngine(EnhancedMatchingEngine):
         
         candidate_skills = set(self.normalize_skills(profile.skills))
         required_skills = set(self.normalize_skills(internship.skills_required))
-        
-        # Basic overlap
+        return self._advanced_skill_score(candidate_skills, required_skills)
+    
+    def _advanced_skill_score(self, candidate_skills: FrozenSet[str], required_skills: FrozenSet[str]) -> float:
+        """Advanced skill score of two normalized skill sets"""
         overlap = len(candidate_skills.intersection(required_skills))
-        total_required = len(required_skills)
-        
+        return self._advanced_skill_score_from_counts(overlap, len(required_skills), len(candidate_skills) - overlap)
+    
+    def _advanced_skill_score_from_counts(self, overlap: int, total_required: int, additional: int) -> float:
+        """Advanced skill score from the candidate/required overlap and the candidate's extra skill count"""
         if total_required == 0:
             return 1.0
         
@@ -249,12 +301,52 @@ class EnhancedRankingEngine(EnhancedMatchingEngine):
             base_score += 0.2
         
         # Bonus for having additional relevant skills
-        additional_skills = candidate_skills - required_skills
-        if additional_skills:
-            base_score += min(len(additional_skills) * 0.05, 0.15)
+        if additional:
+            base_score += min(additional * 0.05, 0.15)
         
         return min(base_score, 1.0)
     
+    def _skill_scores(self, candidate_skills: FrozenSet[str],
+                      required_skills: Optional[FrozenSet[str]]) -> Tuple[float, float]:
+        """(skills, skill_advanced_match) for normalized skill sets, as the per-internship methods compute them"""
+        if required_skills is None:
+            return 1.0, 1.0
+        
+        union = len(candidate_skills | required_skills)
+        jaccard = len(candidate_skills & required_skills) / union if union else 0.0
+        return jaccard, self._advanced_skill_score(candidate_skills, required_skills)
+    
+    def _stipend_fit(self, expected: Optional[int], stipend_min: Optional[int], stipend_max: Optional[int]) -> float:
+        """Score how well a stipend range meets a monthly stipend target"""
+        if not expected or stipend_max is None:
+            return 0.5  # Neutral score if no expectation or unknown stipend
+        
+        if expected <= stipend_min:
+            return 1.0
+        if expected <= stipend_max:
+            # Target falls inside the range: better the closer it is to the bottom
+            return 0.5 + 0.5 * (stipend_max - expected) / (stipend_max - stipend_min)
+        
+        # Range tops out below the target
+        return 0.5 * stipend_max / expected
+    
+    def compute_stipend_fit_score(self, profile: CandidateProfile, internship: Internship) -> float:
+        """Compute score based on the candidate's stipend expectation"""
+        return self._stipend_fit(profile.expected_stipend, internship.stipend_min, internship.stipend_max)
+    
+    def compute_stipend_fit_scores(self, profile: CandidateProfile, internships: Sequence[Internship]) -> List[float]:
+        """
+        Compute the stipend fit factor for a whole catalog in one pass
+        
+        Returns scores in the same order as internships.
+        """
+        expected = profile.expected_stipend
+        if not expected:
+            return [0.5] * len(internships)
+        
+        stipend_fit = self._stipend_fit
+        return [stipend_fit(expected, internship.stipend_min, internship.stipend_max) for internship in internships]
+    
     def compute_enhanced_fit_score(self, profile: CandidateProfile, internship: Internship) -> float:
         """
         Compute enhanced fit score with all advanced factors
@@ -276,7 +368,8 @@ class EnhancedRankingEngine(EnhancedMatchingEngine):
             'company_reputation': self.compute_company_reputation_score(internship),
             'diversity_bonus': self.compute_diversity_bonus(profile, internship),
             'time_preference': self.compute_time_preference_score(profile, internship),
-            'skill_advanced_match': self.compute_advanced_skill_match(profile, internship)
+            'skill_advanced_match': self.compute_advanced_skill_match(profile, internship),
+            'stipend_fit': self.compute_stipend_fit_score(profile, internship)
         }
         
         # Combine all scores with enhanced weights
@@ -289,44 +382,266 @@ class EnhancedRankingEngine(EnhancedMatchingEngine):
         
         return min(total_score, 1.0)
     
+    def build_internship_features(self, internships: Sequence[Internship]) -> List[InternshipFeatures]:
+        """Precompute the profile-independent scoring inputs of every internship"""
+        return [
+            InternshipFeatures(
+                internship=internship,
+                required_skills=(frozenset(self.normalize_skills(internship.skills_required))
+                                 if internship.skills_required else None),
+                capacity=self.compute_capacity_score(internship.capacity),
+                company_reputation=self.compute_company_reputation_score(internship)
+            )
+            for internship in internships
+        ]
+    
+    def get_internship_features(self, internships: Sequence[Internship]) -> List[InternshipFeatures]:
+        """
+        Features for internships, reused while the same immutable catalog tuple is ranked again
+        
+        Catalog snapshots hand out the same tuple for every request at one version, so
+        features are built once per version (and sector) rather than once per request.
+        """
+        if not isinstance(internships, tuple):
+            return self.build_internship_features(internships)
+        
+        cached = self._features_cache.get(id(internships))
+        if cached is not None and cached[0] is internships:
+            return cached[1]
+        
+        features = self.build_internship_features(internships)
+        if len(self._features_cache) >= self.features_cache_size:
+            self._features_cache = {}  # Old catalog versions; start over rather than track recency
+        self._features_cache[id(internships)] = (internships, features)
+        return features
+    
     def rank_internships_enhanced(self, profile: CandidateProfile, internships: List[Internship], top_n: int = 10) -> List[Tuple[Internship, float, Dict[str, float]]]:
         """
         Enhanced ranking with all advanced factors
         """
-        scored_internships = []
+        with span("ranking.features"):
+            features = self.get_internship_features(internships)
+        return self.rank_with_features(profile, features, top_n)
+    
+    def rank_with_features(self, profile: CandidateProfile, features: Sequence[InternshipFeatures],
+                           top_n: int = 10) -> List[Tuple[Internship, float, Dict[str, float]]]:
+        """
+        Rank precomputed internship features for one profile
         
-        for internship in internships:
-            total_score = self.compute_enhanced_fit_score(profile, internship)
+        Scores are identical to compute_enhanced_fit_score. Profile-side inputs are
+        derived once, and components that depend on a single categorical internship
+        field (sector, location, duration, company type, skill set) are computed once
+        per distinct value rather than once per internship.
+        """
+        # nlargest is a stable descending sort truncated to top_n; build explanations only for those
+        with span("ranking.score"):
+            top = heapq.nlargest(top_n, self._score_features(profile, features), key=lambda x: x[0])
+        with span("ranking.components"):
+            return [(internship, total_score, dict(zip(SCORE_COMPONENTS, values)))
+                    for total_score, internship, values in top]
+    
+    def iter_scores(self, profile: CandidateProfile, internships: Sequence[Internship]) -> Iterator[Tuple[Internship, float]]:
+        """Yield (internship, enhanced score) for every internship in catalog order, without explanations"""
+        for total_score, internship, _ in self._score_features(profile, self.get_internship_features(internships)):
+            yield internship, total_score
+    
+    def explain_scores(self, profile: CandidateProfile,
+                       internships: Sequence[Internship]) -> List[Tuple[Internship, float, Dict[str, float]]]:
+        """Score and explain internships in the given order, e.g. one page of a stored ranking"""
+        return [(internship, total_score, dict(zip(SCORE_COMPONENTS, values)))
+                for total_score, internship, values in
+                self._score_features(profile, self.build_internship_features(internships))]
+    
+    def _score_features(self, profile: CandidateProfile,
+                        features: Sequence[InternshipFeatures]) -> Iterator[Tuple[float, Internship, tuple]]:
+        """Yield (total score, internship, component values in SCORE_COMPONENTS order) per feature"""
+        candidate_skills = frozenset(self.normalize_skills(profile.skills))
+        preferred_sectors = profile.preferred_sectors or []
+        affirmative_action = self.compute_affirmative_action_score(profile)
+        candidate_id = profile.email.split('@')[0]
+        has_history = any(p.candidate_id == candidate_id for p in self.past_participations)
+        time_preference = None  # Not internship-specific yet; computed on first use
+        
+        weights = self._weight_items()
+        
+        skill_memo, sector_memo, location_memo = {}, {}, {}
+        duration_memo, company_type_memo, diversity_memo = {}, {}, {}
+        
+        # Stipend fit only depends on the catalog's numeric ranges, so score it for all internships at once
+        stipend_scores = self.compute_stipend_fit_scores(profile, [feature.internship for feature in features])
+        
+        for feature, stipend_fit in zip(features, stipend_scores):
+            internship = feature.internship
             
-            # Get all component scores for detailed explanation
-            component_scores = {
-                'skills': self.compute_skill_match(profile.skills, internship.skills_required),
-                'sector': self.compute_sector_match(profile.preferred_sectors or [], internship.sector),
-                'location': self.compute_location_match(profile.preferred_location, internship.location, internship.remote_available),
-                'duration': self.compute_duration_match(profile.preferred_duration, internship.duration),
-                'company_type': self.compute_company_type_match(profile.preferred_company_type, internship.company_type),
-                'affirmative_action': self.compute_affirmative_action_score(profile),
-                'capacity': self.compute_capacity_score(internship.capacity),
-                'past_participation': self.compute_past_participation_score(profile, internship),
-                'company_reputation': self.compute_company_reputation_score(internship),
-                'diversity_bonus': self.compute_diversity_bonus(profile, internship),
-                'time_preference': self.compute_time_preference_score(profile, internship),
-                'skill_advanced_match': self.compute_advanced_skill_match(profile, internship)
-            }
+            skill_scores = skill_memo.get(feature.required_skills)
+            if skill_scores is None:
+                skill_scores = skill_memo[feature.required_skills] = self._skill_scores(
+                    candidate_skills, feature.required_skills)
             
-            scored_internships.append((internship, total_score, component_scores))
-        
-        # Sort by total score (descending)
-        scored_internships.sort(key=lambda x: x[1], reverse=True)
-        
-        return scored_internships[:top_n]
+            sector = sector_memo.get(internship.sector)
+            if sector is None:
+                sector = sector_memo[internship.sector] = self.compute_sector_match(
+                    preferred_sectors, internship.sector)
+            
+            location_key = (internship.location, internship.remote_available)
+            location = location_memo.get(location_key)
+            if location is None:
+                location = location_memo[location_key] = self.compute_location_match(
+                    profile.preferred_location, internship.location, internship.remote_available)
+            
+            duration = duration_memo.get(internship.duration)
+            if duration is None:
+                duration = duration_memo[internship.duration] = self.compute_duration_match(
+                    profile.preferred_duration, internship.duration)
+            
+            company_type = company_type_memo.get(internship.company_type)
+            if company_type is None:
+                company_type = company_type_memo[internship.company_type] = self.compute_company_type_match(
+                    profile.preferred_company_type, internship.company_type)
+            
+            # Diversity only looks at the internship's location
+            diversity = diversity_memo.get(internship.location)
+            if diversity is None:
+                diversity = diversity_memo[internship.location] = self.compute_diversity_bonus(profile, internship)
+            
+            if time_preference is None:
+                time_preference = self.compute_time_preference_score(profile, internship)
+            
+            values = (
+                skill_scores[0], sector, location, duration, company_type, affirmative_action, feature.capacity,
+                self.compute_past_participation_score(profile, internship) if has_history else 0.5,
+                feature.company_reputation, diversity, time_preference, skill_scores[1], stipend_fit
+            )
+            
+            yield self._combine_scores(values, weights), internship, values
+    
+    def _weight_items(self) -> List[Tuple[int, float]]:
+        """Enhanced weights as (SCORE_COMPONENTS index, weight) pairs, in enhanced_weights order"""
+        factor_index = {factor: i for i, factor in enumerate(SCORE_COMPONENTS)}
+        return [(factor_index[factor], weight) for factor, weight in self.enhanced_weights.items()
+                if factor in factor_index]
     
-    def match_with_enhanced_ranking(self, profile: CandidateProfile, natural_language_preferences: str, internships: List[Internship], top_n: int = 10) -> Tuple[List[Tuple[Internship, float, Dict[str, float]]], Any]:
+    @staticmethod
+    def _combine_scores(values: Sequence[float], weights: List[Tuple[int, float]]) -> float:
+        """Weighted total of component values, capped at 1.0"""
+        # Same summation order as compute_enhanced_fit_score, so totals match bit for bit
+        total_score = 0.0
+        for index, weight in weights:
+            total_score += weight * values[index]
+        return min(total_score, 1.0)
+    
+    def analyze_skill_gaps(self, profile: CandidateProfile, internships: Sequence[Internship],
+                           top_n: int = 10, limit: Optional[int] = None) -> List['SkillGapImpact']:
+        """
+        Estimate, for every required skill the candidate lacks, how adding it would change their top matches
+        
+        Adding one skill only changes the two skill components, and for a given
+        internship the change depends only on whether that internship requires the
+        skill. So each internship gets two counterfactual totals (skill required /
+        not required), computed once for all skills. Per skill, its new top-N is
+        read from one pre-sorted "not required" order, skipping the internships in
+        that skill's incidence list, merged with their "required" totals. Results
+        equal re-ranking with the skill added to profile.skills.
+        
+        Args:
+            profile: Candidate to analyze
+            internships: Catalog to rank against
+            top_n: Size of the recommendation list whose scores and ranks are compared
+            limit: Maximum skills to return (all when None)
+            
+        Returns:
+            SkillGapImpact per missing skill, largest average top-N score gain first
+        """
+        features = self.get_internship_features(internships)
+        candidate_skills = frozenset(self.normalize_skills(profile.skills))
+        weights = self._weight_items()
+        skills_index = SCORE_COMPONENTS.index('skills')
+        advanced_index = SCORE_COMPONENTS.index('skill_advanced_match')
+        
+        def with_skill_scores(values: tuple, jaccard: float, advanced: float) -> float:
+            changed = list(values)
+            changed[skills_index] = jaccard
+            changed[advanced_index] = advanced
+            return self._combine_scores(changed, weights)
+        
+        baseline, without_skill, with_skill = [], [], {}
+        incidence: Dict[str, List[int]] = {}  # Missing skill -> positions of internships requiring it
+        for position, (feature, (total, _, values)) in enumerate(
+                zip(features, self._score_features(profile, features))):
+            baseline.append(total)
+            required = feature.required_skills
+            if required is None:
+                without_skill.append(total)  # No listed skills: both skill components are 1.0 regardless
+                continue
+            
+            overlap = len(candidate_skills & required)
+            union = len(candidate_skills | required)
+            additional = len(candidate_skills) - overlap
+            without_skill.append(with_skill_scores(
+                values, overlap / (union + 1),
+                self._advanced_skill_score_from_counts(overlap, len(required), additional + 1)))
+            
+            missing = required - candidate_skills
+            if missing:
+                with_skill[position] = with_skill_scores(
+                    values, (overlap + 1) / union,
+                    self._advanced_skill_score_from_counts(overlap + 1, len(required), additional))
+                for skill in missing:
+                    incidence.setdefault(skill, []).append(position)
+        
+        # Stable descending orders: ties keep catalog order, as in rank_internships_enhanced
+        baseline_order = sorted(range(len(baseline)), key=lambda i: (-baseline[i], i))
+        without_order = sorted(range(len(without_skill)), key=lambda i: (-without_skill[i], i))
+        old_rank = {position: rank for rank, position in enumerate(baseline_order, 1)}
+        baseline_top = baseline_order[:top_n]
+        baseline_scores = [baseline[i] for i in baseline_top]
+        baseline_mean = sum(baseline_scores) / len(baseline_scores) if baseline_scores else 0.0
+        
+        impacts = []
+        for skill, positions in incidence.items():
+            requiring = set(positions)
+            candidates = [(with_skill[i], i) for i in positions]
+            kept = 0
+            for i in without_order:
+                if kept >= top_n:
+                    break
+                if i not in requiring:
+                    candidates.append((without_skill[i], i))
+                    kept += 1
+            new_top = heapq.nsmallest(top_n, candidates, key=lambda item: (-item[0], item[1]))
+            new_scores = [score for score, _ in new_top]
+            
+            first = features[positions[0]].internship
+            display = next((raw for raw in first.skills_required if self.normalize_skills([raw]) == [skill]), skill)
+            impacts.append(SkillGapImpact(
+                skill=display,
+                internships_requiring=len(positions),
+                top_n_score_gain=(sum(new_scores) / len(new_scores) if new_scores else 0.0) - baseline_mean,
+                best_score_gain=(new_scores[0] if new_scores else 0.0) - (baseline_scores[0] if baseline_scores else 0.0),
+                entered_top_n=sum(1 for _, i in new_top if old_rank[i] > top_n),
+                rank_improvements=[
+                    {'internship_id': features[i].internship.internship_id,
+                     'title': features[i].internship.title,
+                     'old_rank': old_rank[i], 'new_rank': new_rank, 'score': score}
+                    for new_rank, (score, i) in enumerate(new_top, 1) if new_rank < old_rank[i]
+                ]
+            ))
+        
+        impacts.sort(key=lambda impact: (-impact.top_n_score_gain, -impact.entered_top_n,
+                                         -impact.best_score_gain, impact.skill.lower()))
+        return impacts[:limit] if limit is not None else impacts
+    
+    def match_with_enhanced_ranking(self, profile: CandidateProfile, natural_language_preferences: str, internships: List[Internship], top_n: int = 10,
+                                    extracted_preferences: Any = None) -> Tuple[List[Tuple[Internship, float, Dict[str, float]]], Any]:
         """
         Enhanced matching with natural language processing and advanced ranking
+        
+        If extracted_preferences is given (e.g. memoized by the caller), the
+        natural language text is not processed again.
         """
         # Process natural language preferences
-        extracted_preferences = self.preference_processor.process_natural_language_preferences(natural_language_preferences)
+        if extracted_preferences is None:
+            extracted_preferences = self.preference_processor.process_natural_language_preferences(natural_language_preferences)
         
         # Merge with existing profile
         enhanced_profile = self.preference_processor.merge_with_profile(profile, extracted_preferences)
@@ -0,0 +1,172 @@
+"""
+Health Monitoring for the AI Internship Matching Engine
+Features:
+1. Liveness that never touches the database, the catalog or the ranking engine
+2. Readiness answered from cached component status, so a probe costs a dict read
+3. Background self-test that refreshes the status of the database, catalog and
+   ranking engine once per interval
+4. Readiness fails when the self-test stops reporting, not only when it reports errors
+"""
+
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from matching_engine import CandidateProfile
+
+# Synthetic profile scored by the ranking engine self-test
+SELF_TEST_PROFILE = CandidateProfile(
+    full_name="Health Check",
+    education="Test",
+    contact_number="",
+    current_address="",
+    email="health-check@localhost",
+    linkedin="",
+    experience=[],
+    skills=["Python"],
+    gender="",
+    disability_status=False,
+    veteran=False
+)
+
+
+@dataclass
+class ComponentStatus:
+    """Result of the latest self-test of one component"""
+    healthy: bool
+    checked_at: float  # Unix time
+    latency_ms: float
+    detail: Dict[str, Any] = field(default_factory=dict)
+    error: Optional[str] = None
+
+
+class HealthMonitor:
+    """
+    Cached component health for one AIMatchingAPI
+
+    The first status read runs the self-test synchronously and starts a daemon
+    thread that repeats it every interval; later reads never block on it.
+    """
+
+    def __init__(self, api_instance, interval: float = 30.0, max_staleness: Optional[float] = None):
+        """
+        Args:
+            api_instance: AIMatchingAPI whose database, catalog and ranking engine are checked
+            interval: Seconds between background self-tests
+            max_staleness: Oldest self-test result readiness accepts (default: 3 intervals)
+        """
+        self.api = api_instance
+        self.interval = interval
+        self.max_staleness = max_staleness if max_staleness is not None else 3 * interval
+        self.started_at = time.time()
+        self.self_test_runs = 0
+        self.last_run: Optional[float] = None
+        self.logger = logging.getLogger(__name__)
+
+        self._status: Dict[str, ComponentStatus] = {}
+        self._run_lock = threading.Lock()
+        self._worker: Optional[threading.Thread] = None
+        self._worker_lock = threading.Lock()
+        self._stop = threading.Event()
+
+    def run_self_test(self) -> Dict[str, ComponentStatus]:
+        """Check every component now and publish the results"""
+        checks: Tuple[Tuple[str, Callable[[], Dict[str, Any]]], ...] = (
+            ('database', self._check_database),
+            ('catalog', self._check_catalog),
+            ('ranking_engine', self._check_ranking_engine),
+        )
+        with self._run_lock:
+            status = {name: self._run_check(name, check) for name, check in checks}
+            self._status = status  # Readers see the whole previous or whole new result
+            self.last_run = time.time()
+            self.self_test_runs += 1
+        return status
+
+    def _run_check(self, name: str, check: Callable[[], Dict[str, Any]]) -> ComponentStatus:
+        start = time.perf_counter()
+        try:
+            detail = check()
+            healthy, error = True, None
+        except Exception as e:
+            self.logger.warning(f"Health self-test of {name} failed: {e}")
+            detail, healthy, error = {}, False, str(e)
+        return ComponentStatus(healthy, time.time(), round((time.perf_counter() - start) * 1000, 3), detail, error)
+
+    def _check_database(self) -> Dict[str, Any]:
+        version = self.api.db.get_catalog_version()  # One indexed single-row read
+        if version is None:
+            raise RuntimeError("catalog version watermark could not be read")
+        return {'catalog_version': version}
+
+    def _check_catalog(self) -> Dict[str, Any]:
+        snapshot = self.api.catalog.snapshot()
+        return {
+            'version': snapshot.version,
+            'internships': len(snapshot.internships),
+            'age_seconds': round(time.time() - snapshot.loaded_at, 3)
+        }
+
+    def _check_ranking_engine(self) -> Dict[str, Any]:
+        internships = self.api.catalog.snapshot().internships[:1]
+        scored = self.api.matching_engine.explain_scores(SELF_TEST_PROFILE, internships)
+        if len(scored) != len(internships) or any(not 0.0 <= score <= 1.0 for _, score, _ in scored):
+            raise RuntimeError("ranking engine returned an invalid score")
+        return {'weights_version': self.api.matching_engine.get_weights_version()}
+
+    def status(self) -> Dict[str, ComponentStatus]:
+        """Latest component status, running the first self-test and starting the worker if needed"""
+        if self.last_run is None:
+            self.run_self_test()
+        self._ensure_worker()
+        return self._status
+
+    def liveness(self) -> Dict[str, Any]:
+        """Process-level liveness; does no I/O"""
+        return {'status': 'alive', 'uptime_seconds': round(time.time() - self.started_at, 3)}
+
+    def readiness(self) -> Tuple[bool, Dict[str, Any]]:
+        """
+        Whether every component passed the latest self-test and that test is recent
+
+        Returns:
+            (ready, JSON-serializable report)
+        """
+        status = self.status()
+        age = time.time() - self.last_run
+        fresh = age <= self.max_staleness
+        ready = fresh and all(component.healthy for component in status.values())
+        return ready, {
+            'ready': ready,
+            'self_test_age_seconds': round(age, 3),
+            'self_test_fresh': fresh,
+            'components': {
+                name: {'healthy': component.healthy, 'latency_ms': component.latency_ms,
+                       'error': component.error, **component.detail}
+                for name, component in status.items()
+            }
+        }
+
+    def close(self):
+        """Stop the background self-test"""
+        self._stop.set()
+        worker = self._worker
+        if worker is not None and worker is not threading.current_thread():
+            worker.join(timeout=5)
+
+    def _ensure_worker(self):
+        if self._stop.is_set() or (self._worker is not None and self._worker.is_alive()):
+            return
+        with self._worker_lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run_worker, name="health-self-test", daemon=True)
+                self._worker.start()
+
+    def _run_worker(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.run_self_test()
+            except Exception as e:
+                self.logger.error(f"Background health self-test failed: {e}")
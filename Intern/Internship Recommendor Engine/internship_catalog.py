@@ -0,0 +1,176 @@
+"""
+In-Memory Internship Catalog for the AI Internship Matching Engine
+Features:
+1. Process-level snapshot of immutable internships shared by every request
+2. Per-sector and per-ID indexes built once per snapshot
+3. Change detection through the database catalog version watermark
+4. Lock-free reads; a background worker builds the next snapshot and swaps it in
+"""
+
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+from matching_engine import Internship
+from database_integration import DatabaseConnector
+
+
+@dataclass(frozen=True)
+class CatalogSnapshot:
+    """Immutable view of the active internships at one catalog version"""
+    version: Optional[int]
+    internships: Tuple[Internship, ...]
+    by_sector: Dict[str, Tuple[Internship, ...]]
+    by_id: Dict[int, Internship]
+    loaded_at: float
+
+    @classmethod
+    def build(cls, version: Optional[int], internships) -> 'CatalogSnapshot':
+        """Index internships (already ordered newest first) into a snapshot"""
+        internships = tuple(internships)
+        by_sector: Dict[str, list] = {}
+        for internship in internships:
+            by_sector.setdefault(internship.sector.lower(), []).append(internship)
+
+        return cls(
+            version=version,
+            internships=internships,
+            by_sector={sector: tuple(items) for sector, items in by_sector.items()},
+            by_id={i.internship_id: i for i in internships if i.internship_id is not None},
+            loaded_at=time.time()
+        )
+
+    def get_internships(self, sector: Optional[str] = None) -> Tuple[Internship, ...]:
+        """Active internships, optionally for one sector (case-insensitive, like the SQL filter)"""
+        if sector:
+            return self.by_sector.get(sector.lower(), ())
+        return self.internships
+
+
+# Catalogs shared by every API instance in this process, keyed by database file
+_CATALOGS: Dict[tuple, 'InternshipCatalog'] = {}
+_CATALOGS_LOCK = threading.Lock()
+
+
+class InternshipCatalog:
+    """
+    Process-level cache of the active internship catalog
+
+    Readers get the current snapshot without taking a lock or touching the
+    database. At most once per check_interval a read wakes the refresh worker,
+    which compares the catalog version watermark and, only if it moved, loads
+    and indexes the next snapshot before publishing it with a single reference swap.
+    """
+
+    def __init__(self, db: DatabaseConnector, check_interval: float = 1.0):
+        self.db = db
+        self.check_interval = check_interval
+        self.logger = logging.getLogger(__name__)
+        self.refresh_count = 0
+
+        self._snapshot: Optional[CatalogSnapshot] = None
+        self._last_check = 0.0
+        self._refresh_lock = threading.Lock()
+        self._worker: Optional[threading.Thread] = None
+        self._worker_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = False
+
+    @classmethod
+    def for_database(cls, db: DatabaseConnector, check_interval: float = 1.0) -> 'InternshipCatalog':
+        """Return the catalog shared by every connector on the same database file"""
+        key = db._database_key()
+        if key is None:
+            return cls(db, check_interval)  # In-memory databases are private to their connector
+
+        with _CATALOGS_LOCK:
+            catalog = _CATALOGS.get(key)
+            if catalog is None or catalog._stopped:
+                catalog = _CATALOGS[key] = cls(db, check_interval)
+            return catalog
+
+    def snapshot(self) -> CatalogSnapshot:
+        """Return the current snapshot, scheduling a background change check when one is due"""
+        snapshot = self._snapshot
+        if snapshot is None:
+            return self.refresh()  # First load is synchronous
+
+        now = time.monotonic()
+        if now - self._last_check >= self.check_interval:
+            self._last_check = now
+            self._request_refresh()
+        return snapshot
+
+    def peek(self) -> Optional[CatalogSnapshot]:
+        """The loaded snapshot, or None before the first load; never loads or checks for changes"""
+        return self._snapshot
+
+    def get_internships(self, sector: Optional[str] = None) -> Tuple[Internship, ...]:
+        """Active internships from the current snapshot, optionally for one sector"""
+        return self.snapshot().get_internships(sector)
+
+    def refresh(self, force: bool = False) -> CatalogSnapshot:
+        """
+        Bring the snapshot up to date synchronously
+
+        Args:
+            force: Reload even if the catalog version has not changed
+
+        Returns:
+            The snapshot that is current after the refresh
+        """
+        with self._refresh_lock:
+            self._last_check = time.monotonic()
+            current = self._snapshot
+
+            if current is not None and not force:
+                version = self.db.get_catalog_version()
+                if version is not None and version == current.version:
+                    return current
+
+            version, internships = self.db.load_catalog()
+            if version is None and current is not None:
+                return current  # Keep serving the last good snapshot if loading failed
+
+            snapshot = CatalogSnapshot.build(version, internships)
+            self._snapshot = snapshot
+            self.refresh_count += 1
+            self.logger.info(f"Loaded internship catalog version {version} ({len(snapshot.internships)} internships)")
+            return snapshot
+
+    def close(self):
+        """Stop the background refresh worker"""
+        self._stopped = True
+        self._wake.set()
+        worker = self._worker
+        if worker is not None and worker is not threading.current_thread():
+            worker.join(timeout=5)
+
+    def _request_refresh(self):
+        """Wake the refresh worker, starting it on first use"""
+        if self._stopped:
+            return
+
+        if self._worker is None or not self._worker.is_alive():
+            with self._worker_lock:
+                if self._worker is None or not self._worker.is_alive():
+                    # One long-lived worker reuses one pooled connection for every check
+                    self._worker = threading.Thread(target=self._run_worker, name="internship-catalog-refresh",
+                                                    daemon=True)
+                    self._worker.start()
+        self._wake.set()
+
+    def _run_worker(self):
+        """Refresh loop: wait for a wake-up, then check the version and reload if needed"""
+        while True:
+            self._wake.wait()
+            self._wake.clear()
+            if self._stopped:
+                return
+
+            try:
+                self.refresh()
+            except Exception as e:
+                self.logger.error(f"Background catalog refresh failed: {e}")
@@ -7,19 +7,25 @@ This module handles:
 2. Extracting structured information from text
 3. Integrating with the existing matching engine
 4. Fallback to rule-based processing when LLM is unavailable
+5. Optional streaming of LLM output with incremental JSON parsing
+6. Instrumentation of LLM calls (latency, sizes, fallbacks, confidence, cache)
 """
 
 import json
+import logging
 import re
+import threading
+import time
 import requests
-from typing import Dict, List, Any, Optional, Tuple
-from dataclasses import dataclass
-from matching_engine import CandidateProfile, MatchingEngine, Internship
+from typing import Dict, List, Any, Optional, Tuple, Union, Iterator
+from dataclasses import dataclass, replace
+from matching_engine import CandidateProfile, MatchingEngine, Internship, ProfileOverlay
+from metrics import Histogram
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ExtractedPreferences:
-    """Structured preferences extracted from natural language"""
+    """Structured preferences extracted from natural language (immutable)"""
     preferred_sectors: List[str] = None
     preferred_location: str = None
     preferred_duration: str = None
@@ -29,6 +35,248 @@ class ExtractedPreferences:
     salary_expectations: str = None
     remote_preference: bool = None
     confidence_score: float = 0.0
+    expected_stipend: Optional[int] = None  # salary_expectations as monthly rupees
+
+
+# Salary expressions, compiled once; the first match is kept as salary_expectations
+SALARY_PATTERNS = [
+    re.compile(r'(\d[\d,]*(?:\.\d+)?)\s*(?:lakhs?|lacs?|lpa|k|thousand)\b'),  # \b: "5 km" is a distance
+    re.compile(r'rs\.?\s*(\d[\d,]*(?:\.\d+)?)'),
+    re.compile(r'₹\s*(\d[\d,]*(?:\.\d+)?)'),
+    re.compile(r'(\d[\d,]*(?:\.\d+)?)\s*rupees')
+]
+
+_SALARY_UNIT_PATTERN = re.compile(r'\d\s*(k|thousand|lakhs?|lacs?|lpa)\b')
+_PER_MONTH_PATTERN = re.compile(r'per\s*month|/\s*month|monthly|\bpm\b|a\s+month')
+_PER_YEAR_PATTERN = re.compile(r'per\s*(?:annum|year)|/\s*(?:year|yr)|yearly|annual|\blpa\b|\bp\.?a\.?\b')
+
+
+def parse_salary_expectation(text: Optional[str]) -> Optional[int]:
+    """
+    Convert a salary expression into a monthly rupee target
+    
+    Lakh amounts follow the usual per-annum convention unless the text says
+    per month; other amounts are taken as monthly unless the text says per year.
+    """
+    if not text:
+        return None
+    
+    text_lower = text.lower()
+    for pattern in SALARY_PATTERNS:
+        match = pattern.search(text_lower)
+        if match:
+            break
+    else:
+        return None
+    
+    amount = float(match.group(1).replace(',', ''))
+    unit_match = _SALARY_UNIT_PATTERN.search(text_lower, match.start())
+    unit = unit_match.group(1) if unit_match and unit_match.start() < match.end() else ''
+    
+    if unit in ('k', 'thousand'):
+        amount *= 1000
+        annual = bool(_PER_YEAR_PATTERN.search(text_lower))
+    elif unit:
+        amount *= 100000
+        annual = not _PER_MONTH_PATTERN.search(text_lower)
+    else:
+        annual = bool(_PER_YEAR_PATTERN.search(text_lower))
+    
+    return int(amount / 12) if annual else int(amount)
+
+
+GEMINI_API_BASE = "https://generativelanguage.googleapis.com/v1beta/models/gemini-1.5-flash"
+
+
+class IncrementalJSONObjectParser:
+    """
+    Parses a single JSON object from text that arrives in fragments
+    
+    Each top-level field is parsed as soon as its value is complete, and
+    `complete` is set at the closing brace, so a streamed response can be
+    abandoned there instead of waiting for the model to finish its output.
+    Text before the opening brace (e.g. a markdown code fence) is ignored.
+    """
+    
+    def __init__(self):
+        self.fields: Dict[str, Any] = {}
+        self.complete = False
+        self.errors = 0
+        self._member: List[str] = []
+        self._started = False
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+    
+    def feed(self, fragment: str) -> List[Tuple[str, Any]]:
+        """Consume a text fragment and return the fields it completed"""
+        completed = []
+        member = self._member
+        
+        for char in fragment:
+            if self.complete:
+                break
+            
+            if not self._started:
+                if char == '{':
+                    self._started = True
+                    self._depth = 1
+                continue
+            
+            if self._in_string:
+                member.append(char)
+                if self._escape:
+                    self._escape = False
+                elif char == '\\':
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                continue
+            
+            if char == '"':
+                self._in_string = True
+            elif char in '{[':
+                self._depth += 1
+            elif char in '}]':
+                self._depth -= 1
+                if self._depth == 0:
+                    self._finish_member(completed)
+                    self.complete = True
+                    continue
+            elif char == ',' and self._depth == 1:
+                self._finish_member(completed)
+                continue
+            
+            member.append(char)
+        
+        return completed
+    
+    def _finish_member(self, completed: List[Tuple[str, Any]]):
+        """Parse the buffered `"key": value` member and record it"""
+        text = ''.join(self._member).strip()
+        self._member.clear()
+        if not text:
+            return
+        
+        try:
+            parsed = json.loads('{' + text + '}')
+        except json.JSONDecodeError:
+            self.errors += 1
+            return
+        
+        for key, value in parsed.items():
+            self.fields[key] = value
+            completed.append((key, value))
+
+
+class LLMMetrics:
+    """
+    Thread-safe instrumentation for LLMPreferenceProcessor
+    
+    Tracks call latency, prompt and response sizes (characters, plus tokens when
+    the API reports usage), parse failures, fallbacks to rule-based processing,
+    confidence score distribution and preference cache hits.
+    """
+    
+    LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+    SIZE_BUCKETS = (256, 512, 1024, 2048, 4096, 8192)
+    CONFIDENCE_BUCKETS = (0.2, 0.4, 0.6, 0.8, 1.0)
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.call_latency = Histogram(self.LATENCY_BUCKETS)
+        self.first_chunk_latency = Histogram(self.LATENCY_BUCKETS)
+        self.prompt_chars = Histogram(self.SIZE_BUCKETS)
+        self.response_chars = Histogram(self.SIZE_BUCKETS)
+        self.confidence = {
+            'llm': Histogram(self.CONFIDENCE_BUCKETS),
+            'rules': Histogram(self.CONFIDENCE_BUCKETS)
+        }
+        self.reset()
+    
+    def reset(self):
+        """Clear all recorded metrics"""
+        for histogram in (self.call_latency, self.first_chunk_latency, self.prompt_chars,
+                          self.response_chars, *self.confidence.values()):
+            histogram.reset()
+        
+        with self._lock:
+            self.calls = 0
+            self.call_errors = 0
+            self.prompt_tokens = 0
+            self.response_tokens = 0
+            self.parse_failures = 0
+            self.fallbacks: Dict[str, int] = {}
+            self.cache_hits = 0
+            self.cache_misses = 0
+    
+    def record_call(self, latency: float, prompt_chars: int, response_chars: int, success: bool,
+                    prompt_tokens: Optional[int] = None, response_tokens: Optional[int] = None):
+        """Record one LLM API round-trip"""
+        self.call_latency.observe(latency)
+        self.prompt_chars.observe(prompt_chars)
+        if success:
+            self.response_chars.observe(response_chars)
+        
+        with self._lock:
+            self.calls += 1
+            if not success:
+                self.call_errors += 1
+            self.prompt_tokens += prompt_tokens or 0
+            self.response_tokens += response_tokens or 0
+    
+    def record_first_chunk(self, latency: float):
+        """Record time until the first streamed fragment arrived"""
+        self.first_chunk_latency.observe(latency)
+    
+    def record_parse_failure(self):
+        with self._lock:
+            self.parse_failures += 1
+    
+    def record_fallback(self, reason: str):
+        """Record a fallback to rule-based processing and why it happened"""
+        with self._lock:
+            self.fallbacks[reason] = self.fallbacks.get(reason, 0) + 1
+    
+    def record_confidence(self, score: float, source: str):
+        """Record the confidence score of an extraction ('llm' or 'rules')"""
+        self.confidence[source].observe(score or 0.0)
+    
+    def record_cache_lookup(self, hit: bool):
+        """Record a lookup of already extracted preferences"""
+        with self._lock:
+            if hit:
+                self.cache_hits += 1
+            else:
+                self.cache_misses += 1
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """Return a JSON-serializable copy of all metrics"""
+        with self._lock:
+            lookups = self.cache_hits + self.cache_misses
+            counters = {
+                'calls': self.calls,
+                'call_errors': self.call_errors,
+                'parse_failures': self.parse_failures,
+                'fallbacks': dict(self.fallbacks),
+                'fallback_total': sum(self.fallbacks.values()),
+                'prompt_tokens': self.prompt_tokens,
+                'response_tokens': self.response_tokens,
+                'cache': {
+                    'hits': self.cache_hits,
+                    'misses': self.cache_misses,
+                    'hit_ratio': round(self.cache_hits / lookups, 4) if lookups else 0.0
+                }
+            }
+        
+        return {
+            **counters,
+            'latency_seconds': self.call_latency.snapshot(),
+            'first_chunk_latency_seconds': self.first_chunk_latency.snapshot(),
+            'prompt_chars': self.prompt_chars.snapshot(),
+            'response_chars': self.response_chars.snapshot(),
+            'confidence': {source: histogram.snapshot() for source, histogram in self.confidence.items()}
+        }
 
 
 class LLMPreferenceProcessor:
@@ -36,10 +284,18 @@ class LLMPreferenceProcessor:
     Processes natural language preferences using LLM and rule-based fallbacks
     """
     
-    def __init__(self, use_llm: bool = True, api_key: str = None):
+    def __init__(self, use_llm: bool = True, api_key: str = None,
+                 stream: bool = False, api_base: str = GEMINI_API_BASE):
         self.use_llm = use_llm
         self.api_key = api_key
         
+        # Streaming uses the streamGenerateContent endpoint and stops reading once the JSON object closes
+        self.stream = stream
+        self.api_base = api_base.rstrip('/')
+        
+        self.metrics = LLMMetrics()
+        self.logger = logging.getLogger(__name__)
+        
         # Rule-based patterns for fallback processing
         self.patterns = {
             'sectors': {
@@ -108,31 +364,36 @@ class LLMPreferenceProcessor:
             try:
                 return self._process_with_llm(text)
             except Exception as e:
-                print(f"LLM processing failed, falling back to rule-based: {e}")
+                self.logger.warning(f"LLM processing failed, falling back to rule-based: {e}")
+                self.metrics.record_fallback('llm_error')
                 return self._process_with_rules(text_lower)
         else:
+            if self.use_llm:
+                self.metrics.record_fallback('no_api_key')
             return self._process_with_rules(text_lower)
     
+    def get_metrics_snapshot(self) -> Dict[str, Any]:
+        """Return a snapshot of the LLM instrumentation metrics"""
+        return self.metrics.snapshot()
+    
     def _process_with_llm(self, text: str) -> ExtractedPreferences:
         """
         Process preferences using real LLM (Gemini API)
         """
         if not self.api_key:
-            print("⚠️  No API key provided, using fallback rule-based processing")
+            self.logger.warning("No API key provided, using fallback rule-based processing")
+            self.metrics.record_fallback('no_api_key')
             return self._process_with_rules(text.lower())
         
         try:
             return self._process_with_gemini(text)
         except Exception as e:
-            print(f"⚠️  LLM API failed: {e}")
-            print("🔄 Falling back to rule-based processing...")
+            self.logger.warning(f"LLM API failed, falling back to rule-based processing: {e}")
+            self.metrics.record_fallback('llm_error')
             return self._process_with_rules(text.lower())
     
-    def _process_with_gemini(self, text: str) -> ExtractedPreferences:
-        """Process using Google Gemini API"""
-        
-        url = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-1.5-flash:generateContent?key={self.api_key}"
-        
+    def _build_gemini_request(self, text: str) -> dict:
+        """Build the Gemini request body for extracting preferences from text"""
         prompt = f"""
         Extract internship preferences from this text: "{text}"
         
@@ -154,7 +415,7 @@ class LLMPreferenceProcessor:
         Valid durations: 1 month, 2 months, 3 months, 6 months, 1 year
         """
         
-        data = {
+        return {
             "contents": [
                 {
                     "parts": [
@@ -169,12 +430,32 @@ class LLMPreferenceProcessor:
                 "maxOutputTokens": 500
             }
         }
+    
+    def _process_with_gemini(self, text: str) -> ExtractedPreferences:
+        """Process using Google Gemini API"""
+        if self.stream:
+            return self._process_with_gemini_stream(text)
         
-        response = requests.post(url, json=data, timeout=10)
-        response.raise_for_status()
+        url = f"{self.api_base}:generateContent?key={self.api_key}"
+        data = self._build_gemini_request(text)
+        prompt_chars = len(data['contents'][0]['parts'][0]['text'])
         
-        result = response.json()
-        content = result['candidates'][0]['content']['parts'][0]['text']
+        start_time = time.perf_counter()
+        try:
+            response = requests.post(url, json=data, timeout=10)
+            response.raise_for_status()
+            
+            result = response.json()
+            content = result['candidates'][0]['content']['parts'][0]['text']
+        except Exception:
+            self.metrics.record_call(time.perf_counter() - start_time, prompt_chars, 0, success=False)
+            raise
+        
+        usage = result.get('usageMetadata', {})
+        self.metrics.record_call(
+            time.perf_counter() - start_time, prompt_chars, len(content), success=True,
+            prompt_tokens=usage.get('promptTokenCount'), response_tokens=usage.get('candidatesTokenCount')
+        )
         
         # Clean up the response (remove markdown code blocks if present)
         if content.startswith('```json'):
@@ -187,11 +468,73 @@ class LLMPreferenceProcessor:
             parsed = json.loads(content)
             return self._convert_to_extracted_preferences(parsed)
         except json.JSONDecodeError:
-            print("⚠️  Failed to parse Gemini response as JSON")
+            self.logger.warning("Failed to parse Gemini response as JSON")
+            self.metrics.record_parse_failure()
+            self.metrics.record_fallback('parse_error')
             return self._process_with_rules(text.lower())
     
+    def _process_with_gemini_stream(self, text: str) -> ExtractedPreferences:
+        """Process using the streaming Gemini endpoint, parsing the JSON object incrementally"""
+        parser = IncrementalJSONObjectParser()
+        for fragment in self._iter_gemini_stream_text(text):
+            parser.feed(fragment)
+            if parser.complete:
+                break
+        
+        if not parser.complete or parser.errors:
+            self.logger.warning("Failed to parse streamed Gemini response as JSON")
+            self.metrics.record_parse_failure()
+            self.metrics.record_fallback('parse_error')
+            return self._process_with_rules(text.lower())
+        
+        return self._convert_to_extracted_preferences(parser.fields)
+    
+    def _iter_gemini_stream_text(self, text: str) -> Iterator[str]:
+        """Yield response text fragments from the server-sent events of streamGenerateContent"""
+        url = f"{self.api_base}:streamGenerateContent?alt=sse&key={self.api_key}"
+        data = self._build_gemini_request(text)
+        prompt_chars = len(data['contents'][0]['parts'][0]['text'])
+        
+        start_time = time.perf_counter()
+        response_chars = 0
+        usage = {}
+        success = False
+        try:
+            with requests.post(url, json=data, timeout=10, stream=True) as response:
+                response.raise_for_status()
+                
+                for line in response.iter_lines():
+                    line = line.decode('utf-8').strip()
+                    if not line.startswith('data:'):
+                        continue
+                    
+                    chunk = json.loads(line[len('data:'):])
+                    usage = chunk.get('usageMetadata', usage)
+                    for candidate in chunk.get('candidates', [])[:1]:
+                        for part in candidate.get('content', {}).get('parts', []):
+                            if part.get('text'):
+                                if not response_chars:
+                                    self.metrics.record_first_chunk(time.perf_counter() - start_time)
+                                response_chars += len(part['text'])
+                                yield part['text']
+            success = True
+        except GeneratorExit:
+            # Consumer stopped early because the JSON object was complete
+            success = True
+            raise
+        finally:
+            self.metrics.record_call(
+                time.perf_counter() - start_time, prompt_chars, response_chars, success,
+                prompt_tokens=usage.get('promptTokenCount'), response_tokens=usage.get('candidatesTokenCount')
+            )
+    
     def _convert_to_extracted_preferences(self, data: dict) -> ExtractedPreferences:
         """Convert API response to ExtractedPreferences object"""
+        salary_expectations = data.get('salary_expectations')
+        confidence_score = data.get('confidence_score', 0.0)
+        if isinstance(confidence_score, (int, float)):
+            self.metrics.record_confidence(confidence_score, 'llm')
+        
         return ExtractedPreferences(
             preferred_sectors=data.get('preferred_sectors'),
             preferred_location=data.get('preferred_location'),
@@ -199,23 +542,21 @@ class LLMPreferenceProcessor:
             preferred_company_type=data.get('preferred_company_type'),
             additional_skills=data.get('additional_skills'),
             work_style_preferences=data.get('work_style_preferences'),
-            salary_expectations=data.get('salary_expectations'),
+            salary_expectations=salary_expectations,
             remote_preference=data.get('remote_preference'),
-            confidence_score=data.get('confidence_score', 0.0)
+            confidence_score=confidence_score,
+            expected_stipend=parse_salary_expectation(salary_expectations) if isinstance(salary_expectations, str) else None
         )
     
     def _process_with_rules(self, text_lower: str, enhanced: bool = False) -> ExtractedPreferences:
         """
         Process preferences using rule-based pattern matching
         """
-        preferences = ExtractedPreferences()
-        
         # Extract sectors
         sectors = []
         for sector, keywords in self.patterns['sectors'].items():
             if any(keyword in text_lower for keyword in keywords):
                 sectors.append(sector.title())
-        preferences.preferred_sectors = sectors if sectors else None
         
         # Extract location
         location = None
@@ -223,7 +564,6 @@ class LLMPreferenceProcessor:
             if any(keyword in text_lower for keyword in keywords):
                 location = loc.title()
                 break
-        preferences.preferred_location = location
         
         # Extract duration
         duration = None
@@ -231,7 +571,6 @@ class LLMPreferenceProcessor:
             if any(keyword in text_lower for keyword in keywords):
                 duration = dur
                 break
-        preferences.preferred_duration = duration
         
         # Extract company type
         company_type = None
@@ -239,44 +578,49 @@ class LLMPreferenceProcessor:
             if any(keyword in text_lower for keyword in keywords):
                 company_type = comp_type.upper()
                 break
-        preferences.preferred_company_type = company_type
         
         # Extract additional skills
         skills = []
         for skill, keywords in self.patterns['skills'].items():
             if any(keyword in text_lower for keyword in keywords):
                 skills.append(skill.title())
-        preferences.additional_skills = skills if skills else None
         
         # Extract work style preferences
         work_styles = []
+        remote_preference = None
         if 'remote' in text_lower or 'work from home' in text_lower or 'wfh' in text_lower:
             work_styles.append('remote')
-            preferences.remote_preference = True
+            remote_preference = True
         if 'office' in text_lower or 'onsite' in text_lower:
             work_styles.append('office')
         if 'hybrid' in text_lower:
             work_styles.append('hybrid')
-        preferences.work_style_preferences = work_styles if work_styles else None
         
         # Extract salary expectations
-        salary_patterns = [
-            r'(\d+)\s*(?:lakh|lac|k|thousand)',
-            r'rs\.?\s*(\d+)',
-            r'₹\s*(\d+)',
-            r'(\d+)\s*rupees'
-        ]
-        for pattern in salary_patterns:
-            match = re.search(pattern, text_lower)
+        salary_expectations = None
+        for pattern in SALARY_PATTERNS:
+            match = pattern.search(text_lower)
             if match:
-                preferences.salary_expectations = match.group(0)
+                salary_expectations = match.group(0)
                 break
         
+        preferences = ExtractedPreferences(
+            preferred_sectors=sectors if sectors else None,
+            preferred_location=location,
+            preferred_duration=duration,
+            preferred_company_type=company_type,
+            additional_skills=skills if skills else None,
+            work_style_preferences=work_styles if work_styles else None,
+            salary_expectations=salary_expectations,
+            remote_preference=remote_preference,
+            expected_stipend=parse_salary_expectation(text_lower) if salary_expectations else None
+        )
+        
         # Calculate confidence score
         confidence = self._calculate_confidence(preferences, text_lower)
-        preferences.confidence_score = confidence
+        self.metrics.record_confidence(confidence, 'rules')
         
-        return preferences
+        return replace(preferences, confidence_score=confidence)
     
     def _calculate_confidence(self, preferences: ExtractedPreferences, text_lower: str) -> float:
         """Calculate confidence score based on extracted information"""
@@ -315,56 +659,47 @@ class LLMPreferenceProcessor:
         
         return min(score, 1.0)
     
-    def merge_with_profile(self, profile: CandidateProfile, preferences: ExtractedPreferences) -> CandidateProfile:
+    def merge_with_profile(self, profile: CandidateProfile, preferences: ExtractedPreferences) -> Union[CandidateProfile, ProfileOverlay]:
         """
         Merge extracted preferences with existing profile data
+        
+        Returns a read-only ProfileOverlay that shares every unchanged field with
+        the original profile, or the profile itself when nothing was extracted.
         """
-        # Create a copy of the profile to avoid modifying the original
-        merged_profile = CandidateProfile(
-            full_name=profile.full_name,
-            education=profile.education,
-            contact_number=profile.contact_number,
-            current_address=profile.current_address,
-            email=profile.email,
-            linkedin=profile.linkedin,
-            experience=profile.experience.copy(),
-            skills=profile.skills.copy(),
-            gender=profile.gender,
-            disability_status=profile.disability_status,
-            veteran=profile.veteran,
-            preferred_sectors=profile.preferred_sectors.copy() if profile.preferred_sectors else [],
-            preferred_location=profile.preferred_location,
-            preferred_duration=profile.preferred_duration,
-            preferred_company_type=profile.preferred_company_type
-        )
+        overrides = {}
         
         # Merge sectors
         if preferences.preferred_sectors:
-            if merged_profile.preferred_sectors:
+            if profile.preferred_sectors:
                 # Combine and deduplicate
-                all_sectors = list(set(merged_profile.preferred_sectors + preferences.preferred_sectors))
-                merged_profile.preferred_sectors = all_sectors
+                overrides['preferred_sectors'] = list(set(profile.preferred_sectors + preferences.preferred_sectors))
             else:
-                merged_profile.preferred_sectors = preferences.preferred_sectors
+                overrides['preferred_sectors'] = preferences.preferred_sectors
         
         # Override location if specified in preferences
         if preferences.preferred_location:
-            merged_profile.preferred_location = preferences.preferred_location
+            overrides['preferred_location'] = preferences.preferred_location
         
         # Override duration if specified in preferences
         if preferences.preferred_duration:
-            merged_profile.preferred_duration = preferences.preferred_duration
+            overrides['preferred_duration'] = preferences.preferred_duration
         
         # Override company type if specified in preferences
         if preferences.preferred_company_type:
-            merged_profile.preferred_company_type = preferences.preferred_company_type
+            overrides['preferred_company_type'] = preferences.preferred_company_type
         
         # Add additional skills
         if preferences.additional_skills:
-            all_skills = list(set(merged_profile.skills + preferences.additional_skills))
-            merged_profile.skills = all_skills
+            overrides['skills'] = list(set(profile.skills + preferences.additional_skills))
+        
+        # Override stipend target if a salary expectation was understood
+        if preferences.expected_stipend:
+            overrides['expected_stipend'] = preferences.expected_stipend
+        
+        if not overrides:
+            return profile
         
-        return merged_profile
+        return ProfileOverlay(profile, **overrides)
 
 
 class EnhancedMatchingEngine(MatchingEngine):
@@ -380,17 +715,22 @@ class EnhancedMatchingEngine(MatchingEngine):
                                   profile: CandidateProfile, 
                                   natural_language_preferences: str,
                                   internships: List[Internship], 
-                                  top_n: int = 10) -> Tuple[List[Tuple[Internship, float, Dict[str, float]]], ExtractedPreferences]:
+                                  top_n: int = 10,
+                                  extracted_preferences: Optional[ExtractedPreferences] = None) -> Tuple[List[Tuple[Internship, float, Dict[str, float]]], ExtractedPreferences]:
         """
         Match internships using both profile data and natural language preferences
         
+        Args:
+            extracted_preferences: Already extracted preferences for this text, if any
+            
         Returns:
             Tuple of (ranked_internships, extracted_preferences)
         """
         # Process natural language preferences
-        extracted_preferences = self.preference_processor.process_natural_language_preferences(
-            natural_language_preferences
-        )
+        if extracted_preferences is None:
+            extracted_preferences = self.preference_processor.process_natural_language_preferences(
+                natural_language_preferences
+            )
         
         # Merge with existing profile
         enhanced_profile = self.preference_processor.merge_with_profile(profile, extracted_preferences)
@@ -400,13 +740,15 @@ class EnhancedMatchingEngine(MatchingEngine):
         
         return ranked_internships, extracted_preferences
     
-    def explain_preference_processing(self, natural_language_preferences: str) -> str:
+    def explain_preference_processing(self, natural_language_preferences: str,
+                                      extracted: Optional[ExtractedPreferences] = None) -> str:
         """
         Provide explanation of how natural language preferences were processed
         """
-        extracted = self.preference_processor.process_natural_language_preferences(
-            natural_language_preferences
-        )
+        if extracted is None:
+            extracted = self.preference_processor.process_natural_language_preferences(
+                natural_language_preferences
+            )
         
         explanation = "Natural Language Processing Results:\n"
         explanation += f"Confidence Score: {extracted.confidence_score:.2f}\n\n"
@@ -435,6 +777,9 @@ class EnhancedMatchingEngine(MatchingEngine):
         if extracted.salary_expectations:
             explanation += f"Salary Expectations: {extracted.salary_expectations}\n"
         
+        if extracted.expected_stipend:
+            explanation += f"Expected Monthly Stipend: ₹{extracted.expected_stipend}\n"
+        
         return explanation
 
 
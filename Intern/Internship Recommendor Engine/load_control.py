@@ -0,0 +1,231 @@
+"""
+Load Control for the AI Internship Matching Engine
+Features:
+1. Single-flight coalescing: concurrent calls with the same key share one in-flight computation
+2. Admission control: a bounded number of requests run at once, a bounded queue waits
+   (up to a timeout), and anything beyond that is shed immediately
+3. Streamed responses hold their admission slot until the stream ends
+4. Counters for sizing both from real traffic
+"""
+
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Iterator, Optional, Tuple
+
+# Retry-After (seconds) sent with 503 responses for shed requests
+RETRY_AFTER_SECONDS = 1
+
+
+class Overloaded(Exception):
+    """Raised when the admission controller sheds a request"""
+
+
+class _Flight:
+    __slots__ = ('done', 'result', 'error', 'waiters')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Deduplicates concurrent identical work
+
+    The first caller for a key runs the function; callers arriving while it runs
+    wait and receive the same result (or exception). Nothing is kept after the
+    call finishes, so this never serves stale results; caching is the
+    RecommendationCache's job. Shared results must be treated as read-only.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flights: Dict[Hashable, _Flight] = {}
+        self.executions = 0
+        self.shared = 0
+
+    def do(self, key: Hashable, func: Callable[..., Any], *args, **kwargs) -> Tuple[Any, bool]:
+        """
+        Run func(*args, **kwargs) unless an identical call is already in flight
+
+        Returns:
+            (result, True if it came from another caller's execution)
+        """
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is not None:
+                flight.waiters += 1
+                self.shared += 1
+                leader = False
+            else:
+                flight = self._flights[key] = _Flight()
+                self.executions += 1
+                leader = True
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result, True
+
+        try:
+            flight.result = func(*args, **kwargs)
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+        return flight.result, False
+
+    def in_flight(self) -> int:
+        """Number of keys currently being computed"""
+        with self._lock:
+            return len(self._flights)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return a JSON-serializable view of the coalescing counters"""
+        with self._lock:
+            calls = self.executions + self.shared
+            return {
+                'in_flight': len(self._flights),
+                'executions': self.executions,
+                'shared': self.shared,
+                'shared_ratio': round(self.shared / calls, 4) if calls else 0.0
+            }
+
+
+class AdmissionController:
+    """
+    Bounds concurrent work with a bounded, time-limited wait queue
+
+    Up to max_concurrent callers hold a slot. Up to max_queue more wait for one,
+    each for at most queue_timeout seconds; further callers, and waiters that time
+    out, get Overloaded instead of adding to everyone's latency.
+    """
+
+    def __init__(self, max_concurrent: int = 16, max_queue: int = 64, queue_timeout: float = 2.0):
+        """
+        Args:
+            max_concurrent: Callers allowed to run at once (0 disables admission control)
+            max_queue: Callers allowed to wait for a slot
+            queue_timeout: Seconds a caller waits for a slot before being shed
+        """
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self._condition = threading.Condition()
+        self.running = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.queued = 0
+        self.rejected = 0
+        self.timed_out = 0
+
+    def acquire(self):
+        """Take a slot, waiting in the queue if needed; raises Overloaded when shed"""
+        if not self.max_concurrent:
+            return
+        with self._condition:
+            if self.running < self.max_concurrent and not self.waiting:
+                self.running += 1
+                self.admitted += 1
+                return
+            if self.waiting >= self.max_queue:
+                self.rejected += 1
+                raise Overloaded("Server is overloaded; retry shortly")
+
+            self.waiting += 1
+            self.queued += 1
+            deadline = time.monotonic() + self.queue_timeout
+            try:
+                while self.running >= self.max_concurrent:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self.timed_out += 1
+                        raise Overloaded("Timed out waiting for capacity; retry shortly")
+                    self._condition.wait(remaining)
+            finally:
+                self.waiting -= 1
+            self.running += 1
+            self.admitted += 1
+
+    def release(self):
+        """Return a slot taken by acquire"""
+        if not self.max_concurrent:
+            return
+        with self._condition:
+            self.running -= 1
+            self._condition.notify()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.release()
+        return False
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return a JSON-serializable view of the admission state and counters"""
+        with self._condition:
+            return {
+                'max_concurrent': self.max_concurrent,
+                'max_queue': self.max_queue,
+                'queue_timeout': self.queue_timeout,
+                'running': self.running,
+                'waiting': self.waiting,
+                'admitted': self.admitted,
+                'queued': self.queued,
+                'rejected': self.rejected,
+                'timed_out': self.timed_out
+            }
+
+
+class AdmittedIterator:
+    """
+    Iterator that holds an admission slot until it is exhausted or closed
+
+    A streamed response keeps working after its handler returns, so its slot has
+    to outlive the handler. The slot is released exactly once: when the wrapped
+    iterator finishes or fails, when close() is called (WSGI servers close response
+    iterables), or, as a last resort, when the iterator is garbage collected.
+    """
+
+    def __init__(self, controller: AdmissionController, iterator: Iterator[Any]):
+        """
+        Args:
+            controller: Controller the caller has already acquired a slot from
+            iterator: Work to run under that slot
+        """
+        self._controller = controller
+        self._iterator = iterator
+        self._held = True
+
+    def __iter__(self) -> 'AdmittedIterator':
+        return self
+
+    def __next__(self) -> Any:
+        try:
+            return next(self._iterator)
+        except BaseException:
+            self.close()
+            raise
+
+    def close(self):
+        """Stop the wrapped iterator and return the slot"""
+        if not self._held:
+            return
+        self._held = False
+        try:
+            close = getattr(self._iterator, 'close', None)
+            if close is not None:
+                close()
+        finally:
+            self._controller.release()
+
+    def __del__(self):
+        self.close()
@@ -11,14 +11,15 @@ This module implements the core matching algorithm that:
 
 import json
 import math
-from typing import Dict, List, Any, Tuple
-from dataclasses import dataclass
+import re
+from typing import Dict, List, Any, Tuple, Optional
+from dataclasses import dataclass, replace, FrozenInstanceError
 from collections import Counter
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class CandidateProfile:
-    """Structured candidate profile data"""
+    """Structured candidate profile data (immutable; list fields must not be mutated)"""
     full_name: str
     education: str
     contact_number: str
@@ -34,11 +35,53 @@ class CandidateProfile:
     preferred_location: str = None
     preferred_duration: str = None
     preferred_company_type: str = None
+    expected_stipend: Optional[int] = None  # Monthly stipend target in rupees
 
 
-@dataclass
+# Profile fields a preference merge may override
+OVERLAY_FIELDS = ('skills', 'preferred_sectors', 'preferred_location',
+                  'preferred_duration', 'preferred_company_type', 'expected_stipend')
+
+
+class ProfileOverlay:
+    """
+    Read-only view of a CandidateProfile with some preference fields overridden
+    
+    Fields that are not overridden are read from the base profile, so merging
+    request-specific preferences allocates one small object instead of copying
+    the whole profile and its lists.
+    """
+    __slots__ = ('base',) + OVERLAY_FIELDS
+    
+    def __init__(self, base: CandidateProfile, **overrides):
+        # Overlaying an overlay flattens onto the original profile
+        if isinstance(base, ProfileOverlay):
+            overrides = {**{name: getattr(base, name) for name in OVERLAY_FIELDS}, **overrides}
+            base = base.base
+        
+        object.__setattr__(self, 'base', base)
+        for name in OVERLAY_FIELDS:
+            object.__setattr__(self, name, overrides.get(name, getattr(base, name)))
+    
+    def __getattr__(self, name):
+        # Only called for fields not stored on the overlay itself
+        return getattr(self.base, name)
+    
+    def __setattr__(self, name, value):
+        raise FrozenInstanceError(f"cannot assign to field '{name}'")
+    
+    def __repr__(self):
+        overridden = ', '.join(f"{name}={getattr(self, name)!r}" for name in OVERLAY_FIELDS)
+        return f"ProfileOverlay(base={self.base.full_name!r}, {overridden})"
+    
+    def to_profile(self) -> CandidateProfile:
+        """Materialize the overlay as a standalone CandidateProfile"""
+        return replace(self.base, **{name: getattr(self, name) for name in OVERLAY_FIELDS})
+
+
+@dataclass(frozen=True, slots=True)
 class Internship:
-    """Structured internship data"""
+    """Structured internship data (immutable so catalog snapshots can be shared across requests)"""
     title: str
     skills_required: List[str]
     sector: str
@@ -48,6 +91,38 @@ class Internship:
     link: str
     capacity: int
     remote_available: bool = False
+    stipend_min: Optional[int] = None  # Monthly stipend bounds in rupees
+    stipend_max: Optional[int] = None
+    internship_id: Optional[int] = None  # Database ID when loaded from the catalog
+
+
+# Amounts such as "6k", "₹37k", "10,000" or "1.5 lakh" inside a stipend range
+_STIPEND_AMOUNT_PATTERN = re.compile(r'(\d[\d,]*(?:\.\d+)?)\s*(k|thousand|lakhs?|lacs?)?', re.IGNORECASE)
+
+_AMOUNT_MULTIPLIERS = {
+    'k': 1000, 'thousand': 1000,
+    'lakh': 100000, 'lakhs': 100000, 'lac': 100000, 'lacs': 100000
+}
+
+
+def parse_stipend_range(stipend_range: Optional[str]) -> Tuple[Optional[int], Optional[int]]:
+    """
+    Parse a stipend range string like "₹6k–₹37k" into (min, max) monthly rupees
+    
+    A single amount gives min == max; unparseable input gives (None, None).
+    """
+    if not stipend_range:
+        return None, None
+    
+    amounts = []
+    for number, unit in _STIPEND_AMOUNT_PATTERN.findall(stipend_range):
+        value = float(number.replace(',', ''))
+        amounts.append(int(value * _AMOUNT_MULTIPLIERS.get(unit.lower(), 1)))
+    
+    if not amounts:
+        return None, None
+    
+    return min(amounts), max(amounts)
 
 
 class MatchingEngine:
@@ -0,0 +1,200 @@
+"""
+Streaming Matching Statistics for the AI Internship Matching Engine
+Features:
+1. Single-pass accumulator over (internship, score) pairs: match bands, score histogram,
+   running mean, best score, per-sector running means and a bounded top-K heap
+2. No full sort and no per-internship explanation dicts
+3. Nightly job that precomputes every user's statistics into the matching_stats table
+4. Stored statistics carry the profile fingerprint, so they are never served for a changed profile
+5. The nightly job also stores each user's highest-impact skill gaps
+
+Usage: python matching_stats.py [--db PATH] [--batch-size N]   (schedule nightly, e.g. from cron)
+"""
+
+import argparse
+import heapq
+import json
+import logging
+import time
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from matching_engine import CandidateProfile, Internship
+from recommendation_cache import profile_fingerprint
+
+# Score bands reported in match_distribution
+HIGH_MATCH_SCORE = 0.7
+MEDIUM_MATCH_SCORE = 0.4
+
+logger = logging.getLogger(__name__)
+
+
+class MatchStatsAccumulator:
+    """
+    Consumes one user's scores once and keeps only O(sectors + bins + top_k) state
+
+    The top-K heap breaks score ties by arrival order, so top_matches() equals the
+    first top_k entries of a stable descending sort of everything added.
+    """
+
+    def __init__(self, top_k: int = 20, histogram_bins: int = 10):
+        """
+        Args:
+            top_k: Best matches to keep for the sector performance breakdown
+            histogram_bins: Equal-width score bins over [0, 1]
+        """
+        self.top_k = top_k
+        self.histogram_bins = histogram_bins
+        self.histogram = [0] * histogram_bins
+        self.count = 0
+        self.score_sum = 0.0
+        self.best_score: Optional[float] = None
+        self.high_matches = 0
+        self.medium_matches = 0
+        self.low_matches = 0
+        self.sector_totals: Dict[str, List[float]] = {}  # sector -> [count, score sum]
+        self._top: List[Tuple[float, int, Internship]] = []  # Min-heap on (score, -arrival)
+
+    def add(self, internship: Internship, score: float):
+        """Record one internship's score"""
+        arrival = self.count
+        self.count += 1
+        self.score_sum += score
+        if self.best_score is None or score > self.best_score:
+            self.best_score = score
+
+        if score >= HIGH_MATCH_SCORE:
+            self.high_matches += 1
+        elif score >= MEDIUM_MATCH_SCORE:
+            self.medium_matches += 1
+        else:
+            self.low_matches += 1
+
+        self.histogram[min(max(int(score * self.histogram_bins), 0), self.histogram_bins - 1)] += 1
+
+        totals = self.sector_totals.get(internship.sector)
+        if totals is None:
+            totals = self.sector_totals[internship.sector] = [0, 0.0]
+        totals[0] += 1
+        totals[1] += score
+
+        if self.top_k <= 0:
+            return
+        entry = (score, -arrival, internship)
+        if len(self._top) < self.top_k:
+            heapq.heappush(self._top, entry)
+        elif entry[:2] > self._top[0][:2]:
+            heapq.heapreplace(self._top, entry)
+
+    def add_all(self, scored: Iterable[Tuple[Internship, float]]) -> 'MatchStatsAccumulator':
+        """Record every (internship, score) pair; returns self for chaining"""
+        for internship, score in scored:
+            self.add(internship, score)
+        return self
+
+    def top_matches(self) -> List[Tuple[Internship, float]]:
+        """The best top_k (internship, score) pairs, highest first"""
+        return [(internship, score) for score, _, internship in sorted(self._top, reverse=True)]
+
+    def result(self) -> Dict[str, Any]:
+        """JSON-serializable statistics in the get_matching_stats format"""
+        # Sector performance over the best matches, sectors in order of their best match
+        sector_matches: Dict[str, List[float]] = {}
+        for internship, score in self.top_matches():
+            sector_matches.setdefault(internship.sector, []).append(score)
+
+        width = 1.0 / self.histogram_bins
+        return {
+            'total_internships': self.count,
+            'match_distribution': {
+                'high_matches': self.high_matches,
+                'medium_matches': self.medium_matches,
+                'low_matches': self.low_matches
+            },
+            'average_score': self.score_sum / self.count if self.count else 0,
+            'best_score': self.best_score if self.best_score is not None else 0,
+            'sector_performance': {
+                sector: {'count': len(scores), 'avg_score': sum(scores) / len(scores)}
+                for sector, scores in sector_matches.items()
+            },
+            'sector_averages': {
+                sector: {'count': int(count), 'avg_score': total / count}
+                for sector, (count, total) in self.sector_totals.items()
+            },
+            'score_histogram': [
+                {'min': round(i * width, 4), 'max': round((i + 1) * width, 4), 'count': count}
+                for i, count in enumerate(self.histogram)
+            ]
+        }
+
+
+def compute_matching_stats(engine, profile: CandidateProfile, internships: Sequence[Internship],
+                           top_k: int = 20) -> Dict[str, Any]:
+    """Score internships for profile with an EnhancedRankingEngine and summarize them in one pass"""
+    return MatchStatsAccumulator(top_k).add_all(engine.iter_scores(profile, internships)).result()
+
+
+def precompute_matching_stats(api_instance, user_ids: Optional[Iterable[int]] = None,
+                              batch_size: int = 500) -> int:
+    """
+    Compute and store matching statistics for many users against one catalog snapshot
+
+    Args:
+        api_instance: AIMatchingAPI whose database, catalog and ranking engine are used
+        user_ids: Users to process; every user when omitted
+        batch_size: Profiles loaded and rows written per batch
+
+    Returns:
+        Number of users whose statistics were stored
+    """
+    db = api_instance.db
+    engine = api_instance.matching_engine
+    snapshot = api_instance.catalog.snapshot()
+    weights_version = engine.get_weights_version()
+
+    if user_ids is None:
+        batches = db.iter_user_ids(batch_size)
+    else:
+        user_ids = list(user_ids)
+        batches = (user_ids[start:start + batch_size] for start in range(0, len(user_ids), batch_size))
+
+    stored = 0
+    for batch in batches:
+        profiles = db.get_user_profiles(batch)
+        computed_at = time.time()
+        rows = []
+        for user_id, profile in profiles.items():
+            stats = compute_matching_stats(engine, profile, snapshot.internships)
+            stats['skill_gaps'] = [impact.skill for impact in
+                                   engine.analyze_skill_gaps(profile, snapshot.internships, limit=5)]
+            rows.append((user_id, snapshot.version, weights_version, profile_fingerprint(profile),
+                         json.dumps(stats), computed_at))
+        if rows and db.save_matching_stats(rows):
+            stored += len(rows)
+
+    logger.info(f"Precomputed matching stats for {stored} users at catalog version {snapshot.version}")
+    return stored
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Precompute matching statistics for every user")
+    parser.add_argument("--db", default="internship_matching.db", help="SQLite database path")
+    parser.add_argument("--batch-size", type=int, default=500, help="Users per batch")
+    args = parser.parse_args()
+
+    from api_interface import AIMatchingAPI
+    from database_integration import DatabaseConnector
+
+    logging.basicConfig(level=logging.INFO)
+    api_instance = AIMatchingAPI(DatabaseConnector(args.db), use_llm=False)
+
+    start = time.perf_counter()
+    stored = precompute_matching_stats(api_instance, batch_size=args.batch_size)
+    print(f"Stored matching stats for {stored:,} users in {time.perf_counter() - start:.1f}s")
+
+    api_instance.catalog.close()
+    api_instance.db.close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
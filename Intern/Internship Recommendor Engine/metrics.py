@@ -0,0 +1,166 @@
+"""
+Lightweight in-process metrics for the AI Internship Matching Engine
+Provides thread-safe histograms that components use to expose their own statistics,
+per-route HTTP request metrics, and Prometheus text exposition helpers
+"""
+
+import re
+import threading
+from bisect import bisect_left
+from typing import Dict, Any, List, Optional, Sequence, Tuple
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class Histogram:
+    """
+    Fixed-bucket histogram of observed values
+
+    Each bucket counts observations less than or equal to its upper bound and
+    greater than the previous bound; a final "+Inf" bucket catches the rest.
+    """
+
+    def __init__(self, bounds: Sequence[float]):
+        self.bounds = tuple(sorted(bounds))
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Clear all observations"""
+        with self._lock:
+            self._counts = [0] * (len(self.bounds) + 1)
+            self._count = 0
+            self._sum = 0.0
+            self._min = None
+            self._max = None
+
+    def observe(self, value: float):
+        """Record one observation"""
+        index = bisect_left(self.bounds, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._count += 1
+            self._sum += value
+            if self._min is None or value < self._min:
+                self._min = value
+            if self._max is None or value > self._max:
+                self._max = value
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return a JSON-serializable copy of the histogram state"""
+        with self._lock:
+            labels = [f"{bound:g}" for bound in self.bounds] + ["+Inf"]
+            return {
+                'buckets': dict(zip(labels, self._counts)),
+                'count': self._count,
+                'sum': round(self._sum, 6),
+                'mean': round(self._sum / self._count, 6) if self._count else 0.0,
+                'min': self._min,
+                'max': self._max
+            }
+
+    def prometheus_lines(self, name: str, labels: Optional[Dict[str, Any]] = None) -> List[str]:
+        """Prometheus samples for this histogram: cumulative buckets, _sum and _count"""
+        with self._lock:
+            counts, total, count = list(self._counts), self._sum, self._count
+
+        lines = []
+        cumulative = 0
+        for bound, bucket_count in zip([f"{bound:g}" for bound in self.bounds] + ["+Inf"], counts):
+            cumulative += bucket_count
+            lines.append(f"{name}_bucket{prometheus_labels(dict(labels or {}, le=bound))} {cumulative}")
+        lines.append(f"{name}_sum{prometheus_labels(labels)} {total:.6f}")
+        lines.append(f"{name}_count{prometheus_labels(labels)} {count}")
+        return lines
+
+
+def prometheus_labels(labels: Optional[Dict[str, Any]]) -> str:
+    """Format a label set as {name="value",...}, or an empty string for none"""
+    if not labels:
+        return ""
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+               for value in labels.values())
+    return "{" + ",".join(f'{name}="{value}"' for name, value in zip(labels, escaped)) + "}"
+
+
+def prometheus_metric(name: str, kind: str, help_text: str,
+                      samples: Sequence[Tuple[Optional[Dict[str, Any]], float]]) -> List[str]:
+    """HELP/TYPE header plus one line per (labels, value) sample"""
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+    lines.extend(f"{name}{prometheus_labels(labels)} {_prometheus_value(value)}" for labels, value in samples)
+    return lines
+
+
+def _prometheus_value(value: float) -> str:
+    # Counters stay exact integers; floats keep full precision
+    return str(int(value)) if isinstance(value, int) else repr(float(value))
+
+
+def route_template(rule: str) -> str:
+    """
+    Normalize a route to one label per endpoint, whatever the server
+
+    Flask rules (<int:user_id>) and ASGI route patterns ((?P<user_id>\\d+))
+    both become <user_id>.
+    """
+    rule = re.sub(r'\(\?P<(\w+)>[^)]*\)', r'<\1>', rule)
+    return re.sub(r'<(?:\w+:)?(\w+)>', r'<\1>', rule)
+
+
+class RequestMetrics:
+    """
+    HTTP request counts and latencies per (method, route), shared by the Flask and ASGI apps
+
+    Routes are recorded as templates, so the number of series stays bounded by the
+    number of endpoints rather than by the number of distinct URLs.
+    """
+
+    LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Clear all recorded requests"""
+        with self._lock:
+            self._counts: Dict[Tuple[str, str, int], int] = {}
+            self._latency: Dict[Tuple[str, str], Histogram] = {}
+
+    def observe(self, method: str, route: str, status: int, seconds: float):
+        """Record one finished request"""
+        key = (method, route)
+        with self._lock:
+            self._counts[key + (status,)] = self._counts.get(key + (status,), 0) + 1
+            histogram = self._latency.get(key)
+            if histogram is None:
+                histogram = self._latency[key] = Histogram(self.LATENCY_BUCKETS)
+        histogram.observe(seconds)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return a JSON-serializable view of request counts and latencies"""
+        with self._lock:
+            counts = dict(self._counts)
+            latency = dict(self._latency)
+        return {
+            'requests': [{'method': method, 'route': route, 'status': status, 'count': count}
+                         for (method, route, status), count in sorted(counts.items())],
+            'latency_seconds': {f"{method} {route}": histogram.snapshot()
+                                for (method, route), histogram in sorted(latency.items())}
+        }
+
+    def prometheus_lines(self, prefix: str) -> List[str]:
+        """Request counter and latency histogram in Prometheus text format"""
+        with self._lock:
+            counts = sorted(self._counts.items())
+            latency = sorted(self._latency.items())
+
+        lines = prometheus_metric(f"{prefix}_http_requests_total", "counter", "HTTP requests by route and status", [
+            ({'method': method, 'route': route, 'status': status}, count)
+            for (method, route, status), count in counts
+        ])
+        name = f"{prefix}_http_request_duration_seconds"
+        lines += [f"# HELP {name} HTTP request latency by route", f"# TYPE {name} histogram"]
+        for (method, route), histogram in latency:
+            lines += histogram.prometheus_lines(name, {'method': method, 'route': route})
+        return lines
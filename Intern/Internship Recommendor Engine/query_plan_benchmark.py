@@ -0,0 +1,205 @@
+"""
+Query Plan Benchmark for the AI Internship Matching Engine database layer
+Features:
+1. Builds a synthetic database at production-like scale (default 1M internships)
+2. Captures every SQL statement the DatabaseConnector read methods issue
+3. Asserts via EXPLAIN QUERY PLAN that none of them scans a table without an index
+4. Reports per-method latency so index regressions show up as numbers
+
+Usage: python query_plan_benchmark.py [--rows N] [--repeats N] [--db PATH]
+"""
+
+import argparse
+import json
+import os
+import random
+import sqlite3
+import tempfile
+import time
+from typing import Any, Callable, Dict, List, Tuple
+
+from database_integration import DatabaseConnector
+
+SECTORS = ["Technology", "Finance", "Healthcare", "Education", "Marketing",
+           "Manufacturing", "Energy", "Retail", "Media", "Government"]
+LOCATIONS = ["Bangalore", "Mumbai", "Delhi", "Hyderabad", "Pune", "Chennai", "Remote"]
+SKILLS = ["Python", "Java", "SQL", "Excel", "Machine Learning", "Communication",
+          "React", "Data Analysis", "Marketing", "Finance", "AWS", "Docker"]
+
+# Statements worth planning; writes and transaction control are not part of the read path
+PLANNED_PREFIXES = ("SELECT", "WITH")
+
+
+def populate_synthetic_data(db: DatabaseConnector, rows: int, batch_size: int = 50000, seed: int = 42):
+    """
+    Fill an empty database with `rows` internships (3 skills each) and rows // 10 users
+
+    Args:
+        db: Connector whose schema has already been migrated
+        rows: Number of internships; the largest tables get 3x this many rows
+        batch_size: Rows per executemany batch
+        seed: Random seed so runs are comparable
+    """
+    rng = random.Random(seed)
+    user_count = max(rows // 10, 1)
+    conn = db.connections.begin()
+    cursor = conn.cursor()
+
+    try:
+        for start in range(0, rows, batch_size):
+            end = min(start + batch_size, rows)
+            cursor.executemany("""
+                INSERT INTO internships (id, title, company_name, sector, location, duration,
+                                         company_type, application_link, capacity, remote_available,
+                                         is_active, created_at, stipend_range)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, datetime('2024-01-01', ? || ' seconds'), ?)
+            """, [(i, f"Intern {i}", f"Company {i % 5000}", rng.choice(SECTORS), rng.choice(LOCATIONS),
+                   f"{rng.randint(1, 6)} months", rng.choice(["Startup", "MNC", "Government"]),
+                   f"https://example.com/apply/{i}", rng.randint(1, 20), rng.random() < 0.3,
+                   rng.random() < 0.9, str(i), f"₹{rng.randint(5, 30)},000/month")
+                  for i in range(start + 1, end + 1)])
+            cursor.executemany("""
+                INSERT INTO internship_skills (internship_id, skill_name) VALUES (?, ?)
+            """, [(i, skill) for i in range(start + 1, end + 1) for skill in rng.sample(SKILLS, 3)])
+
+        for start in range(0, user_count, batch_size):
+            end = min(start + batch_size, user_count)
+            ids = range(start + 1, end + 1)
+            cursor.executemany("""
+                INSERT INTO users (id, email, full_name, education) VALUES (?, ?, ?, ?)
+            """, [(u, f"user{u}@example.com", f"User {u}", "B.Tech") for u in ids])
+            cursor.executemany("""
+                INSERT INTO user_preferences (user_id, preferred_sectors, preferred_location)
+                VALUES (?, ?, ?)
+            """, [(u, json.dumps(rng.sample(SECTORS, 2)), rng.choice(LOCATIONS)) for u in ids])
+            cursor.executemany("""
+                INSERT INTO user_skills (user_id, skill_name, proficiency_level) VALUES (?, ?, ?)
+            """, [(u, skill, rng.randint(1, 5)) for u in ids for skill in rng.sample(SKILLS, 3)])
+            cursor.executemany("""
+                INSERT INTO user_experience (user_id, experience_text) VALUES (?, ?)
+            """, [(u, f"Project {u}") for u in ids])
+            cursor.executemany("""
+                INSERT INTO applications (user_id, internship_id, status, applied_at)
+                VALUES (?, ?, 'applied', datetime('2024-06-01', ? || ' seconds'))
+            """, [(u, rng.randint(1, rows), str(k)) for u in ids for k in range(2)])
+
+        conn.commit()
+        cursor.execute("ANALYZE")
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        db.connections.release(conn)
+
+
+def benchmark_cases(rows: int) -> List[Tuple[str, Callable[[DatabaseConnector], Any]]]:
+    """Read methods to plan and time, with arguments that hit real rows"""
+    user_id = max(rows // 20, 1)
+    return [
+        ("get_user_profile_by_email", lambda db: db.get_user_profile_by_email(f"user{user_id}@example.com")),
+        ("get_user_profile_by_id", lambda db: db.get_user_profile_by_id(user_id)),
+        ("get_user_profiles(100)", lambda db: db.get_user_profiles(range(user_id, user_id + 100))),
+        ("get_active_internships(limit=50)", lambda db: db.get_active_internships(limit=50)),
+        ("get_internships_by_sector", lambda db: db.get_internships_by_sector("technology")),
+        ("find_internships(location, remote)", lambda db: db.find_internships(
+            location="pune", remote_only=True, limit=50)),
+        ("find_internships(sector, duration)", lambda db: db.find_internships(
+            sector="finance", duration="3", limit=50)),
+        ("get_internships_page(2 pages)", lambda db: db.get_internships_page(
+            50, db.get_internships_page(50, sector="finance")[1], sector="finance")),
+        ("get_user_applications", lambda db: db.get_user_applications(user_id)),
+        ("get_top_skills_in_demand", lambda db: db.get_top_skills_in_demand(10, exclude=["Python", "SQL"])),
+        ("get_precomputed_matching_stats", lambda db: db.get_precomputed_matching_stats(f"user{user_id}@example.com")),
+        ("iter_user_ids(first batch)", lambda db: next(db.iter_user_ids(1000))),
+        ("get_recommendation_ranking_page", lambda db: db.get_recommendation_ranking_page("missing", 500, 10)),
+    ]
+
+
+def capture_statements(db: DatabaseConnector, call: Callable[[DatabaseConnector], Any]) -> List[str]:
+    """Run `call` once and return the read statements it sent to SQLite"""
+    conn = db.connections.get_connection()
+    statements = []
+    conn.set_trace_callback(statements.append)
+    try:
+        call(db)
+    finally:
+        conn.set_trace_callback(None)
+    return [sql for sql in statements if sql.lstrip().upper().startswith(PLANNED_PREFIXES)]
+
+
+def find_plan_violations(conn: sqlite3.Connection, sql: str) -> List[str]:
+    """Return the plan steps of `sql` that scan a table without an index or sort in a temp B-tree"""
+    plan = [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}")]
+    violations = []
+    for step in plan:
+        # Virtual tables (json_each over a bound ID list) are parameters, not stored rows
+        if "VIRTUAL TABLE" in step:
+            continue
+        if step.startswith("SCAN") and "USING INDEX" not in step and "USING COVERING INDEX" not in step:
+            violations.append(step)
+        elif step.startswith("USE TEMP B-TREE"):
+            violations.append(step)
+    return violations
+
+
+def run_benchmark(db: DatabaseConnector, rows: int, repeats: int = 20) -> Dict[str, Dict[str, Any]]:
+    """
+    Plan-check and time every benchmark case
+
+    Returns:
+        Mapping of case name to its statements, plan violations and mean latency in ms
+    """
+    results = {}
+    conn = db.connections.get_connection()
+
+    for name, call in benchmark_cases(rows):
+        statements = capture_statements(db, call)
+        violations = {sql: steps for sql in statements
+                      for steps in [find_plan_violations(conn, sql)] if steps}
+
+        start = time.perf_counter()
+        for _ in range(repeats):
+            call(db)
+        elapsed = time.perf_counter() - start
+
+        results[name] = {
+            'statements': len(statements),
+            'violations': violations,
+            'mean_ms': round(elapsed / repeats * 1000, 3)
+        }
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check query plans and time the database read path")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Synthetic internships to generate")
+    parser.add_argument("--repeats", type=int, default=20, help="Timed calls per method")
+    parser.add_argument("--db", help="Database path (default: a temporary file)")
+    args = parser.parse_args()
+
+    db_path = args.db or os.path.join(tempfile.mkdtemp(), "query_plan_benchmark.db")
+    db = DatabaseConnector(db_path)
+
+    print(f"Populating {args.rows:,} internships into {db_path}...")
+    start = time.perf_counter()
+    populate_synthetic_data(db, args.rows)
+    print(f"Populated in {time.perf_counter() - start:.1f}s\n")
+
+    results = run_benchmark(db, args.rows, args.repeats)
+    failed = False
+    for name, result in results.items():
+        status = "OK" if not result['violations'] else "FULL SCAN"
+        print(f"{name:<36} {result['mean_ms']:>10.3f} ms  {result['statements']} stmt  {status}")
+        for sql, steps in result['violations'].items():
+            failed = True
+            print(f"    {' '.join(sql.split())}")
+            for step in steps:
+                print(f"      -> {step}")
+
+    db.close()
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,154 @@
+"""
+Recommendation Result Cache for the AI Internship Matching Engine
+Features:
+1. Bounded LRU cache of recommendation responses
+2. Keys carry a profile fingerprint and the catalog and weights versions, so a changed profile
+   (through any writer, in any process), catalog or weights never serves stale results
+3. Eager per-user invalidation when preferences are updated through the API
+4. Hit-rate metrics for sizing the cache from real traffic
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Set, Tuple
+
+from matching_engine import CandidateProfile
+
+# (user, profile fingerprint, NL query hash, top_n, sector filter, catalog version, weights version)
+CacheKey = Tuple[str, str, str, int, Optional[str], Optional[int], int]
+
+
+def profile_fingerprint(profile: CandidateProfile) -> str:
+    """Stable digest of every profile field; changes whenever anything that affects scoring does"""
+    return hashlib.sha256(repr(profile).encode('utf-8')).hexdigest()[:32]
+
+
+class RecommendationCache:
+    """
+    Thread-safe LRU cache of recommendation results
+
+    Cached values are shared between hits and must be treated as read-only.
+    """
+
+    def __init__(self, max_entries: int = 1024):
+        """
+        Args:
+            max_entries: Maximum cached results; 0 disables caching
+        """
+        self.max_entries = max_entries
+        self._entries: 'OrderedDict[CacheKey, Any]' = OrderedDict()
+        self._keys_by_user: Dict[str, Set[CacheKey]] = {}
+        self._lock = threading.Lock()
+        self.generation = 0  # Bumped by every invalidation
+        self._reset_counters()
+
+    def _reset_counters(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def make_key(user: str,
+                 profile_hash: str,
+                 natural_language_input: Optional[str],
+                 top_n: int,
+                 sector_filter: Optional[str],
+                 catalog_version: Optional[int],
+                 weights_version: int) -> CacheKey:
+        """
+        Build the cache key for one recommendation request
+
+        profile_hash is the fingerprint of the profile as fetched for this request,
+        so entries computed from an older version of the profile are never hit again
+        and age out of the LRU.
+        """
+        query = (natural_language_input or "").strip()
+        query_hash = hashlib.sha256(query.encode('utf-8')).hexdigest()[:16] if query else ""
+        sector = sector_filter.strip().lower() if sector_filter else None
+        return (user.strip().lower(), profile_hash, query_hash, top_n, sector, catalog_version, weights_version)
+
+    def get(self, key: CacheKey) -> Optional[Any]:
+        """Return the cached value and mark it most recently used, or None on a miss"""
+        if not self.max_entries:
+            return None
+
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: CacheKey, value: Any, generation: Optional[int] = None):
+        """
+        Store a value, evicting least recently used entries beyond max_entries
+
+        Args:
+            generation: The cache generation observed before the value's inputs were read;
+                if an invalidation happened since, the value may be stale and is not stored
+        """
+        if not self.max_entries:
+            return
+
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            self._keys_by_user.setdefault(key[0], set()).add(key)
+
+            while len(self._entries) > self.max_entries:
+                old_key, _ = self._entries.popitem(last=False)
+                self._forget_user_key(old_key)
+                self.evictions += 1
+
+    def evict_user(self, user: str) -> int:
+        """Drop every cached result for one user; returns the number of entries removed"""
+        user = user.strip().lower()
+        with self._lock:
+            self.generation += 1
+            keys = self._keys_by_user.pop(user, set())
+            for key in keys:
+                self._entries.pop(key, None)
+            self.invalidations += len(keys)
+            return len(keys)
+
+    def clear(self):
+        """Drop every cached result"""
+        with self._lock:
+            self.generation += 1
+            self.invalidations += len(self._entries)
+            self._entries.clear()
+            self._keys_by_user.clear()
+
+    def _forget_user_key(self, key: CacheKey):
+        keys = self._keys_by_user.get(key[0])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_user[key[0]]
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return a JSON-serializable view of the cache statistics"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'max_entries': self.max_entries,
+                'users': len(self._keys_by_user),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations
+            }
+
+    def reset_metrics(self):
+        """Zero the hit/miss/eviction counters without dropping entries"""
+        with self._lock:
+            self._reset_counters()
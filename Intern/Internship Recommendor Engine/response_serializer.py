@@ -0,0 +1,154 @@
+"""
+Response Serialization for the AI Internship Matching Engine HTTP routes
+Features:
+1. Encodes APIResponse and nested dataclasses straight to compact JSON bytes,
+   reading fields through per-class layouts instead of deep-copying with asdict
+2. Weak ETags over the response content (excluding the per-response timestamp)
+3. Conditional GET: If-None-Match answers 304 with no body
+4. Optional gzip for bodies above a size threshold when the client accepts it
+"""
+
+import dataclasses
+import gzip
+import hashlib
+import json
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+# Bodies smaller than this are sent uncompressed; gzip would save little and cost CPU
+GZIP_MIN_SIZE = 1024
+GZIP_LEVEL = 5
+
+# Field names per dataclass, resolved once per class
+_FIELD_LAYOUTS: Dict[type, Tuple[str, ...]] = {}
+
+# APIResponse fields that differ between otherwise identical responses; left out of the ETag
+VOLATILE_FIELDS = ('timings', 'timestamp')
+
+
+def field_layout(cls: type) -> Tuple[str, ...]:
+    """Field names of a dataclass in declaration order, cached per class"""
+    layout = _FIELD_LAYOUTS.get(cls)
+    if layout is None:
+        layout = _FIELD_LAYOUTS[cls] = tuple(field.name for field in dataclasses.fields(cls))
+    return layout
+
+
+def shallow_dict(obj: Any) -> Dict[str, Any]:
+    """
+    One-level dict of a dataclass instance
+
+    Unlike dataclasses.asdict, values are not copied: lists, dicts and nested
+    dataclasses are shared with obj and must be treated as read-only.
+    """
+    return {name: getattr(obj, name) for name in field_layout(type(obj))}
+
+
+def _default(obj: Any) -> Any:
+    """JSON fallback for the non-native types responses contain"""
+    if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        return shallow_dict(obj)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+# The C encoder walks lists and dicts itself and only calls _default for dataclasses and friends
+_ENCODER = json.JSONEncoder(default=_default, ensure_ascii=False, separators=(',', ':'))
+
+
+def encode_json(value: Any) -> bytes:
+    """Encode any response value (dataclasses included) as compact UTF-8 JSON"""
+    return _ENCODER.encode(value).encode('utf-8')
+
+
+def encode_api_response(result: Any) -> Tuple[bytes, str]:
+    """
+    Encode an APIResponse and compute its weak ETag
+
+    The timestamp (and any requested timings) change on every response, so they are
+    appended after hashing the rest of the body: identical content gets an
+    identical ETag.
+
+    Returns:
+        (JSON body, ETag header value)
+    """
+    layout = field_layout(type(result))
+    content = {name: getattr(result, name) for name in layout if name not in VOLATILE_FIELDS}
+    encoded = _ENCODER.encode(content)
+    etag = f'W/"{hashlib.sha1(encoded.encode("utf-8")).hexdigest()[:20]}"'
+    volatile = ''.join(f',"{name}":{_ENCODER.encode(getattr(result, name))}'
+                       for name in layout if name in VOLATILE_FIELDS)
+    return f'{encoded[:-1]}{volatile}}}'.encode('utf-8'), etag
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against an ETag"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+    opaque = etag[2:] if etag.startswith('W/') else etag
+    for candidate in if_none_match.split(','):
+        candidate = candidate.strip()
+        if (candidate[2:] if candidate.startswith('W/') else candidate) == opaque:
+            return True
+    return False
+
+
+def accepts_gzip(accept_encoding: Optional[str]) -> bool:
+    """Whether an Accept-Encoding header allows gzip (q=0 opts out)"""
+    for coding in (accept_encoding or "").lower().split(','):
+        name, _, params = coding.strip().partition(';')
+        if name.strip() in ('gzip', '*'):
+            return params.replace(' ', '') not in ('q=0', 'q=0.0', 'q=0.00', 'q=0.000')
+    return False
+
+
+@dataclasses.dataclass
+class RenderedResponse:
+    """Status, headers and body ready to hand to Flask or an ASGI send"""
+    status: int
+    headers: List[Tuple[str, str]]
+    body: bytes
+
+
+def render_response(result: Any,
+                    status: int = 200,
+                    method: str = 'GET',
+                    if_none_match: Optional[str] = None,
+                    accept_encoding: Optional[str] = None,
+                    gzip_min_size: Optional[int] = GZIP_MIN_SIZE,
+                    retry_after: Optional[int] = None) -> RenderedResponse:
+    """
+    Serialize an APIResponse for HTTP, applying conditional GET and compression
+
+    Args:
+        result: APIResponse to send
+        status: Status code for a full response
+        method: Request method; only successful GET/HEAD responses carry an ETag and can be 304
+        if_none_match: The request's If-None-Match header
+        accept_encoding: The request's Accept-Encoding header
+        gzip_min_size: Smallest body to gzip, or None to never compress
+        retry_after: Seconds to send in a Retry-After header (overload responses)
+    """
+    body, etag = encode_api_response(result)
+    headers = [('Content-Type', 'application/json')]
+    if retry_after is not None:
+        headers.append(('Retry-After', str(retry_after)))
+
+    if method in ('GET', 'HEAD') and status == 200:
+        headers.append(('ETag', etag))
+        if etag_matches(if_none_match, etag):
+            return RenderedResponse(304, [('ETag', etag)], b'')
+
+    if gzip_min_size is not None:
+        headers.append(('Vary', 'Accept-Encoding'))
+        if len(body) >= gzip_min_size and accepts_gzip(accept_encoding):
+            body = gzip.compress(body, compresslevel=GZIP_LEVEL)
+            headers.append(('Content-Encoding', 'gzip'))
+
+    headers.append(('Content-Length', str(len(body))))
+    return RenderedResponse(status, headers, body)
@@ -0,0 +1,216 @@
+"""
+Request Tracing for the AI Internship Matching Engine
+Features:
+1. span("stage") and @traced("stage") time one stage of the current request
+2. The active trace lives in a contextvar, so concurrent requests (threads or asyncio
+   tasks) never mix; executor hops carry it with contextvars.copy_context()
+3. Sampling: outside a sampled trace a span costs one contextvar read
+4. Per-stage latency histograms aggregated over every sampled request
+5. A request can force tracing to get its own stage breakdown back
+
+Usage:
+    with api.tracer.trace(force=True) as trace:
+        api.get_recommendations_by_user_id(1)
+    print(trace.timings())
+"""
+
+import functools
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from metrics import Histogram, prometheus_labels
+
+_current_trace: ContextVar[Optional['Trace']] = ContextVar('internship_matching_trace', default=None)
+
+
+class Trace:
+    """Accumulated stage timings for one request; a stage entered several times is summed"""
+
+    def __init__(self, forced: bool = False):
+        self.forced = forced  # Requested by the caller rather than picked by sampling
+        self.started = time.perf_counter()
+        self.finished: Optional[float] = None
+        self._stages: Dict[str, List[float]] = {}  # stage -> [seconds, count], in order of first completion
+        self._lock = threading.Lock()
+
+    def add(self, stage: str, seconds: float):
+        """Record one timed pass through a stage"""
+        with self._lock:
+            entry = self._stages.get(stage)
+            if entry is None:
+                self._stages[stage] = [seconds, 1]
+            else:
+                entry[0] += seconds
+                entry[1] += 1
+
+    def stages(self) -> Dict[str, Tuple[float, int]]:
+        """stage -> (total seconds, count)"""
+        with self._lock:
+            return {stage: (seconds, int(count)) for stage, (seconds, count) in self._stages.items()}
+
+    def timings(self) -> Dict[str, Any]:
+        """JSON-serializable breakdown in milliseconds; nested stages are included in their parents"""
+        end = self.finished if self.finished is not None else time.perf_counter()
+        return {
+            'total_ms': round((end - self.started) * 1000, 3),
+            'stages': {stage: {'ms': round(seconds * 1000, 3), 'count': count}
+                       for stage, (seconds, count) in self.stages().items()}
+        }
+
+
+class _Span:
+    __slots__ = ('trace', 'stage', 'started')
+
+    def __init__(self, trace: Trace, stage: str):
+        self.trace = trace
+        self.stage = stage
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.trace.add(self.stage, time.perf_counter() - self.started)
+        return False
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+def span(stage: str):
+    """Context manager timing a stage of the current trace; a shared no-op when not tracing"""
+    trace = _current_trace.get()
+    return _NOOP_SPAN if trace is None else _Span(trace, stage)
+
+
+def traced(stage: str) -> Callable:
+    """Decorator timing every call of a function as a stage of the current trace"""
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            trace = _current_trace.get()
+            if trace is None:
+                return func(*args, **kwargs)
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                trace.add(stage, time.perf_counter() - started)
+        return wrapper
+    return decorator
+
+
+def current_trace() -> Optional[Trace]:
+    """The trace of the running request, or None when it is not traced"""
+    return _current_trace.get()
+
+
+class Tracer:
+    """
+    Starts sampled traces and aggregates their stages into histograms
+
+    Only sampled or forced requests allocate a Trace; the rest run with no active
+    trace, so spans are no-ops.
+    """
+
+    STAGE_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+    def __init__(self, sample_rate: float = 0.0):
+        """
+        Args:
+            sample_rate: Fraction of requests traced into the histograms (0 disables, 1 traces all)
+        """
+        self.sample_rate = sample_rate
+        self._histograms: Dict[str, Histogram] = {}
+        self._lock = threading.Lock()
+        self.sampled = 0
+        self.forced = 0
+
+    def start(self, force: bool = False) -> Tuple[Optional[Trace], Optional[Token]]:
+        """
+        Begin tracing the current request if it is sampled or forced
+
+        Returns:
+            (trace or None, token to pass to finish)
+        """
+        if not force and (self.sample_rate <= 0 or random.random() >= self.sample_rate):
+            return None, None
+        trace = Trace(forced=force)
+        return trace, _current_trace.set(trace)
+
+    def finish(self, trace: Optional[Trace], token: Optional[Token]):
+        """End a trace begun by start and add its stages to the histograms"""
+        if trace is None:
+            return
+        trace.finished = time.perf_counter()
+        if token is not None:
+            _current_trace.reset(token)
+        self.record(trace)
+
+    @contextmanager
+    def trace(self, force: bool = False) -> Iterator[Optional[Trace]]:
+        """Trace the enclosed calls; yields the Trace, or None when not sampled"""
+        trace, token = self.start(force)
+        try:
+            yield trace
+        finally:
+            self.finish(trace, token)
+
+    def record(self, trace: Trace):
+        """Aggregate a finished trace's stage timings"""
+        stages = trace.stages()
+        with self._lock:
+            if trace.forced:
+                self.forced += 1
+            else:
+                self.sampled += 1
+            histograms = []
+            for stage, (seconds, _) in stages.items():
+                histogram = self._histograms.get(stage)
+                if histogram is None:
+                    histogram = self._histograms[stage] = Histogram(self.STAGE_BUCKETS)
+                histograms.append((histogram, seconds))
+        for histogram, seconds in histograms:
+            histogram.observe(seconds)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return a JSON-serializable view of the per-stage histograms"""
+        with self._lock:
+            histograms = dict(self._histograms)
+            sampled, forced = self.sampled, self.forced
+        return {
+            'sample_rate': self.sample_rate,
+            'sampled_traces': sampled,
+            'forced_traces': forced,
+            'stage_seconds': {stage: histogram.snapshot() for stage, histogram in sorted(histograms.items())}
+        }
+
+    def prometheus_lines(self, prefix: str) -> List[str]:
+        """Per-stage latency histogram and trace counter in Prometheus text format"""
+        with self._lock:
+            histograms = sorted(self._histograms.items())
+            sampled, forced = self.sampled, self.forced
+
+        name = f"{prefix}_traces_total"
+        lines = [f"# HELP {name} Traced requests by reason", f"# TYPE {name} counter",
+                 f"{name}{prometheus_labels({'reason': 'sampled'})} {sampled}",
+                 f"{name}{prometheus_labels({'reason': 'forced'})} {forced}"]
+        name = f"{prefix}_stage_duration_seconds"
+        lines += [f"# HELP {name} Time spent per request in each traced stage", f"# TYPE {name} histogram"]
+        for stage, histogram in histograms:
+            lines += histogram.prometheus_lines(name, {'stage': stage})
+        return lines